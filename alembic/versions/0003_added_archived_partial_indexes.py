@@ -0,0 +1,84 @@
+"""added partial indexes on not archived rows
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 15:40:12.318204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+not_archived = sa.text('archived = false')
+
+
+def replace_index(name: str, table_name: str, columns: list[str], where: sa.TextClause | None = None) -> None:
+    """
+    Replace an index by building the new one under a temporary name first, so the table is never left
+    without an index on the columns and a failed build leaves the old index in place.
+    """
+    op.create_index(
+        f'{name}_new',
+        table_name,
+        columns,
+        unique=False,
+        schema='challenges',
+        postgresql_where=where,
+        postgresql_concurrently=True,
+    )
+    op.drop_index(name, table_name=table_name, schema='challenges', postgresql_concurrently=True)
+    op.execute(f'ALTER INDEX challenges.{name}_new RENAME TO {name}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently outside of the migration transaction, so writes are not blocked on large tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'user_challenges_user_id_idx',
+            'user_challenges',
+            ['user_id'],
+            unique=False,
+            schema='challenges',
+            postgresql_where=not_archived,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'user_challenges_challenge_id_idx',
+            'user_challenges',
+            ['challenge_id'],
+            unique=False,
+            schema='challenges',
+            postgresql_where=not_archived,
+            postgresql_concurrently=True,
+        )
+        replace_index('user_contacts_contact_idx', 'user_contacts', ['contact'], where=not_archived)
+        replace_index('user_contacts_user_id_idx', 'user_contacts', ['user_id'], where=not_archived)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        replace_index('user_contacts_user_id_idx', 'user_contacts', ['user_id'])
+        replace_index('user_contacts_contact_idx', 'user_contacts', ['contact'])
+        op.drop_index(
+            'user_challenges_challenge_id_idx',
+            table_name='user_challenges',
+            schema='challenges',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'user_challenges_user_id_idx',
+            table_name='user_challenges',
+            schema='challenges',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,90 @@
+"""added challenge_participants table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:20:41.902117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Statement-level triggers aggregate the changed rows through transition tables, so bulk writes
+# (update_many, COPY) touch each counter once. Counters are updated in key order to avoid deadlocks.
+COUNT_PARTICIPANTS_FUNCTION = """
+CREATE FUNCTION challenges.count_challenge_participants() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    changes text;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT challenge_id, status, 1 AS delta FROM new_rows WHERE NOT archived';
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := 'SELECT challenge_id, status, -1 AS delta FROM old_rows WHERE NOT archived';
+    ELSE
+        changes := 'SELECT challenge_id, status, -1 AS delta FROM old_rows WHERE NOT archived '
+            'UNION ALL SELECT challenge_id, status, 1 FROM new_rows WHERE NOT archived';
+    END IF;
+
+    EXECUTE format(
+        'INSERT INTO challenges.challenge_participants AS counters (challenge_id, status, participants) '
+        'SELECT challenge_id, status, sum(delta) FROM (%s) changes '
+        'GROUP BY challenge_id, status HAVING sum(delta) <> 0 ORDER BY challenge_id, status '
+        'ON CONFLICT (challenge_id, status) DO UPDATE SET participants = counters.participants + excluded.participants',
+        changes
+    );
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_rows',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'REFERENCING OLD TABLE AS old_rows',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'challenge_participants',
+        sa.Column('challenge_id', sa.Uuid(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('participants', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['challenge_id'],
+            ['challenges.challenges.id'],
+        ),
+        sa.PrimaryKeyConstraint('challenge_id', 'status'),
+        schema='challenges',
+    )
+    op.execute(COUNT_PARTICIPANTS_FUNCTION)
+    # Creating the triggers locks out writes to user_challenges until the backfill is committed
+    for event, referencing in TRIGGERS.items():
+        op.execute(
+            f'CREATE TRIGGER user_challenges_count_{event.lower()} AFTER {event} ON challenges.user_challenges '
+            f'{referencing} FOR EACH STATEMENT EXECUTE FUNCTION challenges.count_challenge_participants()'
+        )
+    op.execute(
+        'INSERT INTO challenges.challenge_participants (challenge_id, status, participants) '
+        'SELECT challenge_id, status, count(*) FROM challenges.user_challenges WHERE NOT archived '
+        'GROUP BY challenge_id, status'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in TRIGGERS:
+        op.execute(f'DROP TRIGGER user_challenges_count_{event.lower()} ON challenges.user_challenges')
+    op.execute('DROP FUNCTION challenges.count_challenge_participants()')
+    op.drop_table('challenge_participants', schema='challenges')
@@ -0,0 +1,161 @@
+"""partitioned user_challenges by user_id
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:05:27.415093
+
+"""
+
+from typing import Any, Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import context, op
+from core.repositories.partitions import create_hash_partitions
+from settings import db_config
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+not_archived = sa.text('archived = false')
+
+COLUMNS = 'id, created, updated, archived, user_id, status, challenge_id'
+BACKFILL_BATCH_SIZE = 10_000
+
+# Same as in 0004, the counting triggers move to the partitioned table with the swap
+COUNT_TRIGGERS = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_rows',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'REFERENCING OLD TABLE AS old_rows',
+}
+
+# Mirrors the writes to the unpartitioned table while it is copied, so the copy is complete when the tables are swapped
+SYNC_FUNCTION = f"""
+CREATE FUNCTION challenges.sync_user_challenges_partitioned() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM challenges.user_challenges_partitioned WHERE id = OLD.id AND user_id = OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO challenges.user_challenges_partitioned ({COLUMNS})
+        VALUES (NEW.id, NEW.created, NEW.updated, NEW.archived, NEW.user_id, NEW.status, NEW.challenge_id);
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Rows are locked while copied: a row deleted concurrently is skipped instead of copied after its sync trigger ran,
+# a row updated concurrently is copied in its new version or already is in the copy.
+BACKFILL_BATCH = f"""
+WITH batch AS (
+    SELECT {COLUMNS} FROM challenges.user_challenges WHERE id > :last_id ORDER BY id LIMIT :batch_size FOR SHARE
+), copied AS (
+    INSERT INTO challenges.user_challenges_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM batch ON CONFLICT DO NOTHING
+)
+SELECT id FROM batch ORDER BY id DESC LIMIT 1
+"""
+
+
+def create_user_challenges(name: str, partitioned: bool) -> None:
+    op.create_table(
+        name,
+        sa.Column('id', sa.Uuid(), server_default=sa.text('uuid_generate_v4()'), nullable=False),
+        sa.Column('created', sa.DateTime(), server_default=sa.text("(now() at time zone 'utc')"), nullable=False),
+        sa.Column('updated', sa.DateTime(), server_default=sa.text("(now() at time zone 'utc')"), nullable=False),
+        sa.Column('archived', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('challenge_id', sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['challenge_id'], ['challenges.challenges.id'], name='user_challenges_challenge_id_fkey'
+        ),
+        sa.ForeignKeyConstraint(['user_id'], ['challenges.users.id'], name='user_challenges_user_id_fkey'),
+        # The partition key has to be part of the primary key of a partitioned table
+        sa.PrimaryKeyConstraint(*(['id', 'user_id'] if partitioned else ['id']), name=f'{name}_pkey'),
+        schema='challenges',
+        postgresql_partition_by='HASH (user_id)' if partitioned else None,
+    )
+    if partitioned:
+        # Partitions are named after user_challenges right away, renaming the parent does not rename them
+        partitions = db_config.user_challenges_partitions
+        for statement in create_hash_partitions('user_challenges', 'challenges', partitions, parent_name=name):
+            op.execute(statement)
+    # Index names are unique in the schema, they get their final names with the swap
+    op.create_index(f'{name}_user_id_idx', name, ['user_id'], schema='challenges', postgresql_where=not_archived)
+    op.create_index(
+        f'{name}_challenge_id_idx', name, ['challenge_id'], schema='challenges', postgresql_where=not_archived
+    )
+
+
+def swap_user_challenges(name: str) -> None:
+    """
+    Replace user_challenges with the table `name`, moving the counting triggers to it.
+    Runs in the migration transaction, writes to user_challenges wait for it only for the time of the swap.
+    """
+    op.execute('LOCK TABLE challenges.user_challenges IN ACCESS EXCLUSIVE MODE')
+    op.execute('DROP TABLE challenges.user_challenges')
+    op.rename_table(name, 'user_challenges', schema='challenges')
+    op.execute(f'ALTER TABLE challenges.user_challenges RENAME CONSTRAINT {name}_pkey TO user_challenges_pkey')
+    for index in ('user_id_idx', 'challenge_id_idx'):
+        op.execute(f'ALTER INDEX challenges.{name}_{index} RENAME TO user_challenges_{index}')
+    for event, referencing in COUNT_TRIGGERS.items():
+        op.execute(
+            f'CREATE TRIGGER user_challenges_count_{event.lower()} AFTER {event} ON challenges.user_challenges '
+            f'{referencing} FOR EACH STATEMENT EXECUTE FUNCTION challenges.count_challenge_participants()'
+        )
+
+
+def backfill_user_challenges_partitioned() -> None:
+    if context.is_offline_mode():
+        op.execute(
+            f'INSERT INTO challenges.user_challenges_partitioned ({COLUMNS}) '
+            f'SELECT {COLUMNS} FROM challenges.user_challenges ON CONFLICT DO NOTHING'
+        )
+        return
+
+    connection = op.get_bind()
+    last_id: Any = '00000000-0000-0000-0000-000000000000'
+    while last_id is not None:
+        # Every batch is committed on its own, the rows are locked only for the time of their batch
+        last_id = connection.execute(
+            sa.text(BACKFILL_BATCH), {'last_id': last_id, 'batch_size': BACKFILL_BATCH_SIZE}
+        ).scalar()
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Online migration: the partitioned table is created next to the current one, kept in sync by a trigger
+    while the rows are copied in small batches, and swapped in with a short lock at the end.
+    """
+    with op.get_context().autocommit_block():
+        create_user_challenges('user_challenges_partitioned', partitioned=True)
+        op.execute(SYNC_FUNCTION)
+        op.execute(
+            'CREATE TRIGGER user_challenges_sync_partitioned AFTER INSERT OR UPDATE OR DELETE '
+            'ON challenges.user_challenges FOR EACH ROW EXECUTE FUNCTION challenges.sync_user_challenges_partitioned()'
+        )
+        backfill_user_challenges_partitioned()
+        op.execute('ANALYZE challenges.user_challenges_partitioned')
+
+    # Dropping the old table drops its sync and counting triggers
+    swap_user_challenges('user_challenges_partitioned')
+    op.execute('DROP FUNCTION challenges.sync_user_challenges_partitioned()')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Writes are locked out for the whole copy
+    create_user_challenges('user_challenges_unpartitioned', partitioned=False)
+    op.execute('LOCK TABLE challenges.user_challenges IN EXCLUSIVE MODE')
+    op.execute(
+        f'INSERT INTO challenges.user_challenges_unpartitioned ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM challenges.user_challenges'
+    )
+    swap_user_challenges('user_challenges_unpartitioned')
@@ -0,0 +1,147 @@
+"""added archive tables
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 19:12:54.806528
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+is_archived = sa.text('archived = true')
+
+PARTITIONS = """
+SELECT child.relname FROM pg_inherits
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE pg_inherits.inhparent = 'challenges.user_challenges'::regclass
+ORDER BY child.relname
+"""
+
+
+def create_user_challenges_archived_index() -> None:
+    """
+    CREATE INDEX CONCURRENTLY is not supported on a partitioned table: the index is created invalid on the
+    parent only, built concurrently on every partition and becomes valid once all of them are attached.
+    """
+    if context.is_offline_mode():
+        op.create_index(
+            'user_challenges_archived_updated_idx',
+            'user_challenges',
+            ['updated'],
+            unique=False,
+            schema='challenges',
+            postgresql_where=is_archived,
+        )
+        return
+
+    op.execute(
+        'CREATE INDEX user_challenges_archived_updated_idx ON ONLY challenges.user_challenges (updated) '
+        'WHERE archived = true'
+    )
+    for partition in op.get_bind().execute(sa.text(PARTITIONS)).scalars():
+        op.execute(
+            f'CREATE INDEX CONCURRENTLY {partition}_archived_updated_idx ON challenges.{partition} (updated) '
+            'WHERE archived = true'
+        )
+        op.execute(
+            'ALTER INDEX challenges.user_challenges_archived_updated_idx '
+            f'ATTACH PARTITION challenges.{partition}_archived_updated_idx'
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_challenges_archive',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('created', sa.DateTime(), nullable=False),
+        sa.Column('updated', sa.DateTime(), nullable=False),
+        sa.Column('archived', sa.Boolean(), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('challenge_id', sa.Uuid(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'user_id', name='user_challenges_archive_pkey'),
+        schema='challenges',
+    )
+    op.create_index(
+        'user_challenges_archive_challenge_id_idx',
+        'user_challenges_archive',
+        ['challenge_id'],
+        unique=False,
+        schema='challenges',
+    )
+    op.create_index(
+        'user_challenges_archive_updated_idx', 'user_challenges_archive', ['updated'], unique=False, schema='challenges'
+    )
+    op.create_index(
+        'user_challenges_archive_user_id_idx', 'user_challenges_archive', ['user_id'], unique=False, schema='challenges'
+    )
+    op.create_table(
+        'user_contacts_archive',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('created', sa.DateTime(), nullable=False),
+        sa.Column('updated', sa.DateTime(), nullable=False),
+        sa.Column('archived', sa.Boolean(), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('contact_type', sa.String(), nullable=False),
+        sa.Column('contact', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id', name='user_contacts_archive_pkey'),
+        schema='challenges',
+    )
+    op.create_index(
+        'user_contacts_archive_contact_idx', 'user_contacts_archive', ['contact'], unique=False, schema='challenges'
+    )
+    op.create_index(
+        'user_contacts_archive_contact_type_contact_idx',
+        'user_contacts_archive',
+        ['contact_type', 'contact'],
+        unique=False,
+        schema='challenges',
+    )
+    op.create_index(
+        'user_contacts_archive_updated_idx', 'user_contacts_archive', ['updated'], unique=False, schema='challenges'
+    )
+    op.create_index(
+        'user_contacts_archive_user_id_idx', 'user_contacts_archive', ['user_id'], unique=False, schema='challenges'
+    )
+
+    # Partial indexes the archival worker finds the archived rows with, built without blocking writes
+    with op.get_context().autocommit_block():
+        create_user_challenges_archived_index()
+        op.create_index(
+            'user_contacts_archived_updated_idx',
+            'user_contacts',
+            ['updated'],
+            unique=False,
+            schema='challenges',
+            postgresql_where=is_archived,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived rows go back to the hot tables, a contact reused since it was archived is lost
+    for table_name, columns in (
+        ('user_challenges', 'id, created, updated, archived, user_id, status, challenge_id'),
+        ('user_contacts', 'id, created, updated, archived, user_id, contact_type, contact'),
+    ):
+        op.execute(
+            f'INSERT INTO challenges.{table_name} ({columns}) '
+            f'SELECT {columns} FROM challenges.{table_name}_archive ON CONFLICT DO NOTHING'
+        )
+    # Dropping the index of the partitioned table drops the indexes of its partitions
+    op.drop_index('user_contacts_archived_updated_idx', table_name='user_contacts', schema='challenges')
+    op.drop_index('user_challenges_archived_updated_idx', table_name='user_challenges', schema='challenges')
+    op.drop_table('user_contacts_archive', schema='challenges')
+    op.drop_table('user_challenges_archive', schema='challenges')
@@ -0,0 +1,55 @@
+"""added unique id indexes on user_challenges partitions
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 20:31:08.114502
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import context, op
+from core.repositories.partitions import hash_partition_name
+from settings import db_config
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = """
+SELECT child.relname FROM pg_inherits
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE pg_inherits.inhparent = 'challenges.user_challenges'::regclass
+ORDER BY child.relname
+"""
+
+
+def user_challenges_partitions() -> list[str]:
+    if context.is_offline_mode():
+        return [hash_partition_name('user_challenges', n) for n in range(db_config.user_challenges_partitions)]
+    return list(op.get_bind().execute(sa.text(PARTITIONS)).scalars())
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    The primary key of the partitioned table is (id, user_id), a unique index on id alone is not possible on it.
+    Every partition gets its own unique index on id instead, so lookups by id without user_id probe one index
+    per partition and a duplicate id can never be written to the partition of its user.
+    """
+    # Built concurrently outside of the migration transaction, so writes are not blocked on large tables
+    with op.get_context().autocommit_block():
+        for partition in user_challenges_partitions():
+            op.execute(f'CREATE UNIQUE INDEX CONCURRENTLY {partition}_id_key ON challenges.{partition} (id)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for partition in user_challenges_partitions():
+            op.execute(f'DROP INDEX CONCURRENTLY challenges.{partition}_id_key')
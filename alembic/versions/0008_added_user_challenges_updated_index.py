@@ -0,0 +1,55 @@
+"""added updated index on user_challenges
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 23:12:40.207315
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = """
+SELECT child.relname FROM pg_inherits
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE pg_inherits.inhparent = 'challenges.user_challenges'::regclass
+ORDER BY child.relname
+"""
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    The leaderboards catch up with the writes of other processes by reading the user challenges updated
+    since their previous read. CREATE INDEX CONCURRENTLY is not supported on a partitioned table: the index
+    is created invalid on the parent only, built concurrently on every partition and becomes valid once all
+    of them are attached.
+    """
+    with op.get_context().autocommit_block():
+        if context.is_offline_mode():
+            op.create_index('user_challenges_updated_idx', 'user_challenges', ['updated'], schema='challenges')
+            return
+
+        op.execute('CREATE INDEX user_challenges_updated_idx ON ONLY challenges.user_challenges (updated)')
+        for partition in op.get_bind().execute(sa.text(PARTITIONS)).scalars():
+            op.execute(f'CREATE INDEX CONCURRENTLY {partition}_updated_idx ON challenges.{partition} (updated)')
+            op.execute(
+                'ALTER INDEX challenges.user_challenges_updated_idx '
+                f'ATTACH PARTITION challenges.{partition}_updated_idx'
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping the index of the partitioned table drops the indexes of its partitions
+    op.drop_index('user_challenges_updated_idx', table_name='user_challenges', schema='challenges')
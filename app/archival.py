@@ -0,0 +1,28 @@
+import datetime
+from typing import Any
+
+from app.repositories.repositories import DBRepositories
+from core.repositories.archival import ArchivalWorker
+
+
+def create_archival_worker(db_repos: DBRepositories, config: dict[str, Any]) -> ArchivalWorker:
+    """
+    Archival worker of the configured tables.
+
+    Args:
+        db_repos: Repositories of the primary pool
+        config: ArchivalConfig dump
+    """
+    repositories = []
+    for table_name in config['tables']:
+        repository = getattr(db_repos, table_name, None)
+        if repository is None or repository.archive_table is None:
+            raise ValueError(f'Table {table_name} has no archive table')
+        repositories.append(repository)
+    return ArchivalWorker(
+        repositories,
+        retention=datetime.timedelta(days=config['retention_days']),
+        batch_size=config['batch_size'],
+        interval=config['interval'],
+        pause=config['pause'],
+    )
@@ -0,0 +1,370 @@
+import asyncio
+import datetime
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from logging import getLogger
+from typing import TYPE_CHECKING, Any, Iterable
+from uuid import UUID
+
+import sqlalchemy as sa
+from asyncpg import InterfaceError, PostgresError  # type: ignore
+
+from app.models.base import now_at_utc
+from app.models.user_challenges import UserChallenges
+from core.types.pydantic_base import BaseUjsonModel
+
+if TYPE_CHECKING:
+    from app.repositories.repositories import DBRepositories
+
+logger = getLogger(__name__)
+
+# Best score first, then the participant who reached it first, the id keeps the order total
+RankKey = tuple[int, datetime.datetime, str]
+
+# Keys per bucket of the sorted keys, a bucket is split in two once it holds twice as many
+BUCKET_SIZE = 1000
+
+
+class LeaderboardEntry(BaseUjsonModel):
+    rank: int
+    user_id: UUID
+    user_challenge_id: UUID
+    status: str
+    updated: datetime.datetime
+
+
+@dataclass(slots=True)
+class _Participant:
+    key: RankKey
+    user_id: UUID
+    challenge_id: UUID
+    status: str
+    updated: datetime.datetime
+
+
+class _SortedKeys:
+    """
+    Rank keys kept sorted in buckets of up to 2 * BUCKET_SIZE keys.
+    Inserts and deletes bisect the last keys of the buckets and shift a single bucket, positions are
+    resolved through a Fenwick tree over the bucket lengths, so updates and lookups stay logarithmic
+    in the number of keys instead of shifting the whole board.
+    """
+
+    def __init__(self, keys: Iterable[RankKey] = ()) -> None:
+        ordered = sorted(keys)
+        self._buckets = [ordered[start : start + BUCKET_SIZE] for start in range(0, len(ordered), BUCKET_SIZE)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+        # Fenwick tree of the bucket lengths (1-based), rebuilt lazily after buckets are split or removed
+        self._tree: list[int] | None = None
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: RankKey) -> None:
+        if not self._buckets:
+            self._buckets, self._maxes, self._tree = [[key]], [key], None
+            self._len = 1
+            return
+        index = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[index]
+        insort(bucket, key)
+        self._maxes[index] = bucket[-1]
+        self._len += 1
+        if len(bucket) > 2 * BUCKET_SIZE:
+            self._buckets[index : index + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            self._maxes[index : index + 1] = [bucket[BUCKET_SIZE - 1], bucket[-1]]
+            self._tree = None
+        else:
+            self._tree_add(index, 1)
+
+    def remove(self, key: RankKey) -> None:
+        """Remove a key that is present."""
+        index = bisect_left(self._maxes, key)
+        bucket = self._buckets[index]
+        del bucket[bisect_left(bucket, key)]
+        self._len -= 1
+        if bucket:
+            self._maxes[index] = bucket[-1]
+            self._tree_add(index, -1)
+        else:
+            del self._buckets[index], self._maxes[index]
+            self._tree = None
+
+    def index(self, key: RankKey) -> int:
+        """Number of keys lower than the key."""
+        index = bisect_left(self._maxes, key)
+        if index == len(self._buckets):
+            return self._len
+        return self._prefix(index) + bisect_left(self._buckets[index], key)
+
+    def slice(self, start: int, stop: int) -> list[RankKey]:
+        stop = min(stop, self._len)
+        if start >= stop:
+            return []
+        index, offset = self._locate(start)
+        keys: list[RankKey] = []
+        while len(keys) < stop - start:
+            keys.extend(self._buckets[index][offset : offset + stop - start - len(keys)])
+            index, offset = index + 1, 0
+        return keys
+
+    def _fenwick(self) -> list[int]:
+        if self._tree is None:
+            tree = [0] + [len(bucket) for bucket in self._buckets]
+            for node in range(1, len(tree)):
+                parent = node + (node & -node)
+                if parent < len(tree):
+                    tree[parent] += tree[node]
+            self._tree = tree
+        return self._tree
+
+    def _tree_add(self, index: int, delta: int) -> None:
+        if self._tree is None:
+            return
+        node = index + 1
+        while node < len(self._tree):
+            self._tree[node] += delta
+            node += node & -node
+
+    def _prefix(self, index: int) -> int:
+        """Number of keys in the buckets before the bucket."""
+        tree, total = self._fenwick(), 0
+        while index:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    def _locate(self, position: int) -> tuple[int, int]:
+        """Bucket holding the key at the position and the offset of the key in it."""
+        tree, index = self._fenwick(), 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            if index + step < len(tree) and tree[index + step] <= position:
+                index += step
+                position -= tree[index]
+            step >>= 1
+        return index, position
+
+
+class Leaderboard:
+    """
+    Participants of one challenge kept sorted by rank key.
+    Updates, top-N and rank lookups are logarithmic in the size of the board.
+    """
+
+    def __init__(self) -> None:
+        self._keys = _SortedKeys()
+        self._participants: dict[str, _Participant] = {}
+        self._by_user: dict[UUID, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def user_challenge_ids(self) -> list[str]:
+        return list(self._participants)
+
+    def load(self, participants: dict[str, _Participant]) -> None:
+        """Replace the participants, sorting them once instead of inserting them one by one."""
+        self._participants = participants
+        self._keys = _SortedKeys(participant.key for participant in participants.values())
+        self._by_user = {}
+        for user_challenge_id, participant in participants.items():
+            self._by_user.setdefault(participant.user_id, set()).add(user_challenge_id)
+
+    def add(self, user_challenge_id: str, participant: _Participant) -> None:
+        self.remove(user_challenge_id)
+        self._keys.add(participant.key)
+        self._participants[user_challenge_id] = participant
+        self._by_user.setdefault(participant.user_id, set()).add(user_challenge_id)
+
+    def remove(self, user_challenge_id: str) -> None:
+        participant = self._participants.pop(user_challenge_id, None)
+        if participant is None:
+            return
+        self._keys.remove(participant.key)
+        user_challenge_ids = self._by_user[participant.user_id]
+        user_challenge_ids.discard(user_challenge_id)
+        if not user_challenge_ids:
+            del self._by_user[participant.user_id]
+
+    def top(self, limit: int, offset: int = 0) -> list[LeaderboardEntry]:
+        return [
+            self._entry(rank, key[2])
+            for rank, key in enumerate(self._keys.slice(offset, offset + limit), start=offset + 1)
+        ]
+
+    def rank(self, user_id: UUID) -> LeaderboardEntry | None:
+        """Best ranked participation of the user."""
+        user_challenge_ids = self._by_user.get(user_id)
+        if not user_challenge_ids:
+            return None
+        key = min(self._participants[user_challenge_id].key for user_challenge_id in user_challenge_ids)
+        return self._entry(self._keys.index(key) + 1, key[2])
+
+    def _entry(self, rank: int, user_challenge_id: str) -> LeaderboardEntry:
+        participant = self._participants[user_challenge_id]
+        return LeaderboardEntry.model_construct(
+            rank=rank,
+            user_id=participant.user_id,
+            user_challenge_id=UUID(user_challenge_id),
+            status=participant.status,
+            updated=participant.updated,
+        )
+
+
+class Leaderboards:
+    """
+    In-memory leaderboards of the active (not archived) challenges, ranked by the score of the
+    user challenge status. Statuses without a score are not ranked.
+
+    Boards are built from the database on startup, writes of this process are applied as they happen.
+    Writes of other processes are caught up periodically by reading the rows updated since the previous
+    read, a full rebuild runs much less often to pick up anything the catch-ups missed.
+    """
+
+    def __init__(self, status_scores: dict[str, int]):
+        self.status_scores = status_scores
+        self.rebuilt_at: float | None = None
+        self.rebuild_time = 0.0
+        self.caught_up_at: float | None = None
+        # Database time of the last read, the next catch-up reads the rows updated since then
+        self._read_at: datetime.datetime | None = None
+        self._boards: dict[UUID, Leaderboard] = {}
+        self._participants: dict[str, _Participant] = {}
+        # Changes applied while a rebuild is reading the database, replayed on the rebuilt boards
+        self._replay: list[UserChallenges] | None = None
+        self._rebuild_lock = asyncio.Lock()
+
+    def board(self, challenge_id: UUID) -> Leaderboard | None:
+        return self._boards.get(challenge_id)
+
+    def apply(self, user_challenges: Iterable[UserChallenges]) -> None:
+        """
+        Apply created, updated or archived user challenges. Changes older than the ranked row are ignored.
+        """
+        user_challenges = list(user_challenges)
+        if self._replay is not None:
+            self._replay.extend(user_challenges)
+        for user_challenge in user_challenges:
+            self._apply(self._boards, self._participants, user_challenge)
+
+    def drop(self, challenge_id: UUID) -> None:
+        """Forget the board of an archived challenge."""
+        board = self._boards.pop(challenge_id, None)
+        if board is not None:
+            for user_challenge_id in board.user_challenge_ids():
+                self._participants.pop(user_challenge_id, None)
+
+    def _participant(self, user_challenge_id: str, user_challenge: UserChallenges) -> _Participant | None:
+        score = self.status_scores.get(user_challenge.status)
+        if user_challenge.archived or score is None:
+            return None
+        return _Participant(
+            key=(-score, user_challenge.updated, user_challenge_id),
+            user_id=user_challenge.user_id,
+            challenge_id=user_challenge.challenge_id,
+            status=user_challenge.status,
+            updated=user_challenge.updated,
+        )
+
+    def _apply(
+        self, boards: dict[UUID, Leaderboard], participants: dict[str, _Participant], user_challenge: UserChallenges
+    ) -> None:
+        user_challenge_id = str(user_challenge.id)
+        current = participants.get(user_challenge_id)
+        if current is not None:
+            if current.updated > user_challenge.updated:
+                return
+            participants.pop(user_challenge_id)
+            boards[current.challenge_id].remove(user_challenge_id)
+
+        participant = self._participant(user_challenge_id, user_challenge)
+        if participant is None:
+            return
+        participants[user_challenge_id] = participant
+        board = boards.get(participant.challenge_id)
+        if board is None:
+            board = boards[participant.challenge_id] = Leaderboard()
+        board.add(user_challenge_id, participant)
+
+    async def rebuild(self, db_repos: 'DBRepositories') -> None:
+        """
+        Build the boards from the database and swap them in.
+        """
+        async with self._rebuild_lock:
+            started = time.perf_counter()
+            self._replay = []
+            try:
+                read_at = await db_repos.user_challenges.fetchval(sa.select(now_at_utc))
+                loaded: dict[UUID, dict[str, _Participant]] = {
+                    challenge.id: {} async for challenge in db_repos.challenges.iterate()
+                }
+                participants: dict[str, _Participant] = {}
+                async for user_challenge in db_repos.user_challenges.iterate(status_in=list(self.status_scores)):
+                    user_challenge_id = str(user_challenge.id)
+                    participant = self._participant(user_challenge_id, user_challenge)
+                    board_participants = loaded.get(user_challenge.challenge_id)
+                    if participant is not None and board_participants is not None:
+                        board_participants[user_challenge_id] = participants[user_challenge_id] = participant
+
+                boards: dict[UUID, Leaderboard] = {}
+                for challenge_id, board_participants in loaded.items():
+                    board = boards[challenge_id] = Leaderboard()
+                    board.load(board_participants)
+                for user_challenge in self._replay:
+                    self._apply(boards, participants, user_challenge)
+                self._boards, self._participants, self._read_at = boards, participants, read_at
+            finally:
+                self._replay = None
+
+            self.rebuilt_at = time.time()
+            self.rebuild_time = time.perf_counter() - started
+            logger.debug(f'Leaderboards of {len(boards)} challenges rebuilt in {self.rebuild_time:.3f}s')
+
+    async def catch_up(self, db_repos: 'DBRepositories', overlap: float) -> None:
+        """
+        Apply the user challenges updated since the previous read of the database, archived ones included
+        so their participants are removed, and drop the boards of challenges archived since then.
+
+        Rows updated up to `overlap` seconds before the previous read are read again, to pick up
+        transactions that committed after it and replicas lagging behind. Anything older is left to
+        the next rebuild.
+        """
+        if self._read_at is None:
+            await self.rebuild(db_repos)
+            return
+        async with self._rebuild_lock:
+            read_at = await db_repos.user_challenges.fetchval(sa.select(now_at_utc))
+            since = self._read_at - datetime.timedelta(seconds=overlap)
+            async for user_challenge in db_repos.user_challenges.iterate(include_archived=True, updated_ge=since):
+                self._apply(self._boards, self._participants, user_challenge)
+            async for challenge in db_repos.challenges.iterate(archived=True, updated_ge=since):
+                self.drop(challenge.id)
+            self._read_at = read_at
+            self.caught_up_at = time.time()
+
+    async def refresh(
+        self, db_repos: 'DBRepositories', interval: float, rebuild_interval: float, overlap: float
+    ) -> None:
+        """Catch up every `interval` seconds and rebuild every `rebuild_interval` seconds (never if 0)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if rebuild_interval and time.time() - (self.rebuilt_at or 0.0) >= rebuild_interval:
+                    await self.rebuild(db_repos)
+                else:
+                    await self.catch_up(db_repos, overlap)
+            except (OSError, TimeoutError, PostgresError, InterfaceError) as err:
+                # The current leaderboards are kept until the next successful refresh
+                logger.warning(f'Failed to refresh leaderboards: {err}')
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'challenges': len(self._boards),
+            'participants': len(self._participants),
+            'rebuilt_at': self.rebuilt_at,
+            'rebuild_time': self.rebuild_time,
+            'caught_up_at': self.caught_up_at,
+        }
@@ -1,5 +1,7 @@
+from .archive import user_challenges_archive, user_contacts_archive
 from .base import challenges_schema
-from .challenges import Challenges
+from .challenge_participants import ChallengeParticipants
+from .challenges import Challenges, ChallengesWithParticipants
 from .user import Users
 from .user_challenges import UserChallenges
 from .user_contacts import UserContacts
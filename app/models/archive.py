@@ -0,0 +1,8 @@
+from core.repositories.archival import archive_table
+
+from .user_challenges import UserChallenges
+from .user_contacts import UserContacts
+
+# Cold storage of the archived rows moved out of the hot tables by the archival worker
+user_challenges_archive = archive_table(UserChallenges.__table__)  # type: ignore[attr-defined]
+user_contacts_archive = archive_table(UserContacts.__table__)  # type: ignore[attr-defined]
@@ -7,6 +7,10 @@ from sqlmodel import Field, SQLModel
 now_at_utc = text("(now() at time zone 'utc')")
 generate_uuid = text('uuid_generate_v4()')
 false = text('false')
+# Predicate of the partial indexes that only cover not archived rows
+not_archived = text('archived = false')
+# Predicate of the partial indexes the archival worker finds the archived rows with
+is_archived = text('archived = true')
 
 challenges_schema = MetaData(schema='challenges')
 
@@ -0,0 +1,22 @@
+import uuid
+
+from sqlalchemy import BigInteger, String
+from sqlmodel import Field, SQLModel
+
+from core.types.pydantic_base import BaseUjsonModel
+
+from .base import challenges_schema
+
+
+class ChallengeParticipants(SQLModel, BaseUjsonModel, table=True):
+    """
+    Number of not archived user challenges per challenge and status.
+    Maintained by triggers on user_challenges, it is never written by the application.
+    """
+
+    __tablename__ = 'challenge_participants'
+    metadata = challenges_schema
+
+    challenge_id: uuid.UUID = Field(primary_key=True, foreign_key='challenges.challenges.id')
+    status: str = Field(primary_key=True, sa_type=String)
+    participants: int = Field(default=0, sa_type=BigInteger)
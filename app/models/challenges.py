@@ -6,8 +6,15 @@ from core.types.pydantic_base import BaseUjsonModel
 from .base import BaseSQLModel, challenges_schema
 
 
-class Challenges(BaseSQLModel, BaseUjsonModel, table=True):
-    metadata = challenges_schema
-
+class ChallengesBase(BaseSQLModel):
     title: str = Field(sa_type=String)
     description: str | None = Field(default=None, sa_type=String)
+
+
+class Challenges(ChallengesBase, BaseUjsonModel, table=True):
+    metadata = challenges_schema
+
+
+class ChallengesWithParticipants(ChallengesBase, BaseUjsonModel):
+    # Number of not archived participants per user challenge status
+    participants: dict[str, int] = Field(default_factory=dict)
@@ -1,16 +1,31 @@
 import uuid
 
+from sqlalchemy import Index
 from sqlmodel import Field
 
 from core.types.pydantic_base import BaseUjsonModel
 
-from .base import BaseSQLModel, challenges_schema
+from .base import BaseSQLModel, challenges_schema, is_archived, not_archived
 
 
 class UserChallenges(BaseSQLModel, BaseUjsonModel, table=True):
+    """
+    Hash partitioned by user, the partitions are created by migrations (see DB_USER_CHALLENGES_PARTITIONS).
+    The partition key has to be part of the primary key, queries filtering by user_id read a single partition.
+    Ids stay unique on their own: they are generated (never taken from requests) and every partition has
+    a unique index on id, so lookups by id alone find at most one row, probing the index of every partition.
+    """
+
     __tablename__ = 'user_challenges'
+    __table_args__ = (
+        Index('user_challenges_user_id_idx', 'user_id', unique=False, postgresql_where=not_archived),
+        Index('user_challenges_challenge_id_idx', 'challenge_id', unique=False, postgresql_where=not_archived),
+        Index('user_challenges_updated_idx', 'updated', unique=False),
+        Index('user_challenges_archived_updated_idx', 'updated', unique=False, postgresql_where=is_archived),
+        {'postgresql_partition_by': 'HASH (user_id)'},
+    )
     metadata = challenges_schema
 
-    user_id: uuid.UUID = Field(foreign_key='challenges.users.id')
+    user_id: uuid.UUID = Field(primary_key=True, foreign_key='challenges.users.id')
     challenge_id: uuid.UUID = Field(foreign_key='challenges.challenges.id')
     status: str = Field(default='pending')
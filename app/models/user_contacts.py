@@ -6,7 +6,7 @@ from sqlmodel import Field
 
 from core.types.pydantic_base import BaseUjsonModel
 
-from .base import BaseSQLModel, challenges_schema
+from .base import BaseSQLModel, challenges_schema, is_archived, not_archived
 
 
 class ContactType(Enum):
@@ -22,9 +22,10 @@ class ContactType(Enum):
 class UserContacts(BaseSQLModel, BaseUjsonModel, table=True):
     __tablename__ = 'user_contacts'
     __table_args__ = (
-        Index('user_contacts_contact_idx', 'contact', unique=False),
-        Index('user_contacts_user_id_idx', 'user_id', unique=False),
+        Index('user_contacts_contact_idx', 'contact', unique=False, postgresql_where=not_archived),
+        Index('user_contacts_user_id_idx', 'user_id', unique=False, postgresql_where=not_archived),
         Index('user_contacts_contact_type_contact_idx', 'contact_type', 'contact', unique=True),
+        Index('user_contacts_archived_updated_idx', 'updated', unique=False, postgresql_where=is_archived),
     )
     metadata = challenges_schema
 
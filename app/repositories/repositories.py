@@ -1,21 +1,98 @@
 from asyncpg import Pool  # type: ignore
 
-from app.models import Challenges, UserContacts, Users
+from app.models import (
+    ChallengeParticipants,
+    Challenges,
+    UserContacts,
+    Users,
+    user_challenges_archive,
+    user_contacts_archive,
+)
 from app.models.user_challenges import UserChallenges
+from core.repositories.entity_cache import EntityCache
 from core.repositories.entity_db import EntityDBRepository
+from core.repositories.invalidation import InvalidationBus
+from core.repositories.pool import ObservablePool
+from core.repositories.prepared import StatementStats
+from core.repositories.replicas import ReplicaRouter
+from core.repositories.stats import QueryStats
+from core.repositories.unit_of_work import UnitOfWork
 
 
 class DBRepositories:
     challenges: EntityDBRepository[Challenges]
+    challenge_participants: EntityDBRepository[ChallengeParticipants]
     user_contacts: EntityDBRepository[UserContacts]
     users: EntityDBRepository[Users]
     user_challenges: EntityDBRepository[UserChallenges]
 
     @classmethod
-    def create(cls, db_pool: Pool) -> 'DBRepositories':
+    def create(
+        cls,
+        db_pool: Pool | ObservablePool,
+        statement_registry: StatementStats | None = None,
+        replica_router: ReplicaRouter | None = None,
+        entity_caches: dict[str, EntityCache] | None = None,
+        query_stats: QueryStats | None = None,
+        unit_of_work: UnitOfWork | None = None,
+        invalidation_bus: InvalidationBus | None = None,
+    ) -> 'DBRepositories':
+        caches = entity_caches or {}
         instance = cls()
-        instance.challenges = EntityDBRepository(Challenges, db_pool)
-        instance.user_contacts = EntityDBRepository(UserContacts, db_pool)
-        instance.users = EntityDBRepository(Users, db_pool)
-        instance.user_challenges = EntityDBRepository(UserChallenges, db_pool)
+        instance.challenges = EntityDBRepository(
+            Challenges,
+            db_pool,
+            statement_registry,
+            replica_router,
+            caches.get('challenges'),
+            trusted=True,
+            query_stats=query_stats,
+            unit_of_work=unit_of_work,
+            invalidation_bus=invalidation_bus,
+        )
+        instance.challenge_participants = EntityDBRepository(
+            ChallengeParticipants,
+            db_pool,
+            statement_registry,
+            replica_router,
+            trusted=True,
+            query_stats=query_stats,
+            unit_of_work=unit_of_work,
+            invalidation_bus=invalidation_bus,
+        )
+        instance.user_contacts = EntityDBRepository(
+            UserContacts,
+            db_pool,
+            statement_registry,
+            replica_router,
+            caches.get('user_contacts'),
+            trusted=True,
+            query_stats=query_stats,
+            unit_of_work=unit_of_work,
+            invalidation_bus=invalidation_bus,
+            archive_table=user_contacts_archive,
+        )
+        instance.users = EntityDBRepository(
+            Users,
+            db_pool,
+            statement_registry,
+            replica_router,
+            caches.get('users'),
+            trusted=True,
+            query_stats=query_stats,
+            unit_of_work=unit_of_work,
+            invalidation_bus=invalidation_bus,
+        )
+        instance.user_challenges = EntityDBRepository(
+            UserChallenges,
+            db_pool,
+            statement_registry,
+            replica_router,
+            caches.get('user_challenges'),
+            trusted=True,
+            query_stats=query_stats,
+            unit_of_work=unit_of_work,
+            invalidation_bus=invalidation_bus,
+            archive_table=user_challenges_archive,
+        )
         return instance
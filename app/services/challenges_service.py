@@ -1,17 +1,30 @@
+from typing import Sequence
 from uuid import UUID
 
-from app.models.challenges import Challenges
+from app.leaderboards import Leaderboards
+from app.models.challenges import Challenges, ChallengesWithParticipants
 from app.repositories.repositories import DBRepositories
-from core.repositories.errors import RowNotFoundError
-from core.starlette_ext.errors.errors import NotFoundError
+from core.repositories.errors import InvalidCursorError, RowNotFoundError
+from core.repositories.pagination import Page
+from core.starlette_ext.errors.errors import NotFoundError, ValidationError
 
 
 class ChallengesService:
-    def __init__(self, db_repos: DBRepositories):
+    def __init__(self, db_repos: DBRepositories, leaderboards: Leaderboards | None = None):
         self.db_repos = db_repos
+        self.leaderboards = leaderboards
 
-    async def get_challenges(self, **filters) -> list[Challenges]:
-        return await self.db_repos.challenges.search(**filters)
+    async def get_challenges(self, fields: list[str] | None = None, **filters) -> Page[ChallengesWithParticipants]:
+        try:
+            page = await self.db_repos.challenges.search_page(fields=self._challenge_fields(fields), **filters)
+        except InvalidCursorError as err:
+            raise ValidationError(str(err))
+        participants = await self._get_participants([challenge.id for challenge in page.items], fields)
+        return Page(
+            items=[self._with_participants(challenge, participants) for challenge in page.items],
+            next_cursor=page.next_cursor,
+            total=page.total,
+        )
 
     async def create_challenge(self, **payload) -> Challenges:
         return await self.db_repos.challenges.create(**payload)
@@ -22,14 +35,50 @@ class ChallengesService:
         except RowNotFoundError:
             raise NotFoundError(f'Challenge with id {challenge_id} not found')
 
-    async def get_challenge_by_id(self, challenge_id: UUID) -> Challenges:
+    async def get_challenge_by_id(
+        self, challenge_id: UUID, fields: list[str] | None = None
+    ) -> ChallengesWithParticipants:
         try:
-            return await self.db_repos.challenges.get_by_id(entity_id=challenge_id)
+            challenge = await self.db_repos.challenges.get_by_id(
+                entity_id=challenge_id, fields=self._challenge_fields(fields)
+            )
         except RowNotFoundError:
             raise NotFoundError(f'Challenge with id {challenge_id} not found')
+        return self._with_participants(challenge, await self._get_participants([challenge.id], fields))
+
+    async def _get_participants(
+        self, challenge_ids: Sequence[UUID], fields: list[str] | None = None
+    ) -> dict[UUID, dict[str, int]]:
+        """Participant counts per status of the challenges, read from the counters kept up to date by triggers."""
+        if not challenge_ids or (fields and 'participants' not in fields):
+            return {}
+        counters = await self.db_repos.challenge_participants.search(
+            challenge_id_in=list(challenge_ids), participants_gt=0
+        )
+        participants: dict[UUID, dict[str, int]] = {}
+        for counter in counters:
+            participants.setdefault(counter.challenge_id, {})[counter.status] = counter.participants
+        return participants
+
+    @staticmethod
+    def _challenge_fields(fields: list[str] | None) -> list[str] | None:
+        return [field for field in fields if field != 'participants'] if fields else None
+
+    @staticmethod
+    def _with_participants(
+        challenge: Challenges, participants: dict[UUID, dict[str, int]]
+    ) -> ChallengesWithParticipants:
+        # Projected challenges are partial, so the response entity is built without validation
+        return ChallengesWithParticipants.model_construct(
+            **{name: getattr(challenge, name) for name in Challenges.model_fields},
+            participants=participants.get(challenge.id, {}),
+        )
 
     async def delete_challenge_by_id(self, challenge_id: UUID) -> Challenges:
         try:
-            return await self.db_repos.challenges.archive_by_id(entity_id=challenge_id)
+            challenge = await self.db_repos.challenges.archive_by_id(entity_id=challenge_id)
         except RowNotFoundError:
             raise NotFoundError(f'Challenge with id {challenge_id} not found')
+        if self.leaderboards is not None:
+            self.leaderboards.drop(challenge_id)
+        return challenge
@@ -0,0 +1,22 @@
+from uuid import UUID
+
+from app.leaderboards import LeaderboardEntry, Leaderboards
+from core.starlette_ext.errors.errors import NotFoundError
+
+
+class LeaderboardService:
+    def __init__(self, leaderboards: Leaderboards | None):
+        self.leaderboards = leaderboards
+
+    def get_top(self, challenge_id: UUID, limit: int, offset: int = 0) -> list[LeaderboardEntry]:
+        board = self.leaderboards.board(challenge_id) if self.leaderboards is not None else None
+        if board is None:
+            raise NotFoundError(f'Leaderboard of challenge {challenge_id} not found')
+        return board.top(limit, offset)
+
+    def get_user_rank(self, challenge_id: UUID, user_id: UUID) -> LeaderboardEntry:
+        board = self.leaderboards.board(challenge_id) if self.leaderboards is not None else None
+        entry = board.rank(user_id) if board is not None else None
+        if entry is None:
+            raise NotFoundError(f'User {user_id} is not ranked in challenge {challenge_id}')
+        return entry
@@ -1,24 +1,126 @@
+import datetime
+from typing import Any, AsyncIterator
 from uuid import UUID
 
+from app.leaderboards import Leaderboards
 from app.models.user_challenges import UserChallenges
 from app.repositories.repositories import DBRepositories
+from core.repositories.errors import InvalidCursorError
+from core.repositories.pagination import Page
+from core.repositories.write_behind import WriteBehindBuffer
+from core.starlette_ext.errors.errors import ValidationError
+
+# Filters buffered updates are matched against before a search, any other filter only narrows the search further
+PENDING_MATCH_FILTERS = ('id', 'user_id', 'challenge_id')
 
 
 class UserChallengesService:
-    def __init__(self, db_repos: DBRepositories):
+    def __init__(
+        self,
+        db_repos: DBRepositories,
+        leaderboards: Leaderboards | None = None,
+        write_behind: WriteBehindBuffer | None = None,
+    ):
         self.db_repos = db_repos
+        self.leaderboards = leaderboards
+        # Updates by id are buffered and written in batches, reads by id see the buffered entity or payload
+        self.write_behind = write_behind
+
+    def _rank(self, *user_challenges: UserChallenges) -> None:
+        if self.leaderboards is not None:
+            self.leaderboards.apply(user_challenges)
+
+    def _with_pending(self, user_challenge: UserChallenges) -> UserChallenges:
+        if self.write_behind is None:
+            return user_challenge
+        pending = self.write_behind.pending(user_challenge.id)
+        buffered = self.write_behind.entity(user_challenge.id)
+        if buffered is not None and 'updated' in user_challenge.model_fields_set:
+            pending['updated'] = buffered.updated
+        return user_challenge.model_copy(update=pending) if pending else user_challenge
+
+    def _may_match_pending(self, filters: dict[str, Any]) -> bool:
+        """
+        Whether buffered updates may change the rows matched by the filters. Updates buffered without their
+        entity, or changing a filtered field, are assumed to match.
+        """
+        allowed: dict[str, set[str]] = {}
+        for name in PENDING_MATCH_FILTERS:
+            if filters.get(name) is not None:
+                allowed[name] = {str(filters[name])}
+            elif filters.get(f'{name}_in') is not None:
+                allowed[name] = {str(value) for value in filters[f'{name}_in']}
+        if not allowed:
+            return True
+        return any(
+            entity is None
+            or all(name in payload or str(getattr(entity, name)) in values for name, values in allowed.items())
+            for payload, entity in self.write_behind.pending_entities()  # type: ignore[union-attr]
+        )
+
+    async def _write_pending(self, raise_errors: bool = True) -> None:
+        # Searches should match the buffered state and other writes must not be overwritten by it later.
+        # Reads do not fail on a failed write, the failed updates stay buffered for a retry.
+        if self.write_behind is not None and len(self.write_behind):
+            await self.write_behind.flush(raise_errors=raise_errors)
 
-    async def get_user_challenges(self, **filters) -> list[UserChallenges]:
-        return await self.db_repos.user_challenges.search(**filters)
+    async def _write_pending_matching(self, filters: dict[str, Any]) -> None:
+        # Only searches of rows with buffered updates wait for them to be written
+        if self.write_behind is not None and len(self.write_behind) and self._may_match_pending(filters):
+            await self.write_behind.flush(raise_errors=False)
+
+    async def get_user_challenges(self, **filters) -> Page[UserChallenges]:
+        await self._write_pending_matching(filters)
+        try:
+            return await self.db_repos.user_challenges.search_page(**filters)
+        except InvalidCursorError as err:
+            raise ValidationError(str(err))
+
+    async def iterate_user_challenges(self, **filters) -> AsyncIterator[UserChallenges]:
+        await self._write_pending_matching(filters)
+        async for user_challenge in self.db_repos.user_challenges.iterate(**filters):
+            yield user_challenge
 
     async def create_user_challenge(self, **payload) -> UserChallenges:
-        return await self.db_repos.user_challenges.create(**payload)
+        user_challenge = await self.db_repos.user_challenges.create(**payload)
+        self._rank(user_challenge)
+        return user_challenge
 
-    async def get_user_challenge_by_id(self, user_challenge_id: UUID) -> UserChallenges:
-        return await self.db_repos.user_challenges.get_by_id(user_challenge_id)
+    async def get_user_challenge_by_id(
+        self, user_challenge_id: UUID, fields: list[str] | None = None
+    ) -> UserChallenges:
+        buffered: UserChallenges | None = (
+            self.write_behind.entity(user_challenge_id) if self.write_behind is not None else None
+        )
+        if buffered is not None and not fields:
+            return buffered
+        user_challenge = await self.db_repos.user_challenges.get_by_id(user_challenge_id, fields=fields)
+        return self._with_pending(user_challenge)
 
     async def update_user_challenge_by_id(self, user_challenge_id: UUID, **payload) -> UserChallenges:
-        return await self.db_repos.user_challenges.update_by_id(user_challenge_id, **payload)
+        if self.write_behind is not None:
+            # Read once per buffered entity, from the entity cache or batched with the other loads of the tick
+            user_challenge: UserChallenges | None = self.write_behind.entity(user_challenge_id)
+            if user_challenge is None:
+                user_challenge = self._with_pending(await self.db_repos.user_challenges.get_by_id(user_challenge_id))
+            # The database sets its own `updated` when the update is written
+            updated = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+            user_challenge = user_challenge.model_copy(update={**payload, 'updated': updated})
+            self.write_behind.add(user_challenge_id, payload, entity=user_challenge)
+            return user_challenge
+
+        user_challenge = await self.db_repos.user_challenges.update_by_id(user_challenge_id, **payload)
+        self._rank(user_challenge)
+        return user_challenge
+
+    async def update_user_challenges(self, rows: list[dict]) -> list[UserChallenges]:
+        await self._write_pending()
+        user_challenges = await self.db_repos.user_challenges.update_many(rows)
+        self._rank(*user_challenges)
+        return user_challenges
 
     async def delete_user_challenge_by_id(self, user_challenge_id: UUID) -> UserChallenges:
-        return await self.db_repos.user_challenges.archive_by_id(user_challenge_id)
+        await self._write_pending()
+        user_challenge = await self.db_repos.user_challenges.archive_by_id(user_challenge_id)
+        self._rank(user_challenge)
+        return user_challenge
@@ -2,16 +2,20 @@ from uuid import UUID
 
 from app.models.user_contacts import UserContacts
 from app.repositories.repositories import DBRepositories
-from core.repositories.errors import RowNotFoundError
-from core.starlette_ext.errors.errors import NotFoundError
+from core.repositories.errors import InvalidCursorError, RowNotFoundError
+from core.repositories.pagination import Page
+from core.starlette_ext.errors.errors import NotFoundError, ValidationError
 
 
 class UserContactsService:
     def __init__(self, db_repos: DBRepositories):
         self.db_repos = db_repos
 
-    async def get_user_contacts(self, **filters) -> list[UserContacts]:
-        return await self.db_repos.user_contacts.search(**filters)
+    async def get_user_contacts(self, **filters) -> Page[UserContacts]:
+        try:
+            return await self.db_repos.user_contacts.search_page(**filters)
+        except InvalidCursorError as err:
+            raise ValidationError(str(err))
 
     async def create_user_contact(self, **payload) -> UserContacts:
         return await self.db_repos.user_contacts.create(**payload)
@@ -22,9 +26,9 @@ class UserContactsService:
         except RowNotFoundError:
             raise NotFoundError(f'User contact with id {contact_id} not found')
 
-    async def get_user_contact_by_id(self, contact_id: UUID) -> UserContacts:
+    async def get_user_contact_by_id(self, contact_id: UUID, fields: list[str] | None = None) -> UserContacts:
         try:
-            return await self.db_repos.user_contacts.get_by_id(entity_id=contact_id)
+            return await self.db_repos.user_contacts.get_by_id(entity_id=contact_id, fields=fields)
         except RowNotFoundError:
             raise NotFoundError(f'User contact with id {contact_id} not found')
 
@@ -34,8 +38,8 @@ class UserContactsService:
         except RowNotFoundError:
             raise NotFoundError(f'User contact with id {contact_id} not found')
 
-    async def get_contacts_by_user_id(self, user_id: UUID) -> list[UserContacts]:
+    async def get_contacts_by_user_id(self, user_id: UUID, **params) -> Page[UserContacts]:
         try:
-            return await self.db_repos.user_contacts.search(user_id=user_id)
-        except RowNotFoundError:
-            raise NotFoundError(f'User with id {user_id} not found')
+            return await self.db_repos.user_contacts.search_page(user_id=user_id, **params)
+        except InvalidCursorError as err:
+            raise ValidationError(str(err))
@@ -2,16 +2,20 @@ from uuid import UUID
 
 from app.models.user import Users
 from app.repositories.repositories import DBRepositories
-from core.repositories.errors import RowNotFoundError
-from core.starlette_ext.errors.errors import NotFoundError
+from core.repositories.errors import InvalidCursorError, RowNotFoundError
+from core.repositories.pagination import Page
+from core.starlette_ext.errors.errors import NotFoundError, ValidationError
 
 
 class UserService:
     def __init__(self, db_repos: DBRepositories):
         self.db_repos = db_repos
 
-    async def get_users(self, **filters) -> list[Users]:
-        return await self.db_repos.users.search(**filters)
+    async def get_users(self, **filters) -> Page[Users]:
+        try:
+            return await self.db_repos.users.search_page(**filters)
+        except InvalidCursorError as err:
+            raise ValidationError(str(err))
 
     async def create_user(self, **payload) -> Users:
         return await self.db_repos.users.create(**payload)
@@ -22,9 +26,9 @@ class UserService:
         except RowNotFoundError:
             raise NotFoundError(f'User with id {user_id} not found')
 
-    async def get_user_by_id(self, user_id: UUID) -> Users:
+    async def get_user_by_id(self, user_id: UUID, fields: list[str] | None = None) -> Users:
         try:
-            return await self.db_repos.users.get_by_id(entity_id=user_id)
+            return await self.db_repos.users.get_by_id(entity_id=user_id, fields=fields)
         except RowNotFoundError:
             raise NotFoundError(f'User with id {user_id} not found')
 
@@ -0,0 +1,29 @@
+import timeit
+import uuid
+
+from app.models import UserChallenges
+from core.repositories.query import _compile_query, compile_query, compiled_query_cache, get_by_id, search
+
+NUMBER = 5000
+
+
+def uncached_compile_query(query) -> tuple[str, list]:
+    compiled, new_query, param_names = _compile_query(query)
+    return new_query, [compiled.params[name] for name in param_names]
+
+
+def bench(name: str, build_query) -> None:
+    uncached = timeit.timeit(lambda: uncached_compile_query(build_query()), number=NUMBER)
+    compiled_query_cache.clear()
+    cached = timeit.timeit(lambda: compile_query(build_query()), number=NUMBER)
+    print(f'{name:<12} uncached: {uncached / NUMBER * 1e6:8.1f} us  cached: {cached / NUMBER * 1e6:8.1f} us')
+
+
+if __name__ == '__main__':
+    table = UserChallenges.__table__  # type: ignore[attr-defined]
+    bench('get_by_id', lambda: get_by_id(table, uuid.uuid4()))
+    bench(
+        'search',
+        lambda: search(table, order_by='-created', limit=20, offset=40).where(table.columns.user_id == uuid.uuid4()),
+    )
+    print(compiled_query_cache.stats())
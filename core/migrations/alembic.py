@@ -1,9 +1,10 @@
 from logging.config import fileConfig
 
+from alembic.script import ScriptDirectory
 from sqlalchemy import MetaData, engine_from_config, pool
 
 from alembic import context
-from alembic.script import ScriptDirectory
+from core.repositories.partitions import is_hash_partition
 
 config = context.config
 
@@ -23,6 +24,18 @@ def rename_revision(context, revision, directives):
     return directives
 
 
+def skip_partitions(target_metadata: MetaData | list[MetaData]):
+    """Excludes the partitions of partitioned tables from autogenerate, they are created by migrations."""
+    metadatas = target_metadata if isinstance(target_metadata, list) else [target_metadata]
+
+    def include_object(object, name, type_, reflected, compare_to):
+        if type_ == 'table' and reflected and compare_to is None:
+            return not any(is_hash_partition(name, object.schema, metadata) for metadata in metadatas)
+        return True
+
+    return include_object
+
+
 def run_migrations_offline(target_metadata, version_table_schema):
     """Run migrations in 'offline' mode.
 
@@ -71,6 +84,7 @@ def run_migrations_online(target_metadata, version_table_schema):
             version_table_schema=version_table_schema,
             process_revision_directives=rename_revision,
             include_schemas=True,
+            include_object=skip_partitions(target_metadata),
         )
 
         with context.begin_transaction():
@@ -0,0 +1,119 @@
+import asyncio
+import datetime
+import time
+from logging import getLogger
+from typing import TYPE_CHECKING, Any, Sequence
+
+from asyncpg import InterfaceError, PostgresError  # type: ignore
+from sqlalchemy import Column, Index, MetaData, PrimaryKeyConstraint, Table
+
+if TYPE_CHECKING:
+    from core.repositories.entity_db import EntityDBRepository
+
+logger = getLogger(__name__)
+
+
+def archive_table(table: Table, metadata: MetaData | None = None) -> Table:
+    """
+    Cold storage table of the archived rows of `table`, named `<table>_archive`.
+
+    It has the columns and primary key of the table, without foreign keys, defaults, unique indexes
+    (an archived row must not block the reuse of its unique values) or partitioning.
+    Every index of the table becomes a plain index on the same columns, partial indexes on not archived rows
+    would be empty.
+    """
+    name = f'{table.name}_archive'
+    columns = [Column(column.name, column.type, nullable=column.nullable) for column in table.columns]
+    indexes = {tuple(column.name for column in index.columns) for index in table.indexes}
+    return Table(
+        name,
+        metadata if metadata is not None else table.metadata,
+        *columns,
+        PrimaryKeyConstraint(*(column.name for column in table.primary_key.columns), name=f'{name}_pkey'),
+        *(Index(f'{name}_{"_".join(col_names)}_idx', *col_names) for col_names in sorted(indexes)),
+        schema=table.schema,
+    )
+
+
+class ArchivalWorker:
+    """
+    Moves the rows archived more than `retention` ago (by their `updated` time) from the hot tables
+    to their archive tables, so the hot tables and their indexes only keep recently archived rows.
+
+    Every batch is a single statement that locks its rows with FOR UPDATE SKIP LOCKED: rows being written
+    are left for the next pass and concurrent workers (e.g. one per process) split the rows between them.
+    """
+
+    def __init__(
+        self,
+        repositories: Sequence['EntityDBRepository'],
+        retention: datetime.timedelta,
+        batch_size: int = 1000,
+        interval: float = 600.0,
+        pause: float = 0.1,
+    ):
+        """
+        Args:
+            repositories: Repositories of the archived tables, all with an archive table
+            retention: Time archived rows are kept in the hot tables
+            batch_size: Maximum number of rows moved per statement
+            interval: Seconds between two passes of `run`
+            pause: Seconds between two batches, leaves room to the other queries
+        """
+        if any(repository.archive_table is None for repository in repositories):
+            raise ValueError('Archived tables need an archive table')
+        self.repositories = list(repositories)
+        self.retention = retention
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pause = pause
+        self.moved: dict[str, int] = {repository.entity_table.name: 0 for repository in repositories}
+        self.passes = 0
+        self.failures = 0
+        self.last_pass_at: float | None = None
+        self.last_pass_time = 0.0
+
+    async def archive(self, repository: 'EntityDBRepository') -> int:
+        """Move the archived rows of one table, batch by batch, until none is left."""
+        # `updated` is a naive timestamp in UTC
+        archived_before = datetime.datetime.now(datetime.UTC).replace(tzinfo=None) - self.retention
+        moved = 0
+        while True:
+            batch = await repository.move_archived(archived_before, self.batch_size)
+            moved += batch
+            self.moved[repository.entity_table.name] += batch
+            # A short batch means the remaining rows are locked or there are none
+            if batch < self.batch_size:
+                return moved
+            await asyncio.sleep(self.pause)
+
+    async def run_once(self) -> dict[str, int]:
+        """One pass over all tables, returns the number of moved rows per table."""
+        started = time.perf_counter()
+        moved = {repository.entity_table.name: await self.archive(repository) for repository in self.repositories}
+        self.passes += 1
+        self.last_pass_at = time.time()
+        self.last_pass_time = time.perf_counter() - started
+        logger.debug(f'Archival pass moved {moved} in {self.last_pass_time:.3f}s')
+        return moved
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except (OSError, TimeoutError, PostgresError, InterfaceError) as err:
+                self.failures += 1
+                logger.warning(f'Archival pass failed: {err!r}')
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'retention': self.retention.total_seconds(),
+            'batch_size': self.batch_size,
+            'interval': self.interval,
+            'moved': dict(self.moved),
+            'passes': self.passes,
+            'failures': self.failures,
+            'last_pass_at': self.last_pass_at,
+            'last_pass_time': self.last_pass_time,
+        }
@@ -0,0 +1,46 @@
+import time
+from collections import OrderedDict
+from enum import StrEnum
+from typing import Any, Hashable
+
+
+class CountMode(StrEnum):
+    EXACT = 'exact'
+    CACHED = 'cached'
+    ESTIMATED = 'estimated'
+
+
+class CountCache:
+    """
+    Short-TTL LRU cache of exact counts keyed by table and filter set.
+    """
+
+    def __init__(self, ttl: float = 5.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._counts: OrderedDict[Hashable, tuple[float, int]] = OrderedDict()
+
+    @staticmethod
+    def key(table_name: str, filters: dict[str, Any]) -> Hashable:
+        return table_name, repr(sorted(filters.items()))
+
+    def get(self, key: Hashable) -> int | None:
+        cached = self._counts.get(key)
+        if cached is None:
+            return None
+
+        expires_at, value = cached
+        if expires_at < time.monotonic():
+            del self._counts[key]
+            return None
+        self._counts.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: int) -> None:
+        self._counts[key] = (time.monotonic() + self.ttl, value)
+        self._counts.move_to_end(key)
+        while len(self._counts) > self.maxsize:
+            self._counts.popitem(last=False)
+
+
+count_cache = CountCache()
@@ -1,12 +1,25 @@
 import contextvars
-from contextlib import asynccontextmanager
-from typing import Any, Mapping, Union
+import time
+from contextlib import asynccontextmanager, nullcontext
+from logging import getLogger
+from typing import Any, AsyncIterator, Mapping, Union
 
-from asyncpg import Connection, Pool  # type: ignore
+import ujson
+from asyncpg import Connection, Pool, PostgresConnectionError  # type: ignore
 
-from core.repositories.query import compile_query
+from core.repositories.deadline import remaining_budget
+from core.repositories.pool import ObservablePool
+from core.repositories.prepared import StatementStats
+from core.repositories.query import compile_query, is_read_only
+from core.repositories.replicas import ReplicaRouter
+from core.repositories.stats import QueryStats
+from core.repositories.unit_of_work import UnitOfWork
 
-db_ctx: contextvars.ContextVar[Union[Pool, Connection]] = contextvars.ContextVar('connection')
+CURSOR_PREFETCH = 500
+
+logger = getLogger(__name__)
+
+db_ctx: contextvars.ContextVar[Union[Pool, ObservablePool, Connection]] = contextvars.ContextVar('connection')
 
 
 class DBRepository:
@@ -14,16 +27,34 @@ class DBRepository:
     Database repository that works with a connection pool.
     """
 
-    def __init__(self, db_pool: Pool):
+    def __init__(
+        self,
+        db_pool: Pool | ObservablePool,
+        statement_registry: StatementStats | None = None,
+        replica_router: ReplicaRouter | None = None,
+        query_stats: QueryStats | None = None,
+        unit_of_work: UnitOfWork | None = None,
+    ):
         """
         Initialize repository with a connection pool.
         Sets the pool in the context.
 
         Args:
             db_pool: Connection pool
+            statement_registry: Registry of prepared statements statistics, statements are not recorded if not set
+            replica_router: Router of read queries to replicas, everything goes to the primary if not set
+            query_stats: Collector of query statistics and slow queries, queries are not recorded if not set
+            unit_of_work: Request-scoped connection shared with other repositories, every query acquires
+                a connection from the pool if not set
         """
         self._db_pool = db_pool
-        db_ctx.set(db_pool)
+        self._statement_registry = statement_registry
+        self._replica_router = replica_router
+        self._query_stats = query_stats
+        self._unit_of_work = unit_of_work
+        # Repositories created inside a `connection` or `transaction` block must keep using its connection
+        if not isinstance(db_ctx.get(None), Connection):
+            db_ctx.set(db_pool)
 
     @asynccontextmanager
     async def connection(self):
@@ -31,66 +62,225 @@ class DBRepository:
         Context manager that provides database connection from the pool.
         Handles different scenarios:
         1. If there's an active connection in context, uses it
-        2. If there's a pool in context, acquires a new connection from it
+        2. If there's a unit of work, uses its request-scoped connection
+        3. If there's a pool in context, acquires a new connection from it
         """
-        con = db_ctx.get()
+        # Repositories created in another task (e.g. a cancellable endpoint execution) did not set the context
+        con = db_ctx.get(self._db_pool)
         # If there's an active connection in context, use it
         if isinstance(con, Connection):
             yield con
             return
 
-        # If there's a pool in context, acquire a new connection
-        if isinstance(con, Pool):
-            async with con.acquire() as conn:
+        if self._unit_of_work is not None:
+            async with self._unit_of_work.connection() as conn:
                 db_ctx.set(conn)
                 try:
                     yield conn
                 finally:
                     db_ctx.set(self._db_pool)
+            return
+
+        # Otherwise there's a pool in context, acquire a new connection
+        async with con.acquire(timeout=remaining_budget()) as conn:
+            db_ctx.set(conn)
+            try:
+                yield conn
+            finally:
+                db_ctx.set(self._db_pool)
 
     """
     Abstract base database repository that defines common interface for all repositories.
     """
 
+    def _mark_write(self) -> None:
+        if self._replica_router is not None:
+            self._replica_router.mark_write()
+
+    @asynccontextmanager
+    async def query_connection(self, query, primary: bool = False):
+        """
+        Context manager that provides a connection suitable for the query.
+        Read-only queries outside of an active connection go to a replica when the replica router
+        allows it (and `primary` is not set), everything else goes through the `connection` context manager.
+        """
+        replica = None
+        if not is_read_only(query):
+            self._mark_write()
+        elif (
+            not primary
+            and self._replica_router is not None
+            and not isinstance(db_ctx.get(self._db_pool), Connection)
+            and not (self._unit_of_work is not None and self._unit_of_work.transactional)
+        ):
+            replica = self._replica_router.pool_for_read()
+
+        if replica is not None:
+            timeout = remaining_budget()
+            try:
+                con = await replica.acquire(timeout=timeout)
+            except TimeoutError:
+                # A busy replica pool is not a broken replica
+                raise
+            except (OSError, PostgresConnectionError) as err:
+                logger.warning(f'Replica is unavailable, falling back to primary: {err}')
+                self._replica_router.mark_unavailable(replica)  # type: ignore[union-attr]
+            else:
+                try:
+                    yield con
+                finally:
+                    await replica.release(con)
+                return
+
+        async with self.connection() as con:
+            yield con
+
     @asynccontextmanager
     async def transaction(self):
         """
         Context manager that provides a database transaction.
         Uses the connection context manager internally.
         """
+        self._mark_write()
+        async with self.connection() as con, con.transaction():
+            yield con
+
+    async def _execute(self, con: Connection, method: str, compiled_query: str, compiled_params: list[Any]) -> Any:
+        # The rest of the request latency budget, asyncpg cancels the statement on the server when it runs out
+        timeout = remaining_budget()
+        # Commands are not recorded by the registry, asyncpg caches their statements all the same
+        if self._statement_registry is None or method == 'execute':
+            return await getattr(con, method)(compiled_query, *compiled_params, timeout=timeout)
+        return await self._statement_registry.execute(con, method, compiled_query, compiled_params, timeout)
+
+    async def _run(self, query, method: str, primary: bool = False) -> Any:
+        """
+        Run `method` of the connection suitable for the query and record its statistics.
+        """
+        compiled_query, compiled_params = compile_query(query)
+        if self._query_stats is None:
+            async with self.query_connection(query, primary) as con:
+                return await self._execute(con, method, compiled_query, compiled_params)
+
+        result = None
+        failed = True
+        requested = time.perf_counter()
+        acquired = requested
+        try:
+            async with self.query_connection(query, primary) as con:
+                acquired = time.perf_counter()
+                result = await self._execute(con, method, compiled_query, compiled_params)
+                failed = False
+                return result
+        finally:
+            elapsed = time.perf_counter() - acquired
+            rows = len(result) if isinstance(result, list) else int(result is not None and method == 'fetchrow')
+            slow_query = self._query_stats.record(compiled_query, elapsed, rows, acquired - requested, failed)
+            if slow_query is not None and is_read_only(query):
+                self._query_stats.sample_plan(self._db_pool, slow_query, compiled_params)
+
+    async def execute(self, query) -> str:
+        """
+        Execute a query without returning rows.
+
+        Args:
+            query: Query to execute
+
+        Returns:
+            Status of the last SQL command
+        """
+        return await self._run(query, 'execute')  # type: ignore[no-any-return]
+
+    async def explain(self, query, options: str = 'FORMAT JSON') -> Any:
+        """
+        Get the execution plan of a query.
+
+        Args:
+            query: Query to explain
+            options: EXPLAIN options
+
+        Returns:
+            Parsed JSON plan
+        """
+        compiled_query, compiled_params = compile_query(query)
         async with self.connection() as con:
-            async with con.transaction():
-                yield con
+            plan = await con.fetchval(
+                f'EXPLAIN ({options}) {compiled_query}', *compiled_params, timeout=remaining_budget()
+            )
+            return ujson.loads(plan)
 
-    async def fetch(self, query) -> list[dict]:
+    async def copy_records(
+        self, table_name: str, columns: list[str], records: list[tuple], schema_name: str | None = None
+    ) -> str:
+        """
+        Load records into a table with binary COPY.
+
+        Args:
+            table_name: Target table name
+            columns: Target columns in the order of record values
+            records: Records to copy
+            schema_name: Target table schema
+
+        Returns:
+            Status of the COPY command
+        """
+        self._mark_write()
+        async with self.connection() as con:
+            return await con.copy_records_to_table(  # type: ignore[no-any-return]
+                table_name, records=records, columns=columns, schema_name=schema_name, timeout=remaining_budget()
+            )
+
+    async def fetch(self, query, primary: bool = False) -> list[dict]:
         """
         Execute a query and return all results as a list of dictionaries.
 
         Args:
             query: Query to execute
+            primary: Read from the primary even if the query could go to a replica
 
         Returns:
             List of dictionaries containing query results
         """
+        records = await self._run(query, 'fetch', primary)
+        return [dict(record) for record in records]
+
+    async def cursor(self, query, prefetch: int = CURSOR_PREFETCH) -> AsyncIterator[dict]:
+        """
+        Execute a query with a server-side cursor and yield rows one by one.
+        Holds a connection and a transaction until the iteration is finished or closed.
+
+        Args:
+            query: Query to execute
+            prefetch: Number of rows fetched from the server per round trip
+
+        Yields:
+            Dictionaries containing row data
+        """
         compiled_query, compiled_params = compile_query(query)
-        async with self.connection() as con:
-            records = await con.fetch(compiled_query, *compiled_params)
-            return [dict(record) for record in records]
+        # Cursors need a transaction, a read-only one is opened unless the connection already is in one.
+        # Reading is not a write: the query may go to a replica and later reads are not pinned to the primary.
+        async with (
+            self.query_connection(query) as con,
+            nullcontext() if con.is_in_transaction() else con.transaction(readonly=True),
+        ):
+            # The budget left when the cursor is opened bounds every round trip of the iteration
+            cursor = con.cursor(compiled_query, *compiled_params, prefetch=prefetch, timeout=remaining_budget())
+            async for record in cursor:
+                yield dict(record)
 
-    async def fetchrow(self, query) -> Mapping[str, Any] | None:
+    async def fetchrow(self, query, primary: bool = False) -> Mapping[str, Any] | None:
         """
         Execute a query and return a single row as a dictionary.
 
         Args:
             query: Query to execute
+            primary: Read from the primary even if the query could go to a replica
 
         Returns:
             Dictionary containing the row data or None if no results
         """
-        compiled_query, compiled_params = compile_query(query)
-        async with self.connection() as con:
-            record = await con.fetchrow(compiled_query, *compiled_params)
-            return dict(record) if record else None
+        record = await self._run(query, 'fetchrow', primary)
+        return dict(record) if record else None
 
     async def fetchval(self, query) -> Any:
         """
@@ -102,6 +292,4 @@ class DBRepository:
         Returns:
             The value from the first column of the first row
         """
-        compiled_query, compiled_params = compile_query(query)
-        async with self.connection() as con:
-            return await con.fetchval(compiled_query, *compiled_params)
+        return await self._run(query, 'fetchval')
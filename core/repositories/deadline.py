@@ -0,0 +1,37 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from core.repositories.errors import DeadlineExceededError
+
+# Monotonic time by which the current request must be done, no limit if None
+deadline_ctx: contextvars.ContextVar[float | None] = contextvars.ContextVar('deadline', default=None)
+
+
+@contextmanager
+def deadline(budget: float | None) -> Iterator[None]:
+    """
+    Set the latency budget in seconds of the code in the block, no limit if None.
+    """
+    token = deadline_ctx.set(time.monotonic() + budget if budget is not None else None)
+    try:
+        yield
+    finally:
+        deadline_ctx.reset(token)
+
+
+def remaining_budget() -> float | None:
+    """
+    Get the time left until the deadline, used as the timeout of database operations.
+
+    Raises:
+        DeadlineExceededError: If the deadline has already passed
+    """
+    current_deadline = deadline_ctx.get()
+    if current_deadline is None:
+        return None
+    remaining = current_deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceededError('Latency budget exceeded')
+    return remaining
@@ -0,0 +1,47 @@
+from enum import Enum
+from functools import lru_cache
+from types import UnionType
+from typing import Any, Callable, Mapping, Union, get_args, get_origin
+
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.orm.instrumentation import manager_of_class
+from sqlmodel import SQLModel
+
+
+def _enum_type(annotation: Any) -> type[Enum] | None:
+    if get_origin(annotation) in (Union, UnionType):
+        return next((arg for arg in get_args(annotation) if isinstance(arg, type) and issubclass(arg, Enum)), None)
+    return annotation if isinstance(annotation, type) and issubclass(annotation, Enum) else None
+
+
+@lru_cache
+def entity_constructor[Entity: SQLModel](entity: type[Entity]) -> Callable[[Mapping[str, Any]], Entity]:
+    """
+    Build a constructor of trusted entities from database rows of the entity table.
+
+    Rows of our own tables already have the types of the entity fields, so pydantic validation
+    is skipped: the instance is created through the SQLAlchemy class manager (as `model_validate`
+    does for table models) and the row values are put into its __dict__ directly.
+    Enum fields stored as strings are the only values converted.
+    """
+    configure_mappers()
+    manager = manager_of_class(entity)
+    field_names = tuple(entity.model_fields)
+    enum_fields = {
+        name: enum_type for name, field in entity.model_fields.items() if (enum_type := _enum_type(field.annotation))
+    }
+
+    def construct(row: Mapping[str, Any]) -> Entity:
+        values = {name: row[name] for name in field_names if name in row}
+        for name, enum_type in enum_fields.items():
+            if values.get(name) is not None:
+                values[name] = enum_type(values[name])
+
+        instance = manager.new_instance()
+        instance.__dict__.update(values)
+        object.__setattr__(instance, '__pydantic_fields_set__', set(values))
+        object.__setattr__(instance, '__pydantic_extra__', None)
+        object.__setattr__(instance, '__pydantic_private__', None)
+        return instance  # type: ignore[no-any-return]
+
+    return construct
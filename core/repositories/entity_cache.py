@@ -0,0 +1,83 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class EntityCache:
+    """
+    In-process read-through LRU cache of entities by ID with a TTL.
+
+    Every invalidation bumps the cache generation: an entity loaded before the last invalidation
+    is not stored, so a read racing with a write cannot put a stale row back into the cache.
+    """
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 10_000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entities: OrderedDict[str, tuple[float, BaseModel]] = OrderedDict()
+
+    def get(self, entity_id: Any) -> BaseModel | None:
+        key = str(entity_id)
+        cached = self._entities.get(key)
+        if cached is None or cached[0] < time.monotonic():
+            if cached is not None:
+                del self._entities[key]
+            self.misses += 1
+            return None
+
+        self._entities.move_to_end(key)
+        self.hits += 1
+        return cached[1].model_copy()
+
+    def put(self, entity_id: Any, entity: BaseModel, generation: int) -> None:
+        if generation != self.generation:
+            return
+
+        key = str(entity_id)
+        self._entities[key] = (time.monotonic() + self.ttl, entity.model_copy())
+        self._entities.move_to_end(key)
+        while len(self._entities) > self.maxsize:
+            self._entities.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *entity_ids: Any) -> None:
+        self.generation += 1
+        for entity_id in entity_ids:
+            if self._entities.pop(str(entity_id), None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entities.clear()
+
+    def memory_usage(self) -> int:
+        """
+        Approximate size of the cached entities in bytes.
+        """
+        size = sys.getsizeof(self._entities)
+        for key, (_, entity) in self._entities.items():
+            size += sys.getsizeof(key) + sys.getsizeof(entity) + sys.getsizeof(entity.__dict__)
+            size += sum(sys.getsizeof(value) for value in entity.__dict__.values())
+        return size
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entities),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'memory_bytes': self.memory_usage(),
+        }
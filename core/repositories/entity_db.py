@@ -1,88 +1,421 @@
-from typing import Any, Type, Union
+import datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Hashable, Mapping, Sequence, Type, Union, cast
 from uuid import UUID
 
 from asyncpg import Pool
-from sqlalchemy import ColumnElement, Select, Table, Update, column
+from pydantic import TypeAdapter
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import Select, Table, UniqueConstraint, Update, false
 from sqlmodel import SQLModel
 
-from core.repositories.db import DBRepository
-from core.repositories.errors import RowNotFoundError
-from core.repositories.query import count, create, get_by_id, search, update, update_by_id
+from core.repositories.counts import CountCache, CountMode, count_cache
+from core.repositories.db import CURSOR_PREFETCH, DBRepository
+from core.repositories.decoding import entity_constructor
+from core.repositories.entity_cache import EntityCache
+from core.repositories.errors import InvalidCursorError, RowNotFoundError
+from core.repositories.filters import filter_plan
+from core.repositories.invalidation import InvalidationBus
+from core.repositories.loader import EntityLoader
+from core.repositories.pagination import DEFAULT_PAGE_SIZE, Page, decode_cursor, encode_cursor
+from core.repositories.partitions import partition_key
+from core.repositories.pool import ObservablePool
+from core.repositories.prepared import StatementStats
+from core.repositories.query import (
+    copy_records,
+    count,
+    create,
+    create_from_staging,
+    create_staging_table,
+    drop_staging_table,
+    estimate_count,
+    get_by_id,
+    get_by_ids,
+    keyset_columns,
+    move_archived,
+    notify,
+    search,
+    update,
+    update_by_id,
+    update_many,
+    upsert,
+)
+from core.repositories.replicas import ReplicaRouter
+from core.repositories.stats import QueryStats
+from core.repositories.unit_of_work import UnitOfWork
+
+COPY_CHUNK_SIZE = 10_000
+UPDATE_CHUNK_SIZE = 5_000
+
+
+def _comparable(value: Any) -> Any:
+    return str(value) if isinstance(value, Enum) else value
+
+
+@lru_cache
+def _type_adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
 
 
 class EntityDBRepository[Entity: SQLModel](DBRepository):
     base_search_query: Select | None = None
+    count_cache: CountCache = count_cache
+    # Planner estimates below this value are replaced with an exact count
+    count_estimate_threshold: int = 10_000
 
-    def __init__(self, entity: Type[Entity], db_pool: Pool):
-        super().__init__(db_pool)
+    def __init__(
+        self,
+        entity: Type[Entity],
+        db_pool: Pool | ObservablePool,
+        statement_registry: StatementStats | None = None,
+        replica_router: ReplicaRouter | None = None,
+        entity_cache: EntityCache | None = None,
+        trusted: bool = False,
+        query_stats: QueryStats | None = None,
+        unit_of_work: UnitOfWork | None = None,
+        invalidation_bus: InvalidationBus | None = None,
+        archive_table: Table | None = None,
+    ):
+        super().__init__(db_pool, statement_registry, replica_router, query_stats, unit_of_work)
         self.entity = entity
         self.entity_table: Table = entity.__table__  # type: ignore[attr-defined]
+        self.loader: EntityLoader[Entity] = EntityLoader(self)
+        self.entity_cache = entity_cache
+        self.invalidation_bus = invalidation_bus
+        self.filter_plan = filter_plan(self.entity_table)
+        self.search_filter_plan = filter_plan(self.entity_table, self.base_search_query)
+        # Filters on all of these columns let Postgres read a single partition
+        self.partition_key = partition_key(self.entity_table)
+        # Cold storage of the archived rows moved out of the table, read on demand
+        self.archive_table = archive_table
+        self.archive_filter_plan = filter_plan(archive_table) if archive_table is not None else None
+        # Rows of a trusted table are built into entities without pydantic validation
+        self._to_entity: Callable[[Mapping[str, Any]], Entity] = (
+            entity_constructor(entity) if trusted else entity.model_validate
+        )
+
+    def _to_entities(self, rows: list[dict]) -> list[Entity]:
+        to_entity = self._to_entity
+        return [to_entity(row) for row in rows]
 
-    def _get_filter_bool_expression(
-        self, filter_name: str, filter_value: Any, base_query: Select | None = None
-    ) -> ColumnElement[bool]:
-        if base_query is not None and filter_name in base_query.columns:
-            return column(filter_name).__eq__(filter_value)
-        elif base_query is None and filter_name in self.entity_table.columns:
-            return self.entity_table.columns[filter_name].__eq__(filter_value)
-
-        split_by_underscore = filter_name.split('_')
-        sign = split_by_underscore.pop()
-        col_name = '_'.join(split_by_underscore)
-        col = column(col_name) if base_query is not None else self.entity_table.columns[col_name]
-
-        if sign in {'lt', 'le', 'gt', 'ge', 'ne'}:
-            return getattr(col, f'__{sign}__')(filter_value)  # type: ignore[no-any-return]
-        elif sign == 'in':
-            return col.in_(filter_value)
-        elif sign == 'notin':
-            return ~col.in_(filter_value)
-        elif sign == 'is':
-            return col.is_(filter_value)
-        elif sign == 'isnot':
-            return col.is_not(filter_value)
-        elif sign == 'like':
-            return col.like(filter_value)
-        elif sign == 'ilike':
-            return col.ilike(filter_value)
-
-        raise ValueError(f'Unknown filter name ({filter_name})')
+    def _projection(self, fields: Sequence[str] | None, *required: str) -> list[str] | None:
+        """Columns to select for the requested fields, always with the id and the required columns."""
+        if not fields:
+            return None
+        return list(dict.fromkeys(['id', *required, *fields]))
+
+    def _to_projected_entities(self, rows: list[dict], columns: list[str] | None) -> list[Entity]:
+        # Partial rows can not be validated, they are built as entities with only the selected fields set
+        if columns is None:
+            return self._to_entities(rows)
+        to_entity = entity_constructor(self.entity)
+        return [to_entity(row) for row in rows]
+
+    def _conflict_target(self, columns: Sequence[str]) -> list[str] | None:
+        """
+        Find the primary key or a unique index/constraint covered by the given columns.
+        """
+        table = self.entity_table
+        candidates = [[col.name for col in table.primary_key.columns]]
+        candidates += [[col.name for col in index.columns] for index in table.indexes if index.unique]
+        candidates += [
+            [col.name for col in constraint.columns]
+            for constraint in table.constraints
+            if isinstance(constraint, UniqueConstraint)
+        ]
+        return next((candidate for candidate in candidates if candidate and set(candidate) <= set(columns)), None)
+
+    def _in_partition[Query: (Select, Update)](self, query: Query, partition: Mapping[str, Any] | None) -> Query:
+        """
+        Restrict a query by id to the partition of the entity, otherwise every partition is searched for the id.
+        The primary key of a partitioned table includes its partition key, lookups by id alone rely on ids being
+        unique across the partitions (e.g. generated ids and a unique index on id in every partition).
+        """
+        if not partition:
+            return query
+        if set(partition) != set(self.partition_key):
+            raise ValueError(f'Partition of {self.entity_table.fullname} is given by {self.partition_key}')
+        return query.where(*(self.entity_table.columns[col_name] == value for col_name, value in partition.items()))
+
+    async def _invalidate_cached(self, rows: list[dict]) -> None:
+        """Drop the changed rows from the local cache and announce them to the caches of the other processes."""
+        if not rows:
+            return
+        entity_ids = [row['id'] for row in rows]
+        cache = self.entity_cache
+        if cache is not None:
+            cache.invalidate(*entity_ids)
+            if self._unit_of_work is not None:
+                # Inside a request-wide transaction the old row stays visible to other requests until the commit,
+                # one of them could cache it again in the meantime
+                self._unit_of_work.after_commit(lambda: cache.invalidate(*entity_ids))
+        # Other processes may cache the table even if this one does not
+        if self.invalidation_bus is not None:
+            for payload in self.invalidation_bus.payloads(self.entity_table.name, entity_ids):
+                await self.execute(notify(self.invalidation_bus.channel, payload))
+
+    def _decode_keyset(self, cursor: str, order_by: str) -> list[Any]:
+        values = decode_cursor(cursor, order_by)
+        col_names = keyset_columns(order_by)
+        if len(values) != len(col_names):
+            raise InvalidCursorError('Cursor does not match the requested ordering')
+
+        keyset = []
+        for col_name, value in zip(col_names, values):
+            field = self.entity.model_fields.get(col_name)
+            annotation = field.annotation if field is not None else None
+            if annotation is None:
+                keyset.append(value)
+                continue
+            try:
+                # mypy does not see type[Any] as Hashable
+                keyset.append(_type_adapter(cast(Hashable, annotation)).validate_python(value))
+            except PydanticValidationError:
+                raise InvalidCursorError('Malformed cursor')
+        return keyset
 
     def _apply_filters(
         self, query: Union[Select[Any], Update], base_query: Select | None = None, **filters
     ) -> Union[Select[Any], Update]:
-        for filter_name, filter_value in filters.items():
-            query = query.where(self._get_filter_bool_expression(filter_name, filter_value, base_query=base_query))
+        plan = self.search_filter_plan if base_query is not None else self.filter_plan
+        return plan.apply(query, filters)
+
+    def _soft_delete_filters(self, filters: dict[str, Any], include_archived: bool) -> dict[str, Any]:
+        """Exclude archived rows unless they are included or the `archived` filter is set explicitly."""
+        if 'archived' not in self.search_filter_plan.filters:
+            return filters
+        archived = filters.get('archived', None if include_archived else False)
+        if archived is False:
+            # A literal predicate lets generic plans use the partial indexes on `archived = false`
+            return {**filters, 'archived': false()}
+        return filters
 
-        return query
+    def _not_archived(self, query: Select) -> Select:
+        if 'archived' not in self.entity_table.columns:
+            return query
+        return query.where(self.entity_table.columns.archived == false())
 
-    async def count(self, **filters) -> int:
-        query: Select[tuple[int]] = count(self.entity_table, base_query=self.base_search_query)
-        filtered_query = self._apply_filters(query, base_query=self.base_search_query, **filters)
+    def _push_down_filters(self, filters: dict[str, Any]) -> tuple[Select | None, dict[str, Any]]:
+        """Apply the filters that map through to the base search query, returns it with the remaining filters."""
+        if self.base_search_query is None:
+            return None, filters
+        return self.search_filter_plan.push_down(self.base_search_query, filters)
+
+    async def count(self, mode: CountMode = CountMode.EXACT, include_archived: bool = False, **filters) -> int:
+        """
+        Count entities matching the filters.
+
+        Args:
+            mode: EXACT runs count(*), CACHED reuses an exact count for a few seconds,
+                ESTIMATED uses planner statistics and falls back to an exact count for small results
+            include_archived: Count archived entities too
+            **filters: Filters to apply
+
+        Returns:
+            Number of matching entities
+        """
+        key = self.count_cache.key(self.entity_table.fullname, {**filters, 'include_archived': include_archived})
+        if mode == CountMode.ESTIMATED:
+            estimate = await self._estimate_count(include_archived, **filters)
+            if estimate is not None and estimate >= self.count_estimate_threshold:
+                return estimate
+        filters = self._soft_delete_filters(filters, include_archived)
+        if mode != CountMode.CACHED:
+            return await self._exact_count(**filters)
+
+        cached = self.count_cache.get(key)
+        if cached is not None:
+            return cached
+        result = await self._exact_count(**filters)
+        self.count_cache.put(key, result)
+        return result
+
+    async def _exact_count(self, **filters) -> int:
+        base_query, filters = self._push_down_filters(filters)
+        query: Select[tuple[int]] = count(self.entity_table, base_query=base_query)
+        filtered_query = self._apply_filters(query, base_query=base_query, **filters)
         return await self.fetchval(filtered_query)  # type: ignore[arg-type,no-any-return]
 
+    async def _estimate_count(self, include_archived: bool = False, **filters) -> int | None:
+        archived = filters.get('archived', None if include_archived else False)
+        if self.base_search_query is None and set(filters) <= {'archived'}:
+            # Only the soft-delete predicate, read from the table statistics instead of planning a query
+            if archived is None or 'archived' not in self.entity_table.columns:
+                estimate = await self.fetchval(estimate_count(self.entity_table))
+            else:
+                estimate = await self.fetchval(estimate_count(self.entity_table, 'archived', bool(archived)))
+            return estimate if estimate and estimate > 0 else None
+
+        filters = self._soft_delete_filters(filters, include_archived)
+        base_query, filters = self._push_down_filters(filters)
+        query: Select[Any] = search(self.entity_table, base_query=base_query)
+        filtered_query = self._apply_filters(query, base_query=base_query, **filters)
+        plan = await self.explain(filtered_query)
+        return int(plan[0]['Plan']['Plan Rows'])
+
     async def create(self, *args, **kwargs) -> Entity:
         payload = [*args] if args else [kwargs]
         result = await self.fetchrow(create(self.entity_table, payload))
-        return self.entity.model_validate(result)
+        if not result:
+            raise RowNotFoundError('No row has been created')
+        return self._to_entity(result)
+
+    async def create_many(
+        self, payload: list[dict], use_copy: bool = False, chunk_size: int = COPY_CHUNK_SIZE
+    ) -> list[Entity]:
+        """
+        Create entities from the payload rows.
+
+        Args:
+            payload: Rows to insert
+            use_copy: Load rows with binary COPY into a temporary staging table and move them
+                with a single INSERT ... SELECT ... RETURNING, all in one transaction
+            chunk_size: Number of rows per COPY chunk
+
+        Returns:
+            Created entities
+        """
+        if not payload:
+            return []
+        if not use_copy:
+            results = await self.fetch(create(self.entity_table, payload))
+            return self._to_entities(results)
 
-    async def create_many(self, payload: list[dict]) -> list[Entity]:
-        results = await self.fetch(create(self.entity_table, payload)) if payload else []
-        return [self.entity.model_validate(result) for result in results]
+        columns, records = copy_records(payload)
+        # Temporary tables are private to the session, ON COMMIT DROP scopes the name to the transaction
+        staging_name = f'{self.entity_table.name}_staging'
+        async with self.transaction():
+            await self.execute(create_staging_table(self.entity_table, staging_name))
+            for start in range(0, len(records), chunk_size):
+                await self.copy_records(staging_name, columns, records[start : start + chunk_size])
+            results = await self.fetch(create_from_staging(self.entity_table, staging_name, columns))
+            # Dropped right away, so another bulk insert of an enclosing transaction can stage its rows
+            await self.execute(drop_staging_table(staging_name))
+        return self._to_entities(results)
+
+    async def copy_many(self, payload: list[dict], chunk_size: int = COPY_CHUNK_SIZE) -> int:
+        """
+        Load rows straight into the entity table with binary COPY, without returning them.
+
+        Args:
+            payload: Rows to insert
+            chunk_size: Number of rows per COPY chunk
+
+        Returns:
+            Number of inserted rows
+        """
+        if not payload:
+            return 0
+
+        columns, records = copy_records(payload)
+        async with self.transaction():
+            for start in range(0, len(records), chunk_size):
+                await self.copy_records(
+                    self.entity_table.name,
+                    columns,
+                    records[start : start + chunk_size],
+                    schema_name=self.entity_table.schema,
+                )
+        return len(records)
 
     async def search(
-        self, order_by: list | str | None = None, limit: int | None = None, offset: int = 0, **filters
+        self,
+        order_by: list | str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+        keyset: Sequence[Any] | None = None,
+        fields: Sequence[str] | None = None,
+        include_archived: bool = False,
+        **filters,
     ) -> list[Entity]:
+        required = keyset_columns(order_by) if keyset is not None and isinstance(order_by, str) else []
+        columns = self._projection(fields, *required)
+        base_query, filters = self._push_down_filters(self._soft_delete_filters(filters, include_archived))
         query: Select[Any] = search(
             self.entity_table,
             order_by=order_by,
             limit=limit,
             offset=offset,
-            base_query=self.base_search_query,
+            base_query=base_query,
+            keyset=keyset,
+            columns=columns,
         )
-        filtered_query = self._apply_filters(query, base_query=self.base_search_query, **filters)
+        filtered_query = self._apply_filters(query, base_query=base_query, **filters)
         results = await self.fetch(filtered_query)  # type: ignore[arg-type]
-        return [self.entity.model_validate(result) for result in results]
+        return self._to_projected_entities(results, columns)
+
+    async def search_page(
+        self,
+        order_by: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        total: CountMode | None = None,
+        fields: Sequence[str] | None = None,
+        include_archived: bool = False,
+        **filters,
+    ) -> Page[Entity]:
+        """
+        Search for a page of entities with keyset pagination over (order column, id).
+        Every page costs the same regardless of its depth.
+
+        Args:
+            order_by: Order column, prefixed with '-' for descending order (defaults to id)
+            limit: Page size
+            cursor: Opaque cursor returned with the previous page
+            total: Count mode of the total number of matching entities, not counted if None
+            fields: Fields to select, all fields if None (the id and order column are always selected)
+            include_archived: Include archived entities, they are excluded unless the `archived` filter is set
+            **filters: Filters to apply to the search
+
+        Returns:
+            Page of entities with the cursor of the next page (None on the last page)
+        """
+        order_by = order_by or 'id'
+        keyset = self._decode_keyset(cursor, order_by) if cursor else []
+        items = await self.search(
+            order_by=order_by,
+            limit=limit + 1,
+            keyset=keyset,
+            fields=fields,
+            include_archived=include_archived,
+            **filters,
+        )
+        total_count = (
+            await self.count(mode=total, include_archived=include_archived, **filters) if total is not None else None
+        )
+        if len(items) <= limit:
+            return Page(items=items, total=total_count)
+
+        items = items[:limit]
+        last_values = [getattr(items[-1], col_name) for col_name in keyset_columns(order_by)]
+        return Page(items=items, next_cursor=encode_cursor(order_by, last_values), total=total_count)
+
+    async def iterate(
+        self,
+        order_by: list | str | None = None,
+        prefetch: int = CURSOR_PREFETCH,
+        include_archived: bool = False,
+        **filters,
+    ) -> AsyncIterator[Entity]:
+        """
+        Stream entities matching the filters through a server-side cursor.
+        Memory usage does not depend on the number of matching rows.
+
+        Args:
+            order_by: Order by clause
+            prefetch: Number of rows fetched from the server per round trip
+            include_archived: Include archived entities
+            **filters: Filters to apply to the search
+
+        Yields:
+            Matching entities
+        """
+        base_query, filters = self._push_down_filters(self._soft_delete_filters(filters, include_archived))
+        query: Select[Any] = search(self.entity_table, order_by=order_by, base_query=base_query)
+        filtered_query = self._apply_filters(query, base_query=base_query, **filters)
+        async for row in self.cursor(filtered_query, prefetch=prefetch):
+            yield self._to_entity(row)
 
     async def search_for_update(
         self,
@@ -98,55 +431,299 @@ class EntityDBRepository[Entity: SQLModel](DBRepository):
         if isinstance(filtered_query, Select):
             query_with_lock = filtered_query.with_for_update(skip_locked=skip_locked)
             results = await self.fetch(query_with_lock)  # type: ignore[arg-type]
-            return [self.entity.model_validate(result) for result in results]
+            return self._to_entities(results)
         else:
             # This shouldn't happen in this context, but handle it gracefully
             results = await self.fetch(filtered_query)  # type: ignore[arg-type]
-            return [self.entity.model_validate(result) for result in results]
+            return self._to_entities(results)
+
+    async def get_by_id(
+        self,
+        entity_id: int | UUID,
+        fields: Sequence[str] | None = None,
+        include_archived: bool = False,
+        partition: Mapping[str, Any] | None = None,
+    ) -> Entity:
+        # Only not archived entities are cached
+        if fields or include_archived:
+            return await self._get_by_id(entity_id, fields, include_archived, partition)
+        if self.entity_cache is None:
+            return await self._load(entity_id, partition)
+
+        cached = self.entity_cache.get(entity_id)
+        if cached is not None:
+            return cached  # type: ignore[return-value]
+        generation = self.entity_cache.generation
+        entity = await self._load(entity_id, partition)
+        self.entity_cache.put(entity_id, entity, generation)
+        return entity
+
+    async def _load(self, entity_id: int | UUID, partition: Mapping[str, Any] | None) -> Entity:
+        """
+        Get a whole entity by ID from the primary: a lagging replica could return a row older than an already
+        invalidated write. Loads by ID alone are batched with the other loads of the event-loop tick.
+        """
+        if partition:
+            return await self._get_by_id(entity_id, partition=partition, primary=True)
+        return await self.loader.load(entity_id)
 
-    async def get_by_id(self, entity_id: int | UUID) -> Entity:
-        res = await self.fetchrow(get_by_id(table=self.entity_table, entity_id=entity_id))
+    async def _get_by_id(
+        self,
+        entity_id: int | UUID,
+        fields: Sequence[str] | None = None,
+        include_archived: bool = False,
+        partition: Mapping[str, Any] | None = None,
+        primary: bool = False,
+    ) -> Entity:
+        columns = self._projection(fields)
+        query = self._in_partition(get_by_id(table=self.entity_table, entity_id=entity_id, columns=columns), partition)
+        res = await self.fetchrow(query if include_archived else self._not_archived(query), primary)
+        if not res and include_archived and self.archive_table is not None:
+            res = await self.fetchrow(get_by_id(table=self.archive_table, entity_id=entity_id, columns=columns))
         if not res:
             raise RowNotFoundError('Row not found')
-        return self.entity.model_validate(res)
+        return self._to_projected_entities([res], columns)[0]  # type: ignore[list-item]
+
+    async def upsert(
+        self, conflict_target: Sequence[str] | None = None, update_columns: Sequence[str] | None = None, **payload
+    ) -> Entity | None:
+        """
+        Insert an entity or update the conflicting one in a single statement.
+
+        Args:
+            conflict_target: Columns of the unique index to resolve conflicts on,
+                inferred from the payload columns if not set
+            update_columns: Columns to update on conflict, all payload columns outside of the
+                conflict target if not set, DO NOTHING if empty
+            **payload: Entity fields
+
+        Returns:
+            Inserted or updated entity, None if the conflicting row has been left untouched
+        """
+        results = await self.upsert_many([payload], conflict_target=conflict_target, update_columns=update_columns)
+        return results[0] if results else None
+
+    async def upsert_many(
+        self,
+        payload: list[dict],
+        conflict_target: Sequence[str] | None = None,
+        update_columns: Sequence[str] | None = None,
+    ) -> list[Entity]:
+        """
+        Insert entities or update the conflicting ones in a single statement.
+        Rows of one call must not conflict with each other.
+
+        Args:
+            payload: Rows to insert
+            conflict_target: Columns of the unique index to resolve conflicts on,
+                inferred from the payload columns if not set
+            update_columns: Columns to update on conflict, all payload columns outside of the
+                conflict target if not set, DO NOTHING if empty
+
+        Returns:
+            Inserted and updated entities
+        """
+        if not payload:
+            return []
+
+        target = list(conflict_target) if conflict_target else self._conflict_target(list(payload[0]))
+        if not target:
+            raise ValueError(f'No unique index of {self.entity_table.fullname} matches {list(payload[0])}')
+        if update_columns is None:
+            update_columns = [col_name for col_name in payload[0] if col_name not in target]
+
+        results = await self.fetch(upsert(self.entity_table, payload, target, update_columns))
+        await self._invalidate_cached(results)
+        return self._to_entities(results)
+
+    async def get_by_ids(
+        self, entity_ids: Sequence[int | UUID], include_archived: bool = False, primary: bool = False
+    ) -> list[Entity]:
+        if not entity_ids:
+            return []
+        query = get_by_ids(table=self.entity_table, entity_ids=entity_ids)
+        results = await self.fetch(query if include_archived else self._not_archived(query), primary)
+        if include_archived and self.archive_table is not None and len(results) < len(set(entity_ids)):
+            found = {str(row['id']) for row in results}
+            missing = [entity_id for entity_id in dict.fromkeys(entity_ids) if str(entity_id) not in found]
+            results += await self.fetch(get_by_ids(table=self.archive_table, entity_ids=missing))
+        return self._to_entities(results)
+
+    async def search_archive(
+        self,
+        order_by: list | str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+        fields: Sequence[str] | None = None,
+        **filters,
+    ) -> list[Entity]:
+        """
+        Search the archived entities moved to cold storage, they are not returned by the other searches.
+
+        Args:
+            order_by: Order by clause
+            limit: Maximum number of entities
+            offset: Number of entities to skip
+            fields: Fields to select, all fields if None (the id is always selected)
+            **filters: Filters to apply to the search
+
+        Returns:
+            Matching archived entities
+        """
+        if self.archive_table is None or self.archive_filter_plan is None:
+            raise ValueError(f'{self.entity_table.fullname} has no archive table')
+        columns = self._projection(fields)
+        query = search(self.archive_table, order_by=order_by, limit=limit, offset=offset, columns=columns)
+        results = await self.fetch(self.archive_filter_plan.apply(query, filters))
+        return self._to_projected_entities(results, columns)
+
+    async def move_archived(self, archived_before: datetime.datetime, batch_size: int) -> int:
+        """
+        Move a batch of entities archived (last updated) before `archived_before` to the archive table.
+        Entities locked by other transactions are skipped.
+
+        Returns:
+            Number of moved entities
+        """
+        if self.archive_table is None:
+            raise ValueError(f'{self.entity_table.fullname} has no archive table')
+        results = await self.fetch(move_archived(self.entity_table, self.archive_table, archived_before, batch_size))
+        return len(results)
+
+    async def load(self, entity_id: int | UUID) -> Entity:
+        """
+        Get entity by ID, batched with other `load` calls issued in the same event-loop tick.
+        Use it with asyncio.gather to resolve related entities without N+1 queries.
+
+        Raises:
+            RowNotFoundError: If there's no entity with the ID
+        """
+        return await self.loader.load(entity_id)
+
+    async def load_many(self, entity_ids: Sequence[int | UUID]) -> list[Entity]:
+        """
+        Get entities by IDs in a single query, keeping the order of the IDs.
+
+        Raises:
+            RowNotFoundError: If any of the entities does not exist
+        """
+        return await self.loader.load_many(list(entity_ids))
 
     async def get_or_create(self, **kwargs) -> Entity:
+        """
+        Get the entity matching the fields or create it.
+
+        When the fields cover a unique index the entity is inserted with INSERT ... ON CONFLICT DO NOTHING,
+        an existing one is read from the primary: getting an entity writes nothing. An existing entity that
+        has been archived is restored, unique indexes cover archived rows too.
+        Otherwise falls back to search and create.
+        """
+        target = self._conflict_target(list(kwargs))
+        if target:
+            entity = await self._get_or_insert(target, **kwargs)
+            if any(_comparable(getattr(entity, key)) != _comparable(value) for key, value in kwargs.items()):
+                raise ValueError(f'Ambiguous value for {kwargs}')
+            return entity
+
         existing_rows = await self.search(**kwargs)
         if len(existing_rows) == 1:
             return existing_rows[0]
         elif len(existing_rows) > 1:
-            raise ValueError('Ambiguous value for %s' % kwargs)
+            raise ValueError(f'Ambiguous value for {kwargs}')
 
-        result = await self.create(**kwargs)
-        return self.entity.model_validate(result)
+        return await self.create(**kwargs)
 
-    async def update_by_id(self, entity_id: int | UUID, **payload) -> Entity:
-        update_query = update_by_id(table=self.entity_table, entity_id=entity_id, **payload)
+    async def _get_or_insert(self, conflict_target: list[str], **kwargs) -> Entity:
+        conflicting = self._apply_filters(
+            search(self.entity_table, limit=1),
+            **{col_name: _comparable(kwargs[col_name]) for col_name in conflict_target},
+        )
+        # A conflicting row deleted before it is read is inserted on the next attempt
+        for _ in range(2):
+            entity = await self.upsert(conflict_target=conflict_target, update_columns=[], **kwargs)
+            if entity is not None:
+                return entity
+            row = await self.fetchrow(conflicting, primary=True)
+            if row is None:
+                continue
+            if not row.get('archived'):
+                return self._to_entity(row)
+            # Someone else's archived row must not be restored, the other fields are checked first
+            if any(_comparable(row[key]) != _comparable(value) for key, value in kwargs.items() if key != 'archived'):
+                raise ValueError(f'Ambiguous value for {kwargs}')
+            partition = {col_name: row[col_name] for col_name in self.partition_key}
+            return await self.update_by_id(row['id'], partition=partition, archived=False)
+        raise RowNotFoundError('No row has been created')
+
+    async def update_by_id(
+        self, entity_id: int | UUID, partition: Mapping[str, Any] | None = None, **payload
+    ) -> Entity:
+        update_query = self._in_partition(
+            update_by_id(table=self.entity_table, entity_id=entity_id, **payload), partition
+        )
         res = await self.fetchrow(update_query)
         if not res:
             raise RowNotFoundError('No row has been updated')
-        return self.entity.model_validate(res)
+        await self._invalidate_cached([res])  # type: ignore[list-item]
+        return self._to_entity(res)
 
     async def update(self, payload: dict, **filters) -> list[Entity]:
         update_query: Update = update(self.entity_table, **payload)
         filtered_query = self._apply_filters(update_query, **filters)
 
         results = await self.fetch(filtered_query)  # type: ignore[arg-type]
-        return [self.entity.model_validate(result) for result in results]
+        await self._invalidate_cached(results)
+        return self._to_entities(results)
+
+    async def update_many(self, rows: list[dict], chunk_size: int = UPDATE_CHUNK_SIZE) -> list[Entity]:
+        """
+        Update many entities with different payloads in one statement per chunk.
+        Rows of the same id are merged, later values win. Rows are grouped by their set of keys;
+        ids that do not exist are skipped.
 
-    async def archive_by_id(self, entity_id: int | UUID, **additional_payload) -> Entity:
+        Args:
+            rows: Payloads to apply, each one with the `id` of the entity to update
+            chunk_size: Maximum number of rows per statement
+
+        Returns:
+            Updated entities
+        """
+        if not rows:
+            return []
+
+        # A row matched by several payloads in one UPDATE ... FROM gets an arbitrary one of them
+        merged: dict[str, dict] = {}
+        for row in rows:
+            key = str(row.get('id'))
+            merged[key] = {**merged.get(key, {}), **row}
+
+        groups: dict[frozenset, list[dict]] = {}
+        for row in merged.values():
+            groups.setdefault(frozenset(row), []).append(row)
+
+        results = []
+        async with self.transaction():
+            for group in groups.values():
+                for start in range(0, len(group), chunk_size):
+                    results.extend(await self.fetch(update_many(self.entity_table, group[start : start + chunk_size])))
+        await self._invalidate_cached(results)
+        return self._to_entities(results)
+
+    async def archive_by_id(
+        self, entity_id: int | UUID, partition: Mapping[str, Any] | None = None, **additional_payload
+    ) -> Entity:
         """
         Archive entity by ID with optional additional fields.
 
         Args:
             entity_id: ID of the entity to archive
+            partition: Values of the partition key of the entity, if known, so a single partition is searched
             **additional_payload: Additional fields to update during archive
         Return:
             Updated (archived) entity
         """
         payload = {'archived': True, **additional_payload}
-        result = await self.update_by_id(entity_id=entity_id, **payload)
-        return self.entity.model_validate(result)
+        return await self.update_by_id(entity_id=entity_id, partition=partition, **payload)
 
     async def archive(self, additional_payload: dict | None = None, **filters) -> list[Entity]:
         """
@@ -160,20 +737,24 @@ class EntityDBRepository[Entity: SQLModel](DBRepository):
         Return:
             Updated (archived) entities.
         """
-        results = await self.update({'archived': True, **(additional_payload if additional_payload else {})}, **filters)
-        return [self.entity.model_validate(result) for result in results]
+        return await self.update({'archived': True, **(additional_payload if additional_payload else {})}, **filters)
 
-    async def search_first_row(self, order_by: list | str | None = None, offset: int = 0, **filters) -> Entity | None:
+    async def search_first_row(
+        self, order_by: list | str | None = None, offset: int = 0, include_archived: bool = False, **filters
+    ) -> Entity | None:
         """
         Search for entities and return the first matching row.
 
         Args:
             order_by: Order by clause
             offset: Offset from first row
+            include_archived: Include archived entities
             **filters: Filters to apply to the search
 
         Returns:
             First matching row or None if no matches found
         """
-        results = await self.search(order_by=order_by, limit=1, offset=offset, **filters)
-        return self.entity.model_validate(results[0]) if results else None
+        results = await self.search(
+            order_by=order_by, limit=1, offset=offset, include_archived=include_archived, **filters
+        )
+        return results[0] if results else None
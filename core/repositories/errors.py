@@ -1,2 +1,10 @@
 class RowNotFoundError(Exception):
     pass
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class DeadlineExceededError(TimeoutError):
+    pass
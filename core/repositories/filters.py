@@ -0,0 +1,103 @@
+import operator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Union
+
+from sqlalchemy import Column, ColumnElement, Label, Select, Table, Update, column
+
+FILTER_OPERATORS: dict[str, Callable[[Any, Any], ColumnElement[bool]]] = {
+    'lt': operator.lt,
+    'le': operator.le,
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'ne': operator.ne,
+    'in': lambda col, value: col.in_(value),
+    'notin': lambda col, value: ~col.in_(value),
+    'is': lambda col, value: col.is_(value),
+    'isnot': lambda col, value: col.is_not(value),
+    'like': lambda col, value: col.like(value),
+    'ilike': lambda col, value: col.ilike(value),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Filter:
+    column: ColumnElement
+    operator: Callable[[Any, Any], ColumnElement[bool]]
+    # Column of the base query the filter can be moved to, None if it has to stay on the outer query
+    pushdown_column: ColumnElement | None = None
+
+
+def _can_push_down(base_query: Select) -> bool:
+    # Filtering before grouping, deduplication, limits or window functions would change the result
+    return (
+        not base_query._group_by_clauses
+        and not base_query._having_criteria
+        and not base_query._distinct
+        and base_query._limit_clause is None
+        and base_query._offset_clause is None
+        and all(_underlying_column(col) is not None for col in base_query.selected_columns)
+    )
+
+
+def _underlying_column(col: ColumnElement) -> Column | None:
+    if isinstance(col, Label):
+        col = col.element
+    return col if isinstance(col, Column) else None
+
+
+class FilterPlan:
+    """
+    Filters of a table or a base query precompiled once: `<column>` for equality and
+    `<column>_<op>` for the operators of FILTER_OPERATORS.
+    """
+
+    def __init__(self, table: Table, base_query: Select | None = None):
+        self.filters: dict[str, Filter] = {}
+        if base_query is None:
+            columns = {col.name: (col, None) for col in table.columns}
+        else:
+            pushable = _can_push_down(base_query)
+            columns = {
+                name: (column(name), _underlying_column(col) if pushable else None)
+                for name, col in base_query.selected_columns.items()
+            }
+
+        for name, (col, pushdown_column) in columns.items():
+            self.filters[name] = Filter(col, operator.eq, pushdown_column)
+            for sign, filter_operator in FILTER_OPERATORS.items():
+                self.filters[f'{name}_{sign}'] = Filter(col, filter_operator, pushdown_column)
+
+    def get(self, filter_name: str) -> Filter:
+        try:
+            return self.filters[filter_name]
+        except KeyError:
+            raise ValueError(f'Unknown filter name ({filter_name})')
+
+    def apply(self, query: Union[Select[Any], Update], filters: dict[str, Any]) -> Union[Select[Any], Update]:
+        for filter_name, filter_value in filters.items():
+            query_filter = self.get(filter_name)
+            query = query.where(query_filter.operator(query_filter.column, filter_value))
+        return query
+
+    def push_down(self, base_query: Select, filters: dict[str, Any]) -> tuple[Select, dict[str, Any]]:
+        """
+        Move the filters on columns that map to a table column into the WHERE clause of the base query,
+        so they can use the table indexes.
+
+        Returns:
+            Filtered base query and the filters left for the outer query
+        """
+        remaining = {}
+        for filter_name, filter_value in filters.items():
+            query_filter = self.get(filter_name)
+            if query_filter.pushdown_column is None:
+                remaining[filter_name] = filter_value
+            else:
+                base_query = base_query.where(query_filter.operator(query_filter.pushdown_column, filter_value))
+        return base_query, remaining
+
+
+@lru_cache
+def filter_plan(table: Table, base_query: Select | None = None) -> FilterPlan:
+    return FilterPlan(table, base_query)
@@ -0,0 +1,120 @@
+import asyncio
+from logging import getLogger
+from typing import Any, Iterator, Sequence
+from uuid import uuid4
+
+import asyncpg  # type: ignore
+import ujson
+from asyncpg import Connection, InterfaceError, PostgresError  # type: ignore
+
+from core.repositories.entity_cache import EntityCache
+
+logger = getLogger(__name__)
+
+# NOTIFY payloads are limited to 8000 bytes, a chunk of ids stays well below it
+IDS_PER_NOTIFICATION = 100
+
+
+class InvalidationBus:
+    """
+    Invalidation of the entity caches of all processes over Postgres LISTEN/NOTIFY.
+
+    Writers publish the ids of the changed rows of a table, a dedicated listener connection of every
+    process invalidates them in the local caches subscribed to the table. Notifications sent while the
+    listener is disconnected are lost, so all subscribed caches are flushed when the connection is lost
+    and again once it is back.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str = 'entity_changes',
+        heartbeat_interval: float = 5.0,
+        reconnect_interval: float = 1.0,
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.heartbeat_interval = heartbeat_interval
+        self.reconnect_interval = reconnect_interval
+        # Notifications of this process are skipped by its own listener, its caches are invalidated on write
+        self.node_id = uuid4().hex
+        self.connected = False
+        self.received = 0
+        self.reconnects = 0
+        self.flushes = 0
+        self._subscribers: dict[str, list[EntityCache]] = {}
+        self._connection: Connection | None = None
+
+    def subscribe(self, table_name: str, cache: EntityCache) -> None:
+        self._subscribers.setdefault(table_name, []).append(cache)
+
+    def payloads(self, table_name: str, entity_ids: Sequence[Any]) -> Iterator[str]:
+        """NOTIFY payloads announcing the changed rows of the table."""
+        for start in range(0, len(entity_ids), IDS_PER_NOTIFICATION):
+            ids = [str(entity_id) for entity_id in entity_ids[start : start + IDS_PER_NOTIFICATION]]
+            yield ujson.dumps({'node': self.node_id, 'table': table_name, 'ids': ids})
+
+    def flush(self) -> None:
+        self.flushes += 1
+        for caches in self._subscribers.values():
+            for cache in caches:
+                cache.clear()
+
+    def _on_notification(self, connection: Connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = ujson.loads(payload)
+            if event['node'] == self.node_id:
+                return
+            caches = self._subscribers.get(event['table'], [])
+            ids = event['ids']
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f'Malformed invalidation event: {payload}')
+            return
+
+        self.received += 1
+        for cache in caches:
+            cache.invalidate(*ids)
+
+    async def run(self) -> None:
+        """
+        Listen for invalidation events until cancelled, reconnecting when the connection is lost.
+        """
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except (OSError, TimeoutError, PostgresError, InterfaceError) as err:
+                logger.warning(f'Invalidation listener disconnected: {err}')
+            if self.connected:
+                self.connected = False
+                self.flush()
+            await asyncio.sleep(self.reconnect_interval)
+            self.reconnects += 1
+
+    async def _listen(self) -> None:
+        self._connection = await asyncpg.connect(self.dsn)
+        try:
+            await self._connection.add_listener(self.channel, self._on_notification)
+            # Anything published before LISTEN took effect may have been missed
+            self.flush()
+            self.connected = True
+            logger.debug(f'Invalidation listener connected to channel {self.channel}')
+            # A dead connection is only noticed when it is used
+            while True:
+                await asyncio.sleep(self.heartbeat_interval)
+                await self._connection.execute('SELECT 1', timeout=self.heartbeat_interval)
+        finally:
+            connection, self._connection = self._connection, None
+            connection.terminate()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'channel': self.channel,
+            'node_id': self.node_id,
+            'connected': self.connected,
+            'subscribed_tables': sorted(self._subscribers),
+            'received': self.received,
+            'reconnects': self.reconnects,
+            'flushes': self.flushes,
+        }
@@ -0,0 +1,76 @@
+import asyncio
+import contextvars
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from asyncpg import Connection  # type: ignore
+from sqlmodel import SQLModel
+
+from core.repositories.db import db_ctx
+from core.repositories.deadline import deadline_ctx
+from core.repositories.errors import RowNotFoundError
+
+if TYPE_CHECKING:
+    from core.repositories.entity_db import EntityDBRepository
+
+
+@dataclass(slots=True)
+class _Batch:
+    entity_ids: dict[str, Any] = field(default_factory=dict)
+    # Latest deadline of the callers, the batch must not fail a caller that still has time left
+    deadline: float | None = None
+    unbounded: bool = False
+
+    def add(self, entity_id: Any, deadline: float | None) -> None:
+        self.entity_ids.setdefault(str(entity_id), entity_id)
+        if deadline is None:
+            self.unbounded = True
+        else:
+            self.deadline = max(deadline, self.deadline or deadline)
+
+
+class EntityLoader[Entity: SQLModel]:
+    """
+    Batches `load` calls issued in the same event-loop tick into a single `WHERE id = ANY($1)` query.
+    Repeated ids within a batch are fetched once. Entities are not cached between batches,
+    so writes made between two loads are always visible.
+
+    A batch runs in a context of its own rather than in the context of its first caller, and reads from
+    the primary, so it does not depend on which caller came first (replica stickiness, deadline).
+    Loads inside a connection block (e.g. a transaction) are not batched, they must read through its connection.
+    """
+
+    def __init__(self, repository: 'EntityDBRepository[Entity]'):
+        self._repository = repository
+        self._batch: tuple[_Batch, asyncio.Task[dict[str, Entity]]] | None = None
+
+    async def load(self, entity_id: Any) -> Entity:
+        if isinstance(db_ctx.get(None), Connection):
+            found = await self._repository.get_by_ids([entity_id], primary=True)
+            if not found:
+                raise RowNotFoundError('Row not found')
+            return found[0]
+
+        if self._batch is None:
+            batch = _Batch()
+            # The task starts once the callbacks already scheduled ran, i.e. once the other loads of the tick joined
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch), context=contextvars.Context())
+            self._batch = batch, task
+        batch, task = self._batch
+        batch.add(entity_id, deadline_ctx.get())
+        # A cancelled caller must not cancel the batch of the others
+        entities = await asyncio.shield(task)
+        entity = entities.get(str(entity_id))
+        if entity is None:
+            raise RowNotFoundError('Row not found')
+        return entity
+
+    async def load_many(self, entity_ids: list[Any]) -> list[Entity]:
+        return list(await asyncio.gather(*(self.load(entity_id) for entity_id in entity_ids)))
+
+    async def _dispatch(self, batch: _Batch) -> dict[str, Entity]:
+        if self._batch is not None and self._batch[0] is batch:
+            self._batch = None
+        deadline_ctx.set(None if batch.unbounded else batch.deadline)
+        entities = await self._repository.get_by_ids(list(batch.entity_ids.values()), primary=True)
+        return {str(entity.id): entity for entity in entities}  # type: ignore[attr-defined]
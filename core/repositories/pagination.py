@@ -0,0 +1,41 @@
+import base64
+import binascii
+from typing import Any, Sequence
+
+import ujson
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from core.repositories.errors import InvalidCursorError
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class Page[Item](BaseModel):
+    items: list[Item]
+    next_cursor: str | None = None
+    total: int | None = None
+
+
+def encode_cursor(order_by: str, values: Sequence[Any]) -> str:
+    payload = ujson.dumps([order_by, to_jsonable_python(values)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, order_by: str) -> list[Any]:
+    """
+    Decode an opaque cursor into the keyset values of the last seen row.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was issued for another ordering
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_order_by, values = ujson.loads(payload)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursorError('Malformed cursor')
+
+    if cursor_order_by != order_by or not isinstance(values, list):
+        raise InvalidCursorError('Cursor does not match the requested ordering')
+    return values
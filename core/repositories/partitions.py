@@ -0,0 +1,62 @@
+import re
+
+from sqlalchemy import MetaData, Table
+
+_PARTITION_BY = re.compile(r'^\s*(\w+)\s*\((.+)\)\s*$')
+
+
+def partition_key(table: Table) -> list[str]:
+    """
+    Columns of the partition key declared with `postgresql_partition_by`, empty if the table is not partitioned.
+    Only plain column keys are supported, e.g. 'HASH (user_id)'.
+    """
+    partition_by = table.dialect_options['postgresql'].get('partition_by')
+    if not partition_by:
+        return []
+    match = _PARTITION_BY.match(partition_by)
+    if match is None:
+        raise ValueError(f'Unsupported partition key of {table.fullname}: {partition_by}')
+    columns = [column.strip().strip('"') for column in match.group(2).split(',')]
+    if any(column not in table.columns for column in columns):
+        raise ValueError(f'Partition key of {table.fullname} is not made of its columns: {partition_by}')
+    return columns
+
+
+def hash_partition_name(table_name: str, remainder: int) -> str:
+    return f'{table_name}_p{remainder}'
+
+
+def create_hash_partitions(
+    table_name: str, schema: str | None, partitions: int, parent_name: str | None = None
+) -> list[str]:
+    """
+    DDL of the partitions of a hash partitioned table, one per remainder of the modulus.
+    The number of partitions can not be changed afterwards without repartitioning the table.
+
+    Args:
+        table_name: Table the partitions are named after
+        schema: Schema of the table
+        partitions: Modulus of the partitioning
+        parent_name: Partitioned table if it is not `table_name`, e.g. a table renamed to `table_name` once filled
+    """
+    if partitions < 1:
+        raise ValueError('A hash partitioned table needs at least one partition')
+    prefix = f'{schema}.' if schema else ''
+    return [
+        f'CREATE TABLE {prefix}{hash_partition_name(table_name, remainder)} '
+        f'PARTITION OF {prefix}{parent_name or table_name} '
+        f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+        for remainder in range(partitions)
+    ]
+
+
+def is_hash_partition(name: str, schema: str | None, metadata: MetaData) -> bool:
+    """
+    Whether a reflected table is a partition of a partitioned table of the metadata.
+    Partitions are created by migrations and not declared as models, so autogenerate must skip them.
+    """
+    parent_name, _, remainder = name.rpartition('_p')
+    if not remainder.isdigit():
+        return False
+    parent = metadata.tables.get(f'{schema}.{parent_name}' if schema else parent_name)
+    return parent is not None and bool(partition_key(parent))
@@ -0,0 +1,104 @@
+import time
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Generator
+
+import asyncpg  # type: ignore
+from asyncpg import Connection, Pool  # type: ignore
+
+logger = getLogger(__name__)
+
+
+class ObservablePool:
+    """
+    asyncpg pool wrapper that keeps acquire metrics: pending acquires and acquire latency.
+    Everything but `acquire` is delegated to the pool.
+    """
+
+    def __init__(self, pool: Pool):
+        self.pool = pool
+        self.waiters = 0
+        self.acquires = 0
+        self.acquire_time = 0.0
+        self.max_acquire_time = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool, name)
+
+    def acquire(self, *, timeout: float | None = None) -> '_ObservedAcquire':
+        """Same as `Pool.acquire`: awaited or used as an async context manager."""
+        return _ObservedAcquire(self, timeout)
+
+    async def _acquire(self, timeout: float | None) -> Connection:
+        self.waiters += 1
+        started = time.perf_counter()
+        try:
+            connection: Connection = await self.pool.acquire(timeout=timeout)
+            return connection
+        finally:
+            elapsed = time.perf_counter() - started
+            self.waiters -= 1
+            self.acquires += 1
+            self.acquire_time += elapsed
+            self.max_acquire_time = max(self.max_acquire_time, elapsed)
+
+    def metrics(self) -> dict[str, Any]:
+        size = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        return {
+            'min_size': self.pool.get_min_size(),
+            'max_size': self.pool.get_max_size(),
+            'size': size,
+            'in_use': size - idle,
+            'idle': idle,
+            'waiters': self.waiters,
+            'acquires': self.acquires,
+            'mean_acquire_time': self.acquire_time / self.acquires if self.acquires else 0.0,
+            'max_acquire_time': self.max_acquire_time,
+        }
+
+
+class _ObservedAcquire:
+    __slots__ = ('_pool', '_timeout', '_connection')
+
+    def __init__(self, pool: ObservablePool, timeout: float | None):
+        self._pool = pool
+        self._timeout = timeout
+        self._connection: Connection | None = None
+
+    def __await__(self) -> Generator[Any, None, Connection]:
+        return self._pool._acquire(self._timeout).__await__()
+
+    async def __aenter__(self) -> Connection:
+        self._connection = await self._pool._acquire(self._timeout)
+        return self._connection
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        connection, self._connection = self._connection, None
+        await self._pool.pool.release(connection)
+
+
+async def create_pool(
+    dsn: str,
+    min_size: int = 10,
+    max_size: int = 10,
+    max_inactive_connection_lifetime: float = 300.0,
+    statement_cache_size: int = 100,
+    server_settings: dict[str, str] | None = None,
+    init: Callable[[Connection], Awaitable[None]] | None = None,
+) -> ObservablePool:
+    """
+    Create an observable connection pool. Arguments are the same as `asyncpg.create_pool`.
+
+    Session settings must be passed as `server_settings` rather than SET in `init`:
+    the pool runs RESET ALL on every release.
+    """
+    pool = await asyncpg.create_pool(
+        dsn,
+        min_size=min_size,
+        max_size=max_size,
+        max_inactive_connection_lifetime=max_inactive_connection_lifetime,
+        statement_cache_size=statement_cache_size,
+        server_settings=server_settings,
+        init=init,
+    )
+    return ObservablePool(pool)
@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any
+
+from asyncpg import Connection  # type: ignore
+
+logger = getLogger(__name__)
+
+
+@dataclass(slots=True)
+class StatementTimings:
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def observe(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+
+class StatementStats:
+    """
+    Execution counts and timings of the statements, keyed by compiled SQL.
+
+    Statements are prepared and reused by asyncpg's per-connection statement cache, sized with the
+    `statement_cache_size` of the pool: a query already run on a connection skips parse/plan on the server,
+    and a statement invalidated by a schema change is re-prepared by asyncpg outside of transactions.
+    Only the statistics of the `maxsize` most recently run statements are kept.
+    """
+
+    def __init__(self, maxsize: int = 100):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._stats: OrderedDict[str, StatementTimings] = OrderedDict()
+
+    async def execute(
+        self, con: Connection, method: str, sql: str, params: list[Any], timeout: float | None = None
+    ) -> Any:
+        """
+        Run `method` (fetch, fetchrow or fetchval) of the connection with the statement cached for `sql`.
+        """
+        started = time.perf_counter()
+        result = await getattr(con, method)(sql, *params, timeout=timeout)
+        self._observe(sql, time.perf_counter() - started)
+        return result
+
+    def _observe(self, sql: str, elapsed: float) -> None:
+        # Every length of an expanded IN list is a statement of its own, the least recently run ones are dropped
+        stats = self._stats.get(sql)
+        if stats is None:
+            stats = self._stats[sql] = StatementTimings()
+            while len(self._stats) > self.maxsize:
+                self._stats.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._stats.move_to_end(sql)
+        stats.observe(elapsed)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'maxsize': self.maxsize,
+            'tracked': len(self._stats),
+            'evictions': self.evictions,
+            'statements': {
+                sql: {
+                    'calls': stats.calls,
+                    'total_time': stats.total_time,
+                    'avg_time': stats.total_time / stats.calls,
+                    'max_time': stats.max_time,
+                }
+                for sql, stats in self._stats.items()
+            },
+        }
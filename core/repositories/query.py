@@ -1,15 +1,24 @@
 import datetime
+from collections import OrderedDict
+from dataclasses import dataclass
 from enum import Enum
-from logging import getLogger
-from typing import Any, Callable
+from logging import DEBUG, getLogger
+from typing import Any, Callable, Hashable, Sequence, cast
 from uuid import UUID
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.dialects.postgresql.psycopg import PGDialectAsync_psycopg
 from sqlalchemy.sql import ClauseElement, Select
+from sqlalchemy.sql.cache_key import CacheKey
+from sqlalchemy.sql.compiler import Compiled
+from sqlalchemy.sql.elements import BindParameter
 
 logger = getLogger(__name__)
 dialect = PGDialectAsync_psycopg(paramstyle='pyformat')
+# Clock of the `created` and `updated` server defaults: the transaction timestamp as a naive UTC timestamp
+now_at_utc = sa.text("(now() at time zone 'utc')")
 
 
 def _process_value(value: Any) -> Any:
@@ -24,14 +33,145 @@ def _process_payload(payload: dict | list[dict]) -> dict | list[dict]:
     return {k: _process_value(v) for k, v in payload.items()}
 
 
-def compile_query(query: ClauseElement) -> tuple[str, list[Any]]:
+@dataclass(frozen=True, slots=True)
+class CompiledStatement:
+    """
+    Precompiled SQL with an ordered extractor for its bind values.
+
+    Every extractor item points to a bind parameter of the statement cache key and,
+    for expanded ``IN`` parameters, to the element of its value.
+    """
+
+    sql: str
+    extractors: tuple[tuple[int, int | None], ...]
+
+    def params(self, bindparams: Sequence[BindParameter]) -> list[Any]:
+        values = []
+        for position, element in self.extractors:
+            value = bindparams[position].effective_value
+            if element is None:
+                values.append(value)
+            else:
+                # Only expanded IN parameters, whose values are sequences, have element extractors
+                values.append(cast(Sequence[Any], value)[element])
+        return values
+
+
+class CompiledQueryCache:
+    """
+    Bounded LRU cache of compiled statements keyed on the SQLAlchemy structural cache key.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._statements: OrderedDict[Hashable, CompiledStatement] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def get(self, key: Hashable) -> CompiledStatement | None:
+        statement = self._statements.get(key)
+        if statement is None:
+            self.misses += 1
+            return None
+
+        self._statements.move_to_end(key)
+        self.hits += 1
+        return statement
+
+    def put(self, key: Hashable, statement: CompiledStatement) -> None:
+        self._statements[key] = statement
+        self._statements.move_to_end(key)
+        while len(self._statements) > self.maxsize:
+            self._statements.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._statements.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'size': len(self._statements),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+compiled_query_cache = CompiledQueryCache()
+
+
+def _compile_query(query: ClauseElement) -> tuple[Compiled, str, list[str]]:
     compiled = query.compile(dialect=dialect, compile_kwargs={'render_postcompile': True})
-    compiled_params = sorted(compiled.params.items())
-    mapping = {key: '$' + str(number) for number, (key, _) in enumerate(compiled_params, start=1)}
-    new_query = compiled.string % mapping
-    new_params = [val for key, val in compiled_params]
-    logger.debug('\n%s', compiled.string % compiled.params)
-    return new_query, new_params
+    param_names = sorted(compiled.params)
+    mapping = {key: '$' + str(number) for number, key in enumerate(param_names, start=1)}
+    if logger.isEnabledFor(DEBUG):
+        logger.debug('\n%s', compiled.string % compiled.params)
+    return compiled, compiled.string % mapping, param_names
+
+
+def _statement_key(cache_key: CacheKey) -> Hashable | None:
+    # Expanded IN lists render one placeholder per element, so their lengths are part of the SQL shape
+    expanding_lengths = []
+    for bindparam in cache_key.bindparams:
+        if bindparam.literal_execute:
+            return None
+        if bindparam.expanding:
+            value = bindparam.effective_value
+            if value is None or any(isinstance(item, (tuple, list)) for item in value):
+                return None
+            expanding_lengths.append(len(value))
+    return cache_key.key, tuple(expanding_lengths)
+
+
+def _build_extractors(
+    compiled: Compiled, cache_key: CacheKey, param_names: list[str]
+) -> tuple[tuple[int, int | None], ...] | None:
+    positions = {bindparam.key: position for position, bindparam in enumerate(cache_key.bindparams)}
+    expanded_names: dict[str, tuple[str, int]] = {}
+    expanded_state = getattr(compiled, '_post_compile_expanded_state', None)
+    if expanded_state is not None:
+        for name, expanded in expanded_state.parameter_expansion.items():
+            expanded_names.update({expanded_name: (name, element) for element, expanded_name in enumerate(expanded)})
+
+    extractors: list[tuple[int, int | None]] = []
+    for name in param_names:
+        element: int | None = None
+        if name in expanded_names:
+            name, element = expanded_names[name]
+        bindparam = compiled.binds.get(name)  # type: ignore[attr-defined]
+        if bindparam is None or bindparam.key not in positions:
+            return None
+        extractors.append((positions[bindparam.key], element))
+    return tuple(extractors)
+
+
+def compile_query(query: ClauseElement) -> tuple[str, list[Any]]:
+    cache_key = query._generate_cache_key()
+    statement_key = _statement_key(cache_key) if cache_key is not None else None
+    if cache_key is None or statement_key is None:
+        compiled, new_query, param_names = _compile_query(query)
+        return new_query, [compiled.params[name] for name in param_names]
+
+    statement = compiled_query_cache.get(statement_key)
+    if statement is not None:
+        new_params = statement.params(cache_key.bindparams)
+        logger.debug('\n%s\n%s', statement.sql, new_params)
+        return statement.sql, new_params
+
+    compiled, new_query, param_names = _compile_query(query)
+    extractors = _build_extractors(compiled, cache_key, param_names)
+    if extractors is not None:
+        compiled_query_cache.put(statement_key, CompiledStatement(sql=new_query, extractors=extractors))
+    return new_query, [compiled.params[name] for name in param_names]
+
+
+def is_read_only(query: ClauseElement) -> bool:
+    return isinstance(query, Select) and query._for_update_arg is None
 
 
 def create(table: sa.Table, payload: dict | list[dict]) -> sa.Insert:
@@ -39,18 +179,133 @@ def create(table: sa.Table, payload: dict | list[dict]) -> sa.Insert:
     return table.insert().values(processed_payload).returning(table)
 
 
+def upsert(
+    table: sa.Table, payload: dict | list[dict], conflict_target: Sequence[str], update_columns: Sequence[str]
+) -> sa.Insert:
+    """
+    Build INSERT ... ON CONFLICT (conflict_target) DO UPDATE/DO NOTHING ... RETURNING.
+
+    Rows are updated from the excluded ones for `update_columns`, or left untouched with DO NOTHING
+    (and not returned) when there are none. Updating only conflict target columns is a no-op that
+    still returns the existing row, without bumping `updated`.
+    """
+    processed_payload = _process_payload(payload)
+    insert = pg_insert(table).values(processed_payload)
+    if not update_columns:
+        return insert.on_conflict_do_nothing(index_elements=conflict_target).returning(table)
+
+    set_: dict[str, Any] = {column: insert.excluded[column] for column in update_columns}
+    if set(update_columns) - set(conflict_target):
+        set_['updated'] = now_at_utc
+    return insert.on_conflict_do_update(index_elements=conflict_target, set_=set_).returning(table)
+
+
+def copy_records(payload: list[dict]) -> tuple[list[str], list[tuple]]:
+    columns = list(payload[0])
+    records = []
+    for item in payload:
+        if item.keys() != payload[0].keys():
+            raise ValueError('All rows of a bulk insert must have the same columns')
+        records.append(tuple(_process_value(item[column]) for column in columns))
+    return columns, records
+
+
+def create_staging_table(table: sa.Table, staging_name: str) -> sa.TextClause:
+    preparer = dialect.identifier_preparer
+    return sa.text(
+        f'CREATE TEMPORARY TABLE {preparer.quote(staging_name)} '
+        f'(LIKE {preparer.format_table(table)} INCLUDING DEFAULTS) ON COMMIT DROP'
+    )
+
+
+def drop_staging_table(staging_name: str) -> sa.TextClause:
+    return sa.text(f'DROP TABLE pg_temp.{dialect.identifier_preparer.quote(staging_name)}')
+
+
+def create_from_staging(table: sa.Table, staging_name: str, columns: list[str]) -> sa.Insert:
+    staging = sa.table(staging_name, *(sa.column(column) for column in columns))
+    return table.insert().from_select(columns, sa.select(*staging.columns)).returning(table)
+
+
 def count(table: sa.Table, base_query: ClauseElement | None = None) -> Select[tuple[int]]:
     source = base_query if base_query is not None else table
     return sa.select(sa.func.count()).select_from(source)  # type: ignore[arg-type]
 
 
+def estimate_count(table: sa.Table, column: str | None = None, value: bool | None = None) -> Select[tuple[int]]:
+    """
+    Estimate the number of rows from the planner statistics, NULL if some of them have never been analyzed.
+
+    The rows of a partitioned table are the sum of the rows of its partitions (its own reltuples is -1).
+    Given a boolean `column`, only the rows where it equals `value` are counted, by the frequency of the value
+    in the statistics of every partition.
+    """
+    pg_class = sa.table(
+        'pg_class',
+        sa.column('oid'),
+        sa.column('relname'),
+        sa.column('relnamespace'),
+        sa.column('relkind'),
+        sa.column('reltuples', sa.Float),
+    )
+    # The partition tree of a table that is not partitioned is empty
+    regclass = sa.func.to_regclass(table.fullname)
+    partitions = sa.func.pg_partition_tree(regclass).table_valued('relid')
+    relations = sa.union(sa.select(partitions.c.relid), sa.select(regclass))
+    rows: sa.ColumnElement[Any] = sa.func.greatest(pg_class.c.reltuples, 0)
+    analyzed = pg_class.c.reltuples >= 0
+    query = sa.select().select_from(pg_class).where(pg_class.c.oid.in_(relations), pg_class.c.relkind != 'p')
+
+    if column is not None:
+        pg_namespace = sa.table('pg_namespace', sa.column('oid'), sa.column('nspname'))
+        pg_stats = sa.table(
+            'pg_stats',
+            sa.column('schemaname'),
+            sa.column('tablename'),
+            sa.column('attname'),
+            sa.column('inherited', sa.Boolean),
+            sa.column('most_common_vals'),
+            sa.column('most_common_freqs', ARRAY(sa.Float)),
+        )
+        query = query.join(pg_namespace, pg_namespace.c.oid == pg_class.c.relnamespace).outerjoin(
+            pg_stats,
+            sa.and_(
+                pg_stats.c.schemaname == pg_namespace.c.nspname,
+                pg_stats.c.tablename == pg_class.c.relname,
+                pg_stats.c.attname == column,
+                pg_stats.c.inherited.is_(False),
+            ),
+        )
+        # Both values of a boolean column are among the most common values unless one is missing from the sample
+        position = sa.func.array_position(
+            sa.cast(sa.cast(pg_stats.c.most_common_vals, sa.Text), ARRAY(sa.Boolean)), value
+        )
+        rows = rows * sa.func.coalesce(pg_stats.c.most_common_freqs[position], 0)
+        analyzed = sa.and_(analyzed, pg_stats.c.attname.is_not(None))
+
+    estimate = sa.case((sa.func.bool_and(analyzed), sa.func.sum(rows)), else_=None)
+    return query.add_columns(sa.cast(estimate, sa.BigInteger))
+
+
 def search(
     table: sa.Table,
     order_by: list | str | None = None,
     limit: int | None = None,
     offset: int = 0,
     base_query: Select | None = None,
+    keyset: Sequence[Any] | None = None,
+    columns: Sequence[str] | None = None,
 ) -> Select:
+    """
+    Build a select over the table (or the base query).
+
+    When `columns` is given only these columns are selected.
+
+    When `keyset` is given the query is paginated by (order column, id): `order_by` must be
+    a single column and only rows after the keyset values of the last seen row are returned
+    (an empty keyset selects the first page). Rows with NULL in a nullable order column come last
+    in ascending order and first in descending order, as in the default ordering of Postgres.
+    """
     logger.debug(f'search called with base_query: {base_query}')
     if base_query is None:
         query: Select = sa.select(table)
@@ -62,7 +317,17 @@ def search(
         column_getter = lambda col_name: sa.column(col_name)  # noqa: E731
         logger.debug('Using sa.column for column_getter')
 
-    if order_by:
+    if columns:
+        query = query.with_only_columns(*(column_getter(col_name) for col_name in columns), maintain_column_froms=True)
+
+    if keyset is not None:
+        if isinstance(order_by, list):
+            raise ValueError('Keyset pagination supports ordering by a single column')
+        order_by = order_by or 'id'
+        order_column = table.columns.get(order_by.lstrip('-'))
+        nullable = order_column is not None and bool(order_column.nullable)
+        query = _add_keyset_to_query(query, order_by, keyset, column_getter, nullable)
+    elif order_by:
         if isinstance(order_by, list):
             for order in order_by:
                 query = _add_order_to_query(query, order, column_getter)
@@ -76,6 +341,43 @@ def search(
     return query
 
 
+def _add_keyset_to_query(
+    query: Select, order_by: str, keyset: Sequence[Any], column_getter: Callable[[str], Any], nullable: bool = False
+) -> Select:
+    is_desc = order_by.startswith('-')
+    col_names = keyset_columns(order_by)
+    columns = [column_getter(col_name) for col_name in col_names]
+    if keyset:
+        query = query.where(_keyset_after(columns, [_process_value(value) for value in keyset], is_desc, nullable))
+    return query.order_by(*(sa.desc(col) if is_desc else col for col in columns))
+
+
+def _keyset_after(columns: list[Any], values: list[Any], is_desc: bool, nullable: bool) -> Any:
+    """
+    Condition of the rows after the keyset `values`. NULLs compare as unknown in a row comparison,
+    so the NULL rows of a nullable order column, last ascending and first descending, get their own branch.
+    """
+    row, last_row = sa.tuple_(*columns), sa.tuple_(*values)
+    after = row < last_row if is_desc else row > last_row
+    if not nullable:
+        return after
+
+    order_column, id_column = columns
+    last_value, last_id = values
+    if last_value is None:
+        # Among the NULL rows only the id orders, descending the not NULL rows come after them
+        after_id = id_column < last_id if is_desc else id_column > last_id
+        null_rows = sa.and_(order_column.is_(None), after_id)
+        return sa.or_(null_rows, order_column.is_not(None)) if is_desc else null_rows
+    # Descending the NULL rows have already been seen, ascending they come after every value
+    return after if is_desc else sa.or_(after, order_column.is_(None))
+
+
+def keyset_columns(order_by: str) -> list[str]:
+    col_name = order_by.lstrip('-')
+    return [col_name] if col_name == 'id' else [col_name, 'id']
+
+
 def _add_order_to_query(query: Select, order_by: str, column_getter: Callable[[str], Any]) -> Select:
     if order_by.startswith('-'):
         order_by_column: Any = sa.desc(column_getter(order_by[1:]))
@@ -85,8 +387,14 @@ def _add_order_to_query(query: Select, order_by: str, column_getter: Callable[[s
     return query
 
 
-def get_by_id(table: sa.Table, entity_id: int | UUID | str) -> Select:
-    return sa.select(table).where(table.columns.id == entity_id)
+def get_by_id(table: sa.Table, entity_id: int | UUID | str, columns: Sequence[str] | None = None) -> Select:
+    query = sa.select(*(table.columns[col_name] for col_name in columns)) if columns else sa.select(table)
+    return query.where(table.columns.id == entity_id)
+
+
+def get_by_ids(table: sa.Table, entity_ids: Sequence[int | UUID | str]) -> Select:
+    ids = sa.bindparam(None, value=list(entity_ids), type_=ARRAY(table.columns.id.type))
+    return sa.select(table).where(table.columns.id == sa.any_(ids))
 
 
 def update(table: sa.Table, **kwargs) -> sa.Update:
@@ -100,3 +408,60 @@ def update(table: sa.Table, **kwargs) -> sa.Update:
 
 def update_by_id(table: sa.Table, entity_id: int | UUID | str, **kwargs) -> sa.Update:
     return update(table, **kwargs).where(table.columns.id == entity_id)
+
+
+def update_many(table: sa.Table, rows: list[dict]) -> sa.Update:
+    """
+    Build a single UPDATE ... FROM unnest(...) applying a different payload to every row.
+    All rows must have the same keys, including `id`. The statement has one array parameter
+    per column, so its SQL does not depend on the number of rows. Ids must be unique.
+    """
+    columns = [column for column in rows[0] if column != 'id']
+    if 'id' not in rows[0] or any(row.keys() != rows[0].keys() for row in rows):
+        raise ValueError('All rows of a bulk update must have the same columns including id')
+    if len({str(row['id']) for row in rows}) != len(rows):
+        raise ValueError('The ids of a bulk update must be unique')
+
+    arrays = [
+        sa.bindparam(None, value=[_process_value(row[column]) for row in rows], type_=ARRAY(table.columns[column].type))
+        for column in ['id', *columns]
+    ]
+    values = sa.func.unnest(*arrays).table_valued('id', *columns).render_derived(name='payload')
+    return (
+        table.update()
+        .where(table.columns.id == values.columns.id)
+        .values(updated=now_at_utc, **{column: values.columns[column] for column in columns})
+        .returning(table)
+    )
+
+
+def move_archived(table: sa.Table, archive: sa.Table, archived_before: datetime.datetime, limit: int) -> sa.Insert:
+    """
+    Build a single INSERT INTO archive ... SELECT FROM (DELETE ... RETURNING) moving a batch of archived rows
+    last updated before `archived_before` to the archive table. Rows locked by other transactions are skipped.
+    A row archived again after being restored replaces its previous archived version.
+    """
+    key = [table.columns[column.name] for column in table.primary_key.columns]
+    batch = (
+        sa.select(*key)
+        .where(table.columns.archived == sa.true(), table.columns.updated < archived_before)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    moved = table.delete().where(sa.tuple_(*key).in_(batch)).returning(*table.columns).cte('moved')
+    columns = [column.name for column in archive.columns]
+    insert = pg_insert(archive).from_select(columns, sa.select(*(moved.columns[column] for column in columns)))
+    archive_key = [column.name for column in archive.primary_key.columns]
+    return (
+        insert.on_conflict_do_update(
+            index_elements=archive_key,
+            set_={column: insert.excluded[column] for column in columns if column not in archive_key},
+        )
+        .returning(archive.columns.id)
+        .add_cte(moved)
+    )
+
+
+def notify(channel: str, payload: str) -> sa.TextClause:
+    # Not a Select, so it is never routed to a read-only replica
+    return sa.text('SELECT pg_notify(:channel, :payload)').bindparams(channel=channel, payload=payload)
@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+import itertools
+import time
+from logging import getLogger
+from typing import Sequence
+
+from asyncpg import InterfaceError, Pool, PostgresError  # type: ignore
+
+from core.repositories.pool import ObservablePool
+
+logger = getLogger(__name__)
+
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+# Wall-clock time of the last write of the client, carried between its requests by the endpoints
+last_write_ctx: contextvars.ContextVar[float] = contextvars.ContextVar('last_write', default=0.0)
+
+
+class ReplicaRouter:
+    """
+    Routes read queries to replicas that are not lagging behind the primary.
+
+    Reads stick to the primary for `sticky_window` seconds after a write of the client, then only go to
+    replicas whose lag is shorter than the time elapsed since that write, so a client reads its own writes.
+    The time of the last write is held in `last_write_ctx` for the current request, the endpoints carry it
+    to the next requests of the client (see `read_your_writes_window`).
+    """
+
+    def __init__(self, replicas: Sequence[Pool | ObservablePool], max_lag: float = 5.0, sticky_window: float = 2.0):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.sticky_window = sticky_window
+        self.lags: dict[int, float] = {index: 0.0 for index in range(len(replicas))}
+        self._round_robin = itertools.cycle(range(len(replicas)))
+
+    def mark_write(self) -> None:
+        last_write_ctx.set(time.time())
+
+    @property
+    def read_your_writes_window(self) -> float:
+        """Seconds after a write during which it can still be missing from the replicas used for reads."""
+        return max(self.sticky_window, self.max_lag)
+
+    def mark_unavailable(self, replica: Pool | ObservablePool) -> None:
+        self.lags[self.replicas.index(replica)] = float('inf')
+
+    def pool_for_read(self) -> Pool | ObservablePool | None:
+        """
+        Get a replica pool for a read query, None if the read has to go to the primary.
+        """
+        since_write = time.time() - last_write_ctx.get()
+        if not self.replicas or since_write < self.sticky_window:
+            return None
+
+        # A replica lagging less than the time since the last write has already replayed it
+        max_lag = min(self.max_lag, since_write)
+        for _ in range(len(self.replicas)):
+            index = next(self._round_robin)
+            if self.lags[index] <= max_lag:
+                return self.replicas[index]
+        return None
+
+    async def refresh_lags(self) -> None:
+        for index, replica in enumerate(self.replicas):
+            try:
+                self.lags[index] = float(await replica.fetchval(REPLICA_LAG_QUERY))
+            except (OSError, TimeoutError, PostgresError, InterfaceError) as err:
+                # Unreachable, restarting or closed replica, it gets reads again once a check succeeds
+                logger.warning(f'Replica {index} lag check failed: {err}')
+                self.lags[index] = float('inf')
+
+    async def watch_lags(self, interval: float) -> None:
+        while True:
+            await self.refresh_lags()
+            await asyncio.sleep(interval)
@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import random
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Any, Collection, Iterator
+
+import ujson
+from asyncpg import InterfaceError, Pool, PostgresError  # type: ignore
+
+from core.repositories.pool import ObservablePool
+
+logger = getLogger(__name__)
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket is unbounded
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def fingerprint(sql: str) -> str:
+    # Compiled statements are already normalized: values are always sent as $n parameters
+    return hashlib.blake2b(sql.encode(), digest_size=8).hexdigest()
+
+
+@dataclass(slots=True)
+class QueryMetrics:
+    sql: str
+    calls: int = 0
+    errors: int = 0
+    rows: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    acquire_wait: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def observe(self, elapsed: float, rows: int, acquire_wait: float, failed: bool) -> None:
+        self.calls += 1
+        self.errors += failed
+        self.rows += rows
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.acquire_wait += acquire_wait
+        self.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        bounds = [*(str(bound) for bound in LATENCY_BUCKETS), 'inf']
+        return {
+            'sql': self.sql,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_time': self.total_time,
+            'mean_time': self.total_time / self.calls if self.calls else 0.0,
+            'max_time': self.max_time,
+            'mean_acquire_wait': self.acquire_wait / self.calls if self.calls else 0.0,
+            'histogram': dict(zip(bounds, self.buckets)),
+        }
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    fingerprint: str
+    sql: str
+    elapsed: float
+    at: float = field(default_factory=time.time)
+    plan: Any = None
+    seq_scans: list[str] = field(default_factory=list)
+
+
+def _plan_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get('Plans', []):
+        yield from _plan_nodes(child)
+
+
+class QueryStats:
+    """
+    In-process statistics of repository queries by statement fingerprint, with a log of slow queries.
+    A sample of slow read-only queries is explained with EXPLAIN (ANALYZE, BUFFERS) in the background
+    to flag sequential scans on large tables.
+    """
+
+    def __init__(
+        self,
+        slow_query_threshold: float = 0.5,
+        explain_sample_rate: float = 0.1,
+        seq_scan_tables: Collection[str] = (),
+        maxsize: int = 1000,
+        slow_log_size: int = 100,
+    ):
+        self.slow_query_threshold = slow_query_threshold
+        self.explain_sample_rate = explain_sample_rate
+        self.seq_scan_tables = set(seq_scan_tables)
+        self.maxsize = maxsize
+        self.slow_queries: deque[SlowQuery] = deque(maxlen=slow_log_size)
+        self._metrics: dict[str, QueryMetrics] = {}
+        self._explain_tasks: set[asyncio.Task] = set()
+
+    def record(
+        self, sql: str, elapsed: float, rows: int = 0, acquire_wait: float = 0.0, failed: bool = False
+    ) -> SlowQuery | None:
+        """
+        Record an executed statement.
+
+        Returns:
+            Entry of the slow query log if the statement took longer than the threshold
+        """
+        key = fingerprint(sql)
+        metrics = self._metrics.get(key)
+        if metrics is None and len(self._metrics) < self.maxsize:
+            metrics = self._metrics[key] = QueryMetrics(sql)
+        if metrics is not None:
+            metrics.observe(elapsed, rows, acquire_wait, failed)
+
+        if failed or elapsed < self.slow_query_threshold:
+            return None
+        logger.warning(f'Slow query {key} took {elapsed:.3f}s\n{sql}')
+        slow_query = SlowQuery(key, sql, elapsed)
+        self.slow_queries.append(slow_query)
+        return slow_query
+
+    def sample_plan(self, db_pool: Pool | ObservablePool, slow_query: SlowQuery, params: list[Any]) -> None:
+        """
+        Explain a sample of slow queries in the background. Only read-only queries must be passed,
+        since EXPLAIN ANALYZE executes the statement.
+        """
+        if random.random() >= self.explain_sample_rate:
+            return
+        task = asyncio.create_task(self._explain(db_pool, slow_query, params))
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(self, db_pool: Pool | ObservablePool, slow_query: SlowQuery, params: list[Any]) -> None:
+        try:
+            async with db_pool.acquire() as con:
+                plan = await con.fetchval(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {slow_query.sql}', *params)
+        except (OSError, TimeoutError, PostgresError, InterfaceError) as err:
+            # The sample is best effort: the connection may be lost or the parameters rejected by EXPLAIN
+            logger.warning(f'Failed to explain slow query {slow_query.fingerprint}: {err}')
+            return
+
+        slow_query.plan = ujson.loads(plan)
+        slow_query.seq_scans = sorted(
+            {
+                node['Relation Name']
+                for node in _plan_nodes(slow_query.plan[0]['Plan'])
+                if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in self.seq_scan_tables
+            }
+        )
+        if slow_query.seq_scans:
+            logger.warning(
+                f'Slow query {slow_query.fingerprint} scans {", ".join(slow_query.seq_scans)} sequentially\n'
+                f'{slow_query.sql}'
+            )
+
+    async def close(self) -> None:
+        for task in list(self._explain_tasks):
+            task.cancel()
+        await asyncio.gather(*self._explain_tasks, return_exceptions=True)
+
+    def clear(self) -> None:
+        self._metrics.clear()
+        self.slow_queries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        statements = sorted(self._metrics.items(), key=lambda item: item[1].total_time, reverse=True)
+        return {
+            'statements': {key: metrics.as_dict() for key, metrics in statements},
+            'slow_queries': [
+                {
+                    'fingerprint': slow_query.fingerprint,
+                    'sql': slow_query.sql,
+                    'elapsed': slow_query.elapsed,
+                    'at': slow_query.at,
+                    'seq_scans': slow_query.seq_scans,
+                    'plan': slow_query.plan,
+                }
+                for slow_query in reversed(self.slow_queries)
+            ],
+        }
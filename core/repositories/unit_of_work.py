@@ -0,0 +1,75 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from asyncpg import Connection, Pool  # type: ignore
+from asyncpg.transaction import Transaction  # type: ignore
+
+from core.repositories.deadline import remaining_budget
+from core.repositories.pool import ObservablePool
+
+
+class UnitOfWork:
+    """
+    Request-scoped connection shared by all repositories of a request.
+    The connection is acquired on first use and kept until `close`, optionally inside a request-wide transaction.
+    Concurrent users (e.g. gathered tasks) take turns on the connection.
+    """
+
+    def __init__(self, db_pool: Pool | ObservablePool, transactional: bool = False):
+        self.transactional = transactional
+        self._db_pool = db_pool
+        self._connection: Connection | None = None
+        self._transaction: Transaction | None = None
+        self._after_commit: list[Callable[[], None]] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def acquired(self) -> bool:
+        return self._connection is not None
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Connection]:
+        async with self._lock:
+            if self._connection is None:
+                self._connection = await self._db_pool.acquire(timeout=remaining_budget())
+                if self.transactional:
+                    self._transaction = self._connection.transaction()
+                    await self._transaction.start()
+            yield self._connection
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Call `callback` once the request-wide transaction is committed, right away outside of a transaction.
+        Callbacks are dropped if the transaction is rolled back.
+        """
+        if self._transaction is None:
+            callback()
+        else:
+            self._after_commit.append(callback)
+
+    async def commit(self) -> None:
+        """
+        Commit the request-wide transaction, later queries of the request run outside of a transaction.
+        """
+        if self._transaction is not None:
+            transaction, self._transaction = self._transaction, None
+            await transaction.commit()
+            callbacks, self._after_commit = self._after_commit, []
+            for callback in callbacks:
+                callback()
+
+    async def close(self) -> None:
+        """
+        Roll back the request-wide transaction if it was not committed and release the connection.
+        """
+        self._after_commit = []
+        if self._connection is None:
+            return
+        try:
+            if self._transaction is not None:
+                transaction, self._transaction = self._transaction, None
+                await transaction.rollback()
+        finally:
+            connection, self._connection = self._connection, None
+            await self._db_pool.release(connection)
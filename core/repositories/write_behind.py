@@ -0,0 +1,250 @@
+import asyncio
+import contextvars
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Coroutine
+
+from asyncpg import InterfaceError, PostgresConnectionError, PostgresError  # type: ignore
+
+logger = getLogger(__name__)
+
+
+def _is_row_error(err: Exception) -> bool:
+    """Errors caused by the rows of a batch (constraint, type, encoding), as opposed to an unavailable database."""
+    if isinstance(err, PostgresConnectionError):
+        return False
+    # Client-side encoding errors (asyncpg.DataError) are both InterfaceError and ValueError
+    return isinstance(err, (PostgresError, ValueError, TypeError)) or (
+        isinstance(err, InterfaceError) and isinstance(err, ValueError)
+    )
+
+
+class WriteBehindBuffer:
+    """
+    Buffer of entity updates written in batches.
+
+    Payloads of the same entity are merged, later values win, so a burst of updates of a row costs
+    a single row update. Buffered updates are written `window` seconds after the first one,
+    or right away once `max_pending` entities are buffered. Flushes are serialized, so an older
+    payload never overwrites a newer one.
+
+    An entity with the buffered payload applied can be buffered along with it, it is returned by `entity`
+    until the update is written, so further updates and reads of the entity need no read of the database.
+
+    Delivery is bounded: a batch failing because of its rows is split until the failing rows are isolated,
+    failed rows are retried with an exponential backoff and dropped (logged as dead letters)
+    after `max_attempts` failed writes.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[list[dict]], Awaitable[Any]],
+        window: float = 0.5,
+        max_pending: int = 1000,
+        max_attempts: int = 5,
+        max_retry_delay: float = 30.0,
+    ):
+        """
+        Args:
+            write: Writes the rows, each one with the `id` of the entity and its merged payload
+            window: Maximum delay in seconds of a buffered update
+            max_pending: Number of buffered entities that triggers an immediate flush
+            max_attempts: Number of failed writes after which an update is dropped
+            max_retry_delay: Maximum delay in seconds before retrying failed updates
+        """
+        self.window = window
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.max_retry_delay = max_retry_delay
+        self.buffered = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dead_letters = 0
+        self.background_errors = 0
+        self._write = write
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._flushing: dict[str, dict[str, Any]] = {}
+        # Entities with their buffered payload applied, by entity, dropped once the update is written or dropped
+        self._entities: dict[str, Any] = {}
+        # Failed writes by entity, reset once the update is written or dropped
+        self._attempts: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+        self._timer: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._flushing)
+
+    def add(self, entity_id: Any, payload: dict[str, Any], entity: Any = None) -> None:
+        """
+        Buffer an update of an entity.
+
+        Args:
+            entity_id: Id of the entity
+            payload: Fields to update
+            entity: The entity with all its buffered payloads applied, if known
+        """
+        key = str(entity_id)
+        self._pending[key] = {**self._pending.get(key, {}), **payload, 'id': entity_id}
+        if entity is not None:
+            self._entities[key] = entity
+        else:
+            self._entities.pop(key, None)
+        self.buffered += 1
+        if len(self._pending) >= self.max_pending:
+            self._spawn(self._flush_quietly())
+        else:
+            self._schedule(self.window)
+
+    def pending(self, entity_id: Any) -> dict[str, Any]:
+        """Payload not written yet of the entity, empty if there is none."""
+        key = str(entity_id)
+        payload = {**self._flushing.get(key, {}), **self._pending.get(key, {})}
+        payload.pop('id', None)
+        return payload
+
+    def entity(self, entity_id: Any) -> Any:
+        """Entity buffered with the payload not written yet, None if there is none."""
+        return self._entities.get(str(entity_id))
+
+    def pending_entities(self) -> list[tuple[dict[str, Any], Any]]:
+        """Payloads not written yet with their buffered entity (None if there is none)."""
+        return [(self.pending(key), self._entities.get(key)) for key in self._flushing.keys() | self._pending.keys()]
+
+    def _forget(self, key: str) -> None:
+        # An update buffered while the previous one was written has an entity of its own
+        if key not in self._pending:
+            self._entities.pop(key, None)
+
+    def _spawn(self, coroutine: Coroutine[Any, Any, None]) -> asyncio.Task:
+        # A fresh context: flushes must not inherit the deadline or the connection of the request that buffered
+        task = asyncio.get_running_loop().create_task(coroutine, context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is None:
+            self._timer = self._spawn(self._flush_later(delay))
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._timer = None
+        await self._flush_quietly()
+
+    async def _flush_quietly(self) -> None:
+        error = await self._flush()
+        if error is not None:
+            # Failed rows are already logged and scheduled again by _flush
+            self.background_errors += 1
+            logger.debug(f'Background flush of buffered updates failed: {error!r}')
+
+    async def flush(self, raise_errors: bool = True) -> None:
+        """
+        Write the buffered updates.
+
+        Args:
+            raise_errors: Raise the error of a failed write, failed updates are buffered for a retry either way
+
+        Raises:
+            Exception: The error of the last failed write if some updates are still buffered for a retry
+        """
+        error = await self._flush()
+        if error is not None and raise_errors:
+            raise error
+
+    async def _flush(self) -> Exception | None:
+        async with self._lock:
+            if not self._pending:
+                return None
+            self._flushing, self._pending = self._pending, {}
+            try:
+                failed, error = await self._write_batch(list(self._flushing.items()))
+            except BaseException:
+                # Cancelled: the rows may not have been written, writing them again is harmless
+                self._requeue(self._flushing)
+                raise
+            finally:
+                self._flushing = {}
+
+            retried = self._retry(dict(failed))
+            return error if retried else None
+
+    async def _write_batch(
+        self, rows: list[tuple[str, dict[str, Any]]]
+    ) -> tuple[list[tuple[str, dict[str, Any]]], Exception | None]:
+        """Write the rows, returns the rows that could not be written with the last error."""
+        try:
+            await self._write([row for _, row in rows])
+        except Exception as err:
+            if len(rows) > 1 and _is_row_error(err):
+                # Split the batch so the rows that can be written are not held back by the failing ones
+                middle = len(rows) // 2
+                first_failed, first_error = await self._write_batch(rows[:middle])
+                second_failed, second_error = await self._write_batch(rows[middle:])
+                return first_failed + second_failed, second_error or first_error
+            self.failures += 1
+            logger.warning(f'Failed to write {len(rows)} buffered updates', exc_info=True)
+            return rows, err
+
+        self.flushes += 1
+        self.flushed += len(rows)
+        for key, _ in rows:
+            self._attempts.pop(key, None)
+            self._forget(key)
+        return [], None
+
+    def _requeue(self, rows: dict[str, dict[str, Any]]) -> None:
+        # Updates buffered in the meantime are newer
+        for key, row in rows.items():
+            self._pending[key] = {**row, **self._pending.get(key, {})}
+
+    def _retry(self, failed: dict[str, dict[str, Any]]) -> bool:
+        """Buffer the failed rows again or drop the ones out of attempts, returns whether some are retried."""
+        retried: dict[str, dict[str, Any]] = {}
+        for key, row in failed.items():
+            attempts = self._attempts[key] = self._attempts.get(key, 0) + 1
+            if attempts < self.max_attempts:
+                retried[key] = row
+                continue
+            self._attempts.pop(key)
+            self._forget(key)
+            self.dead_letters += 1
+            logger.error(f'Dropped buffered update after {attempts} failed writes (dead letter): {row}')
+        if not retried:
+            return False
+
+        self._requeue(retried)
+        attempts = max(self._attempts[key] for key in retried)
+        self._schedule(min(self.window * 2 ** (attempts - 1), self.max_retry_delay))
+        return True
+
+    async def close(self) -> None:
+        """
+        Write all buffered updates, the buffer must not be used anymore.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Flushes already running are awaited, cancelling them would only delay their rows
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        try:
+            await self.flush()
+        finally:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'window': self.window,
+            'max_pending': self.max_pending,
+            'max_attempts': self.max_attempts,
+            'pending': len(self),
+            'buffered': self.buffered,
+            'flushed': self.flushed,
+            'flushes': self.flushes,
+            'failures': self.failures,
+            'dead_letters': self.dead_letters,
+            'background_errors': self.background_errors,
+        }
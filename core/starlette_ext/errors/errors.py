@@ -17,6 +17,11 @@ class ValidationError(AppError):
     status_code: int = 400
 
 
+class UnauthorizedError(AppError):
+    status_code: int = 401
+    message: str = 'Unauthorized'
+
+
 class MethodNotAllowedError(AppError):
     status_code: int = 405
     message: str = 'Method Not Allowed'
@@ -24,3 +29,8 @@ class MethodNotAllowedError(AppError):
 
 class NotFoundError(AppError):
     status_code: int = 404
+
+
+class GatewayTimeoutError(AppError):
+    status_code: int = 504
+    message: str = 'Gateway Timeout'
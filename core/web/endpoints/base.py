@@ -1,7 +1,11 @@
+import asyncio
+import contextvars
 import logging
+import math
+import time
 from abc import abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, AsyncGenerator, Mapping
+from typing import Any, AsyncGenerator, Mapping, Sequence
 
 from pydantic import BaseModel
 from pydantic_core import PydanticSerializationError
@@ -9,13 +13,18 @@ from pydantic_core import ValidationError as PydanticValidationError
 from starlette.datastructures import State
 from starlette.endpoints import HTTPEndpoint
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
-from core.starlette_ext.errors.errors import AppError, ValidationError
+from core.repositories.deadline import deadline
+from core.repositories.replicas import ReplicaRouter, last_write_ctx
+from core.starlette_ext.errors.errors import AppError, GatewayTimeoutError, ValidationError
 from core.web.endpoints.parsers.base import BodyParser
 
 logger = logging.getLogger(__name__)
 
+# Time of the last write of the client, its next requests do not read from replicas that have not replayed it
+LAST_WRITE_COOKIE = 'last_write'
+
 
 @dataclass
 class EndpointMeta:
@@ -24,6 +33,12 @@ class EndpointMeta:
     summary: str | None = None
     tag: str | None = None
     operation_id: str | None = None
+    # Latency budget in seconds shared by the database calls of the request, the app default if None
+    timeout: float | None = None
+
+
+class ClientDisconnectedError(Exception):
+    pass
 
 
 @dataclass
@@ -56,6 +71,9 @@ class BaseEndpoint(HTTPEndpoint):
     schema_path: type[BaseModel] | None = None
     schema_headers: type[BaseModel] | None = None
 
+    # Sparse fieldset requested with the `fields` query parameter, the response only contains these fields
+    response_fields: Sequence[str] | None = None
+
     body_parser: BodyParser
 
     _media_type: str
@@ -81,16 +99,88 @@ class BaseEndpoint(HTTPEndpoint):
         body = await self.body_parser.parse(request=request, schema=self.schema_body)
         return RequestParams(path=path, query=query, headers=headers, body=body)
 
+    def _latency_budget(self) -> float | None:
+        if self.meta.timeout is not None:
+            return self.meta.timeout
+        return getattr(self.request.app.state, 'request_timeout', None)
+
+    def _replica_router(self) -> ReplicaRouter | None:
+        return getattr(self.state, 'replica_router', None)
+
+    def _restore_last_write(self, request: Request) -> float:
+        if self._replica_router() is None:
+            return 0.0
+        try:
+            last_write = float(request.cookies.get(LAST_WRITE_COOKIE, 0.0))
+        except ValueError:
+            last_write = 0.0
+        # A time in the future (forged or skewed cookie) would pin the client to the primary
+        last_write = min(last_write, time.time())
+        last_write_ctx.set(last_write)
+        return last_write
+
+    def _remember_last_write(self, response: Response, restored: float) -> None:
+        replica_router = self._replica_router()
+        last_write = last_write_ctx.get()
+        if replica_router is None or last_write <= restored:
+            return
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            str(last_write),
+            max_age=math.ceil(replica_router.read_your_writes_window),
+            httponly=True,
+            samesite='lax',
+        )
+
+    async def _wait_for_disconnect(self) -> None:
+        while (await self.receive())['type'] != 'http.disconnect':
+            pass
+
+    async def _execute_until_disconnect(self, params: RequestParams) -> Any:
+        """
+        Execute the endpoint and cancel it (with its in-flight queries) if the client disconnects first.
+        """
+        # A streamed body is still being received by the endpoint itself
+        if isinstance(params.body, AsyncGenerator):
+            return await self.execute(params=params)
+
+        context = contextvars.copy_context()
+        execution = asyncio.get_running_loop().create_task(self.execute(params=params), context=context)
+        disconnect = asyncio.ensure_future(self._wait_for_disconnect())
+        try:
+            await asyncio.wait({execution, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnect.cancel()
+            if not execution.done():
+                execution.cancel()
+                await asyncio.gather(execution, return_exceptions=True)
+
+        if execution.cancelled():
+            raise ClientDisconnectedError()
+        # Context variables set by the execution (e.g. the replica write mark) still apply to the response,
+        # a streamed response runs its queries after the execution task is done
+        for var, value in context.items():
+            if var.get(None) is not value:
+                var.set(value)
+        return execution.result()
+
     async def _dispatch(self, request: Request):
         request = Request(self.scope, receive=self.receive)
-        params = await self._get_request(request=request)
+        with deadline(self._latency_budget()):
+            last_write = self._restore_last_write(request)
+            params = await self._get_request(request=request)
+            self.response_fields = params.query.get('fields')
 
-        response_data = await self.execute(params=params)
-        response = await self.get_response(data=response_data)
+            response_data = await self._execute_until_disconnect(params)
+            response = await self.get_response(data=response_data)
+            self._remember_last_write(response, last_write)
+            await self.before_send()
 
         return await response(self.scope, self.receive, self.send)
 
     async def _handle_exceptions(self, err: Exception):
+        if isinstance(err, TimeoutError):
+            err = GatewayTimeoutError('Latency budget exceeded')
         if isinstance(err, AppError):
             response = JSONResponse(
                 status_code=err.status_code,
@@ -121,9 +211,14 @@ class BaseEndpoint(HTTPEndpoint):
         try:
             request = Request(self.scope, receive=self.receive)
             return await self._dispatch(request=request)
+        except ClientDisconnectedError:
+            logger.info(f'Client disconnected, {self.request.url.path} cancelled')
         except Exception as err:
             return await self._handle_exceptions(err=err)
 
     @abstractmethod
     async def execute(self, params: RequestParams) -> Any:
         """Method to execute endpoint"""
+
+    async def before_send(self) -> None:
+        """Method called when the response is built, right before it is sent"""
@@ -1,8 +1,10 @@
-from typing import Any, get_args, get_origin
+from typing import Any, AsyncGenerator, AsyncIterator, Collection, get_args, get_origin
 
+import ujson
 from pydantic import BaseModel
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
+from core.repositories.pagination import Page
 from core.web.endpoints.base import BaseEndpoint
 from core.web.endpoints.parsers.json import JSONBodyParser
 
@@ -12,21 +14,77 @@ class JSONEndpoint(BaseEndpoint):
 
     _media_type: str = 'application/json'
     _response_media_type: str = 'application/json'
+    _ndjson_media_type: str = 'application/x-ndjson'
+
+    @staticmethod
+    def _dump(data: Any) -> Any:
+        if isinstance(data, BaseModel):
+            return data.model_dump(mode='json')
+        if isinstance(data, list):
+            return [item.model_dump(mode='json') if isinstance(item, BaseModel) else item for item in data]
+        return data
+
+    @classmethod
+    def _serialize(cls, data: Any, schema: type[BaseModel] | None) -> Any:
+        data = cls._dump(data)
+        return schema.model_validate(data).model_dump(mode='json') if schema else data
+
+    @classmethod
+    def _project(cls, data: Any, fields: Collection[str]) -> Any:
+        """
+        Serialize only the requested fields of the entities.
+        Projected entities are partial, so they are not validated against the response schema.
+        """
+        if isinstance(data, Page):
+            return {**data.model_dump(mode='json', exclude={'items'}), 'items': cls._project(data.items, fields)}
+        if isinstance(data, list):
+            return [cls._project(item, fields) for item in data]
+        return {key: value for key, value in cls._dump(data).items() if key in fields}
+
+    async def _stream(self, data: AsyncIterator[Any], ndjson: bool) -> AsyncIterator[bytes]:
+        schema = get_args(self.schema_response)[0] if get_origin(self.schema_response) is list else None
+        separator = b'' if ndjson else b'['
+        fields = set(self.response_fields) if self.response_fields else None
+        try:
+            async for item in data:
+                item = self._project(item, fields) if fields else self._serialize(item, schema)
+                chunk = ujson.dumps(item).encode()
+                if ndjson:
+                    yield chunk + b'\n'
+                else:
+                    yield separator + chunk
+                    separator = b','
+        finally:
+            if isinstance(data, AsyncGenerator):
+                await data.aclose()
+
+        if not ndjson:
+            yield b'[]' if separator == b'[' else b']'
+
+    def _stream_response(self, data: AsyncIterator[Any], status_code: int, headers: dict[str, str] | None) -> Response:
+        """
+        Stream items of an async iterator as a JSON array, or as NDJSON if the client accepts it.
+        """
+        ndjson = self._ndjson_media_type in self.request.headers.get('accept', '')
+        return StreamingResponse(
+            self._stream(data, ndjson=ndjson),
+            status_code=status_code,
+            headers=headers,
+            media_type=self._ndjson_media_type if ndjson else self._response_media_type,
+        )
 
     async def get_response(self, data: Any, status_code: int = 200, headers: dict[str, str] | None = None) -> Response:
+        if isinstance(data, AsyncIterator):
+            return self._stream_response(data, status_code=status_code, headers=headers)
+
         response: Any = None
-        if isinstance(data, list) and len(data) > 0:
-            if isinstance(data[0], BaseModel):
-                data = [item.model_dump(mode='json') for item in data]
-        if isinstance(data, BaseModel):
-            data = data.model_dump(mode='json')
-        if get_origin(self.schema_response) is list:
+        if self.response_fields:
+            response = self._project(data, set(self.response_fields))
+        elif get_origin(self.schema_response) is list:
             inner_type = get_args(self.schema_response)[0]
-            response = [inner_type.model_validate(item).model_dump(mode='json') for item in data]
+            response = [self._serialize(item, inner_type) for item in data]
         else:
-            response = (
-                self.schema_response.model_validate(data).model_dump(mode='json') if self.schema_response else data
-            )
+            response = self._serialize(data, self.schema_response)
 
         return JSONResponse(
             content=response,
@@ -1,12 +1,16 @@
 import asyncio
 import logging
 import signal
+import sys
 from typing import Optional
 
 import uvicorn
 import uvloop
 
-from settings import app_config, logs_config
+from app.archival import create_archival_worker
+from app.repositories.repositories import DBRepositories
+from core.repositories.pool import create_pool
+from settings import app_config, archival_config, db_config, logs_config
 from web.create_app import AppBuilder
 
 logger = logging.getLogger(__name__)
@@ -40,7 +44,35 @@ def handle_exit(server: Optional[uvicorn.Server], loop: Optional[asyncio.Abstrac
         loop.stop()
 
 
+async def run_archival(once: bool) -> None:
+    """
+    Run the archival worker outside of the app, a single pass with `once`.
+    """
+    db_pool = await create_pool(
+        db_config.dsn, min_size=1, max_size=1, server_settings=db_config.pool_server_settings or None
+    )
+    try:
+        worker = create_archival_worker(DBRepositories.create(db_pool=db_pool), archival_config.model_dump())
+        if once:
+            moved = await worker.run_once()
+            logger.info(f'Archived rows moved: {moved}')
+        else:
+            await worker.run()
+    finally:
+        await db_pool.close()
+
+
 if __name__ == '__main__':
+    # python manage.py archive [--once]
+    if sys.argv[1:2] == ['archive']:
+        logging.basicConfig(level=logs_config.log_level.upper())
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        try:
+            asyncio.run(run_archival(once='--once' in sys.argv[2:]))
+        except KeyboardInterrupt:
+            pass
+        sys.exit()
+
     server = create_server()
 
     asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
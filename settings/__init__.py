@@ -1,3 +1,6 @@
 from .app import app_config
+from .archival import archival_config
 from .db import db_config
+from .leaderboards import leaderboards_config
 from .logs import logs_config
+from .write_behind import write_behind_config
@@ -10,6 +10,10 @@ class AppConfig(BaseSettings):
     debug: bool = Field(default=False, validation_alias='DEBUG')
     port: int = Field(default=5000, validation_alias='PORT')
     event_loop: str = Field(default='uvloop', validation_alias='EVENT_LOOP')
+    # Default latency budget in seconds of the database calls of a request, endpoints may override it in meta
+    request_timeout: float | None = Field(default=30.0, validation_alias='REQUEST_TIMEOUT')
+    # Bearer token of the /admin routes (query stats, pools, caches), empty does not mount them
+    admin_token: str = Field(default='', validation_alias='ADMIN_TOKEN')
     cors_settings: dict[str, Any] = Field(
         default={
             'allow_origins': ['*'],
@@ -0,0 +1,21 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ArchivalConfig(BaseSettings):
+    model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
+
+    # Run the archival worker in the app process, it can also be run with `python manage.py archive`
+    enabled: bool = Field(validation_alias='ARCHIVAL_ENABLED', default=False)
+    # Tables whose archived rows are moved to their archive table
+    tables: list[str] = Field(validation_alias='ARCHIVAL_TABLES', default=['user_challenges', 'user_contacts'])
+    # Days archived rows are kept in the hot tables
+    retention_days: float = Field(validation_alias='ARCHIVAL_RETENTION_DAYS', default=30.0)
+    batch_size: int = Field(validation_alias='ARCHIVAL_BATCH_SIZE', default=1000)
+    # Seconds between two passes over the tables
+    interval: float = Field(validation_alias='ARCHIVAL_INTERVAL', default=600.0)
+    # Seconds between two batches
+    pause: float = Field(validation_alias='ARCHIVAL_PAUSE', default=0.1)
+
+
+archival_config = ArchivalConfig()
@@ -6,6 +6,37 @@ class DBConfig(BaseSettings):
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
 
     dsn: str = Field(validation_alias='DB_DSN', default='')
+    pool_min_size: int = Field(validation_alias='DB_POOL_MIN_SIZE', default=10)
+    pool_max_size: int = Field(validation_alias='DB_POOL_MAX_SIZE', default=10)
+    pool_max_inactive_connection_lifetime: float = Field(
+        validation_alias='DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME', default=300.0
+    )
+    # Size of the asyncpg per-connection statement cache, 0 disables it (e.g. behind pgbouncer)
+    pool_statement_cache_size: int = Field(validation_alias='DB_POOL_STATEMENT_CACHE_SIZE', default=100)
+    # Session settings of every connection, e.g. {"application_name": "challengeup", "statement_timeout": "30s"}
+    pool_server_settings: dict[str, str] = Field(validation_alias='DB_POOL_SERVER_SETTINGS', default={})
+    # Number of statements with execution statistics, 0 disables them
+    prepared_statements_size: int = Field(validation_alias='DB_PREPARED_STATEMENTS_SIZE', default=0)
+    replica_dsns: list[str] = Field(validation_alias='DB_REPLICA_DSNS', default=[])
+    replica_max_lag: float = Field(validation_alias='DB_REPLICA_MAX_LAG', default=5.0)
+    replica_sticky_window: float = Field(validation_alias='DB_REPLICA_STICKY_WINDOW', default=2.0)
+    replica_lag_check_interval: float = Field(validation_alias='DB_REPLICA_LAG_CHECK_INTERVAL', default=1.0)
+    # TTL in seconds by table name, e.g. {"challenges": 60, "users": 30}, tables not listed are not cached
+    entity_cache_ttls: dict[str, float] = Field(validation_alias='DB_ENTITY_CACHE_TTLS', default={})
+    entity_cache_size: int = Field(validation_alias='DB_ENTITY_CACHE_SIZE', default=10_000)
+    # NOTIFY channel of cross-process entity cache invalidations, empty disables them
+    invalidation_channel: str = Field(validation_alias='DB_INVALIDATION_CHANNEL', default='entity_changes')
+    invalidation_heartbeat_interval: float = Field(validation_alias='DB_INVALIDATION_HEARTBEAT_INTERVAL', default=5.0)
+    invalidation_reconnect_interval: float = Field(validation_alias='DB_INVALIDATION_RECONNECT_INTERVAL', default=1.0)
+    # Number of hash partitions of user_challenges, read by the migration that partitions the table
+    user_challenges_partitions: int = Field(validation_alias='DB_USER_CHALLENGES_PARTITIONS', default=16, ge=1)
+    # Queries slower than the threshold (seconds) are logged, a sample of them is explained with EXPLAIN ANALYZE
+    slow_query_threshold: float = Field(validation_alias='DB_SLOW_QUERY_THRESHOLD', default=0.5)
+    slow_query_explain_rate: float = Field(validation_alias='DB_SLOW_QUERY_EXPLAIN_RATE', default=0.1)
+    # Large tables on which a sequential scan in the plan of a slow query is flagged
+    seq_scan_tables: list[str] = Field(
+        validation_alias='DB_SEQ_SCAN_TABLES', default=['users', 'user_contacts', 'user_challenges']
+    )
 
 
 db_config = DBConfig()
@@ -0,0 +1,21 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class LeaderboardsConfig(BaseSettings):
+    model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
+
+    enabled: bool = Field(validation_alias='LEADERBOARDS_ENABLED', default=True)
+    # Rank score by user challenge status, higher is better, statuses not listed are not ranked
+    status_scores: dict[str, int] = Field(
+        validation_alias='LEADERBOARDS_STATUS_SCORES', default={'completed': 3, 'done': 3, 'active': 2, 'pending': 1}
+    )
+    # Seconds between catch-ups that read the user challenges updated by other processes, 0 disables refreshes
+    refresh_interval: float = Field(validation_alias='LEADERBOARDS_REFRESH_INTERVAL', default=60.0)
+    # Seconds of updates read again by every catch-up, covers long transactions and replica lag
+    refresh_overlap: float = Field(validation_alias='LEADERBOARDS_REFRESH_OVERLAP', default=30.0)
+    # Seconds between full rebuilds from the database that repair anything the catch-ups missed, 0 disables them
+    rebuild_interval: float = Field(validation_alias='LEADERBOARDS_REBUILD_INTERVAL', default=3600.0)
+
+
+leaderboards_config = LeaderboardsConfig()
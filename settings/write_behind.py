@@ -0,0 +1,18 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class WriteBehindConfig(BaseSettings):
+    model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
+
+    # Buffer user challenge updates by id and write them in batches instead of one UPDATE per request
+    user_challenges_enabled: bool = Field(validation_alias='WRITE_BEHIND_USER_CHALLENGES', default=False)
+    # Maximum delay in seconds of a buffered update
+    window: float = Field(validation_alias='WRITE_BEHIND_WINDOW', default=0.5)
+    # Number of buffered rows that triggers an immediate write
+    max_pending: int = Field(validation_alias='WRITE_BEHIND_MAX_PENDING', default=1000)
+    # Failed writes after which a buffered update is dropped and logged as a dead letter
+    max_attempts: int = Field(validation_alias='WRITE_BEHIND_MAX_ATTEMPTS', default=5, ge=1)
+
+
+write_behind_config = WriteBehindConfig()
@@ -0,0 +1,28 @@
+from typing import AsyncIterator
+
+import asyncpg  # type: ignore
+import pytest
+from asyncpg import PostgresError  # type: ignore
+
+from app.repositories.repositories import DBRepositories
+from settings import db_config
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return 'asyncio'
+
+
+@pytest.fixture
+async def db_repos() -> AsyncIterator[DBRepositories]:
+    """Repositories on the database of DB_DSN, migrated to head. Tests using them are skipped without it."""
+    if not db_config.dsn:
+        pytest.skip('DB_DSN is not set')
+    try:
+        db_pool = await asyncpg.create_pool(db_config.dsn, min_size=1, max_size=2)
+    except (OSError, PostgresError) as err:
+        pytest.skip(f'Database is not available: {err}')
+    try:
+        yield DBRepositories.create(db_pool=db_pool)
+    finally:
+        await db_pool.close()
@@ -0,0 +1,67 @@
+import uuid
+
+import pytest
+
+from app.models.user_contacts import ContactType
+from app.repositories.repositories import DBRepositories
+
+
+async def create_user(db_repos: DBRepositories) -> uuid.UUID:
+    user = await db_repos.users.create(first_name='get_or_create')
+    return user.id
+
+
+@pytest.mark.anyio
+async def test_get_or_create_returns_existing(db_repos: DBRepositories) -> None:
+    user_id = await create_user(db_repos)
+    contact = f'{uuid.uuid4()}@example.com'
+
+    created = await db_repos.user_contacts.get_or_create(
+        user_id=user_id, contact_type=ContactType.EMAIL, contact=contact
+    )
+    existing = await db_repos.user_contacts.get_or_create(
+        user_id=user_id, contact_type=ContactType.EMAIL, contact=contact
+    )
+
+    assert existing.id == created.id
+    assert existing.updated == created.updated
+
+
+@pytest.mark.anyio
+async def test_get_or_create_restores_archived(db_repos: DBRepositories) -> None:
+    user_id = await create_user(db_repos)
+    contact = f'{uuid.uuid4()}@example.com'
+    created = await db_repos.user_contacts.create(user_id=user_id, contact_type=ContactType.EMAIL, contact=contact)
+    await db_repos.user_contacts.archive_by_id(created.id)
+
+    restored = await db_repos.user_contacts.get_or_create(
+        user_id=user_id, contact_type=ContactType.EMAIL, contact=contact
+    )
+
+    assert restored.id == created.id
+    assert not restored.archived
+
+
+@pytest.mark.anyio
+async def test_get_or_create_ambiguous(db_repos: DBRepositories) -> None:
+    owner_id, other_id = await create_user(db_repos), await create_user(db_repos)
+    contact = f'{uuid.uuid4()}@example.com'
+    created = await db_repos.user_contacts.create(user_id=owner_id, contact_type=ContactType.EMAIL, contact=contact)
+
+    with pytest.raises(ValueError, match='Ambiguous'):
+        await db_repos.user_contacts.get_or_create(user_id=other_id, contact_type=ContactType.EMAIL, contact=contact)
+    assert (await db_repos.user_contacts.get_by_id(created.id)).user_id == owner_id
+
+
+@pytest.mark.anyio
+async def test_get_or_create_does_not_restore_archived_of_another_user(db_repos: DBRepositories) -> None:
+    owner_id, other_id = await create_user(db_repos), await create_user(db_repos)
+    contact = f'{uuid.uuid4()}@example.com'
+    created = await db_repos.user_contacts.create(user_id=owner_id, contact_type=ContactType.EMAIL, contact=contact)
+    await db_repos.user_contacts.archive_by_id(created.id)
+
+    with pytest.raises(ValueError, match='Ambiguous'):
+        await db_repos.user_contacts.get_or_create(user_id=other_id, contact_type=ContactType.EMAIL, contact=contact)
+    archived = await db_repos.user_contacts.get_by_id(created.id, include_archived=True)
+    assert archived.archived
+    assert archived.user_id == owner_id
@@ -0,0 +1,48 @@
+import datetime
+import uuid
+
+import pytest
+
+from app.repositories.repositories import DBRepositories
+from core.repositories.errors import InvalidCursorError
+from core.repositories.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip() -> None:
+    created = datetime.datetime(2026, 10, 18, 12, 30, 15, 123456)
+    entity_id = uuid.uuid4()
+    cursor = encode_cursor('-created', [created, entity_id])
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor, '-created') == [created.isoformat(), str(entity_id)]
+
+
+def test_cursor_of_another_ordering() -> None:
+    cursor = encode_cursor('created', ['2026-10-18T12:30:15', str(uuid.uuid4())])
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, '-created')
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor', encode_cursor('id', 'abc'), 'W10'])
+def test_malformed_cursor(cursor: str) -> None:
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 'id')
+
+
+@pytest.mark.anyio
+async def test_search_page_walks_every_row_once(db_repos: DBRepositories) -> None:
+    title = f'keyset {uuid.uuid4()}'
+    created = await db_repos.challenges.create_many([{'title': title} for _ in range(5)])
+
+    seen: list[uuid.UUID] = []
+    cursor = None
+    while True:
+        page = await db_repos.challenges.search_page(order_by='-created', limit=2, cursor=cursor, title=title)
+        seen.extend(challenge.id for challenge in page.items)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    assert sorted(seen) == sorted(challenge.id for challenge in created)
+    await db_repos.challenges.archive(title=title)
@@ -0,0 +1,58 @@
+import pytest
+import sqlalchemy as sa
+
+from app.models.challenges import Challenges
+from core.repositories.query import CompiledQueryCache, CompiledStatement, compile_query, compiled_query_cache
+
+table = Challenges.__table__  # type: ignore[attr-defined]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache() -> None:
+    compiled_query_cache.clear()
+
+
+def by_titles(*titles: str) -> sa.Select:
+    return sa.select(table).where(table.c.title.in_(titles))
+
+
+def test_compile_query_reuses_statement_for_same_shape() -> None:
+    first_sql, first_params = compile_query(by_titles('a', 'b'))
+    second_sql, second_params = compile_query(by_titles('c', 'd'))
+
+    assert first_sql == second_sql
+    assert first_params == ['a', 'b']
+    assert second_params == ['c', 'd']
+    assert len(compiled_query_cache) == 1
+
+
+def test_compile_query_keys_on_in_list_length() -> None:
+    two_sql, two_params = compile_query(by_titles('a', 'b'))
+    three_sql, three_params = compile_query(by_titles('a', 'b', 'c'))
+
+    assert two_sql.count('$') == 2
+    assert three_sql.count('$') == 3
+    assert three_params == ['a', 'b', 'c']
+    assert len(compiled_query_cache) == 2
+    # Back to the first length, served from the cache with the new values
+    assert compile_query(by_titles('x', 'y')) == (two_sql, ['x', 'y'])
+
+
+def test_compile_query_empty_in_list() -> None:
+    sql, params = compile_query(by_titles())
+
+    assert params == []
+    assert compile_query(by_titles()) == (sql, [])
+    assert compile_query(by_titles('a')) != (sql, [])
+
+
+def test_compiled_query_cache_evicts_least_recently_used() -> None:
+    cache = CompiledQueryCache(maxsize=2)
+    cache.put('a', CompiledStatement(sql='a', extractors=()))
+    cache.put('b', CompiledStatement(sql='b', extractors=()))
+    cache.get('a')
+    cache.put('c', CompiledStatement(sql='c', extractors=()))
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,52 @@
+import uuid
+
+import pytest
+
+from app.models.challenges import Challenges
+from app.repositories.repositories import DBRepositories
+from core.repositories.query import update_many
+
+table = Challenges.__table__  # type: ignore[attr-defined]
+
+
+def test_update_many_query_rejects_duplicate_ids() -> None:
+    entity_id = uuid.uuid4()
+
+    with pytest.raises(ValueError, match='unique'):
+        update_many(table, [{'id': entity_id, 'title': 'a'}, {'id': entity_id, 'title': 'b'}])
+
+
+def test_update_many_query_rejects_different_columns() -> None:
+    with pytest.raises(ValueError, match='same columns'):
+        update_many(table, [{'id': uuid.uuid4(), 'title': 'a'}, {'id': uuid.uuid4(), 'description': 'b'}])
+
+
+@pytest.mark.anyio
+async def test_update_many_merges_rows_of_the_same_id(db_repos: DBRepositories) -> None:
+    first, second = await db_repos.challenges.create_many([{'title': 'first'}, {'title': 'second'}])
+
+    updated = await db_repos.challenges.update_many(
+        [
+            {'id': first.id, 'title': 'first 1'},
+            {'id': second.id, 'title': 'second 1'},
+            {'id': first.id, 'title': 'first 2', 'description': 'merged'},
+        ]
+    )
+
+    by_id = {challenge.id: challenge for challenge in updated}
+    assert len(updated) == 2
+    assert (by_id[first.id].title, by_id[first.id].description) == ('first 2', 'merged')
+    assert (by_id[second.id].title, by_id[second.id].description) == ('second 1', None)
+    await db_repos.challenges.archive(id_in=[first.id, second.id])
+
+
+@pytest.mark.anyio
+async def test_update_many_skips_missing_ids(db_repos: DBRepositories) -> None:
+    (challenge,) = await db_repos.challenges.create_many([{'title': 'existing'}])
+
+    updated = await db_repos.challenges.update_many(
+        [{'id': challenge.id, 'title': 'updated'}, {'id': uuid.uuid4(), 'title': 'missing'}]
+    )
+
+    assert [(entity.id, entity.title) for entity in updated] == [(challenge.id, 'updated')]
+    await db_repos.challenges.archive_by_id(challenge.id)
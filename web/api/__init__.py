@@ -1 +1 @@
-from . import challenges, user_challenges, user_contacts, users
+from . import admin, challenges, leaderboards, user_challenges, user_contacts, users
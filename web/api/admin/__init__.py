@@ -0,0 +1,10 @@
+from .admin import (
+    GetArchivalStats,
+    GetDBPoolStats,
+    GetEntityCacheStats,
+    GetInvalidationBusStats,
+    GetLeaderboardStats,
+    GetQueryStats,
+    GetWriteBehindStats,
+    ResetQueryStats,
+)
@@ -0,0 +1,94 @@
+import hmac
+import logging
+from functools import partial
+from typing import Any
+
+from starlette.requests import Request
+
+from core.starlette_ext.errors.errors import UnauthorizedError
+from core.web.endpoints.base import EndpointMeta, RequestParams
+from core.web.endpoints.json import JSONEndpoint
+from settings.app import app_config
+
+logger = logging.getLogger(__name__)
+
+meta = partial(EndpointMeta, tag='admin')
+
+
+class AdminEndpoint(JSONEndpoint):
+    """
+    Endpoint exposing internals (SQL text, plans, pool and cache state), only served to requests
+    with the `Authorization: Bearer <ADMIN_TOKEN>` header.
+    """
+
+    async def _get_request(self, request: Request) -> RequestParams:
+        expected = f'Bearer {app_config.admin_token}'.encode()
+        authorization = request.headers.get('authorization', '').encode()
+        if not app_config.admin_token or not hmac.compare_digest(authorization, expected):
+            raise UnauthorizedError('Invalid admin token')
+        return await super()._get_request(request)
+
+
+class GetEntityCacheStats(AdminEndpoint):
+    meta = meta(summary='Get entity cache stats')
+
+    async def execute(self, params: RequestParams) -> Any:
+        return {table_name: cache.stats() for table_name, cache in self.state.entity_caches.items()}
+
+
+class GetInvalidationBusStats(AdminEndpoint):
+    meta = meta(summary='Get cache invalidation bus stats')
+
+    async def execute(self, params: RequestParams) -> Any:
+        invalidation_bus = self.state.invalidation_bus
+        return invalidation_bus.stats() if invalidation_bus is not None else None
+
+
+class GetDBPoolStats(AdminEndpoint):
+    meta = meta(summary='Get DB pool metrics')
+
+    async def execute(self, params: RequestParams) -> Any:
+        replica_router = self.state.replica_router
+        return {
+            'primary': self.state.db_pool.metrics(),
+            'replicas': [replica.metrics() for replica in replica_router.replicas] if replica_router else [],
+        }
+
+
+class GetLeaderboardStats(AdminEndpoint):
+    meta = meta(summary='Get leaderboard stats')
+
+    async def execute(self, params: RequestParams) -> Any:
+        leaderboards = self.state.leaderboards
+        return leaderboards.stats() if leaderboards is not None else None
+
+
+class GetWriteBehindStats(AdminEndpoint):
+    meta = meta(summary='Get write-behind buffer stats')
+
+    async def execute(self, params: RequestParams) -> Any:
+        buffer = self.state.user_challenges_write_behind
+        return buffer.stats() if buffer is not None else None
+
+
+class GetArchivalStats(AdminEndpoint):
+    meta = meta(summary='Get archival worker stats')
+
+    async def execute(self, params: RequestParams) -> Any:
+        worker = self.state.archival_worker
+        return worker.stats() if worker is not None else None
+
+
+class GetQueryStats(AdminEndpoint):
+    meta = meta(summary='Get query stats and slow queries')
+
+    async def execute(self, params: RequestParams) -> Any:
+        return self.state.query_stats.stats()
+
+
+class ResetQueryStats(AdminEndpoint):
+    meta = meta(summary='Reset query stats and slow queries')
+
+    async def execute(self, params: RequestParams) -> Any:
+        self.state.query_stats.clear()
+        return self.state.query_stats.stats()
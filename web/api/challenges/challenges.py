@@ -2,7 +2,8 @@ import logging
 from functools import partial
 from typing import Any
 
-from app.models.challenges import Challenges
+from app.models.challenges import Challenges, ChallengesWithParticipants
+from core.repositories.pagination import Page
 from core.utils.types import partial_apply
 from core.web.endpoints.base import EndpointMeta, RequestParams
 from core.web.endpoints.json import JSONEndpoint
@@ -20,7 +21,7 @@ class GetChallenges(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Get challenges')
 
     schema_query = schemas.GetChallengesQuery
-    schema_response = list[Challenges]
+    schema_response = Page[ChallengesWithParticipants]
 
     async def execute(self, params: RequestParams) -> Any:
         return await self.challenges_service.get_challenges(**params.query)
@@ -51,10 +52,11 @@ class GetChallengeByID(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Get challenge by id')
 
     schema_path = GetByID
-    schema_response = Challenges
+    schema_query = schemas.GetChallengeQuery
+    schema_response = ChallengesWithParticipants
 
     async def execute(self, params: RequestParams) -> Any:
-        return await self.challenges_service.get_challenge_by_id(challenge_id=params.path['id'])
+        return await self.challenges_service.get_challenge_by_id(challenge_id=params.path['id'], **params.query)
 
 
 class DeleteChallengeByID(JSONEndpoint, ChallengesMixin):
@@ -1,7 +1,14 @@
-from pydantic import BaseModel
+from app.models.challenges import Challenges, ChallengesWithParticipants
+from web.api.schemas import FieldsQuery, FilterQuery, OrderQuery, PaginationQuery
 
 
-class GetChallengesQuery(BaseModel):
+class GetChallengeQuery(FieldsQuery):
+    fields_entity = ChallengesWithParticipants
+
+
+class GetChallengesQuery(PaginationQuery, GetChallengeQuery, OrderQuery, FilterQuery):
+    order_entity = Challenges
+    filter_entity = Challenges
+
     title: str | None = None
-    order_by: str | None = None
     archived: bool = False
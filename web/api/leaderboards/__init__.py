@@ -0,0 +1 @@
+from .leaderboards import GetLeaderboard, GetUserRank
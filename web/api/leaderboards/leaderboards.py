@@ -0,0 +1,35 @@
+import logging
+from functools import partial
+from typing import Any
+
+from app.leaderboards import LeaderboardEntry
+from core.web.endpoints.base import EndpointMeta, RequestParams
+from core.web.endpoints.json import JSONEndpoint
+from web.mixins.challenges_mixin import ChallengesMixin
+
+from . import schemas
+
+logger = logging.getLogger(__name__)
+
+meta = partial(EndpointMeta, tag='leaderboards')
+
+
+class GetLeaderboard(JSONEndpoint, ChallengesMixin):
+    meta = meta(summary='Get top participants of a challenge')
+
+    schema_path = schemas.GetLeaderboardPath
+    schema_query = schemas.GetLeaderboardQuery
+    schema_response = list[LeaderboardEntry]
+
+    async def execute(self, params: RequestParams) -> Any:
+        return self.leaderboard_service.get_top(challenge_id=params.path['id'], **params.query)
+
+
+class GetUserRank(JSONEndpoint, ChallengesMixin):
+    meta = meta(summary='Get rank of a user in a challenge')
+
+    schema_path = schemas.GetUserRankPath
+    schema_response = LeaderboardEntry
+
+    async def execute(self, params: RequestParams) -> Any:
+        return self.leaderboard_service.get_user_rank(challenge_id=params.path['id'], user_id=params.path['user_id'])
@@ -0,0 +1,21 @@
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from core.repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+class GetLeaderboardPath(BaseModel):
+    id: UUID
+
+
+class GetLeaderboardQuery(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    offset: int = Field(default=0, ge=0)
+
+
+class GetUserRankPath(BaseModel):
+    id: UUID
+    user_id: UUID
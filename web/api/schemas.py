@@ -1,7 +1,90 @@
+from typing import Any, ClassVar
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from sqlmodel import SQLModel
+
+from core.repositories.counts import CountMode
+from core.repositories.filters import filter_plan
+from core.repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 class GetByID(BaseModel):
     id: UUID
+
+
+class PaginationQuery(BaseModel):
+    # Unknown query parameters are rejected instead of being silently ignored as filters
+    model_config = ConfigDict(extra='forbid')
+
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    cursor: str | None = None
+    total: CountMode | None = Field(default=None, description='Include the total count: exact, cached or estimated')
+
+
+class FieldsQuery(BaseModel):
+    """Sparse fieldset of the response, subclasses set the entity the fields are validated against."""
+
+    model_config = ConfigDict(extra='forbid')
+
+    fields_entity: ClassVar[type[BaseModel]]
+
+    fields: list[str] | None = Field(default=None, description='Comma separated fields to return, e.g. id,title')
+
+    @field_validator('fields', mode='before')
+    @classmethod
+    def split_fields(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return [field.strip() for field in value.split(',') if field.strip()] or None
+        return value
+
+    @field_validator('fields')
+    @classmethod
+    def validate_fields(cls, value: list[str] | None) -> list[str] | None:
+        unknown = [field for field in value or [] if field not in cls.fields_entity.model_fields]
+        if unknown:
+            raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+        return value
+
+
+class OrderQuery(BaseModel):
+    """Order of the results, subclasses set the entity whose columns the results can be ordered by."""
+
+    model_config = ConfigDict(extra='forbid')
+
+    order_entity: ClassVar[type[SQLModel]]
+
+    order_by: str | None = Field(default=None, description='Order column, prefixed with - for descending order')
+
+    @field_validator('order_by')
+    @classmethod
+    def validate_order_by(cls, value: str | None) -> str | None:
+        if value is not None and value.lstrip('-') not in cls.order_entity.__table__.columns:  # type: ignore[attr-defined]
+            raise ValueError(f'Unknown order column: {value.lstrip("-")}')
+        return value
+
+
+# Query parameters of the search itself, every other field of a FilterQuery is a filter
+SEARCH_PARAMS = frozenset({*PaginationQuery.model_fields, *FieldsQuery.model_fields, *OrderQuery.model_fields})
+
+
+class FilterQuery(BaseModel):
+    """
+    Search filters, subclasses set the entity whose filter plan the filter fields are validated against
+    when the schema is built, so an endpoint cannot declare a filter the repository would reject.
+    """
+
+    model_config = ConfigDict(extra='forbid')
+
+    filter_entity: ClassVar[type[SQLModel]]
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        entity = getattr(cls, 'filter_entity', None)
+        if entity is None:
+            return
+        plan = filter_plan(entity.__table__)  # type: ignore[attr-defined]
+        unknown = [name for name in cls.model_fields if name not in SEARCH_PARAMS and name not in plan.filters]
+        if unknown:
+            raise TypeError(f'Unknown filters of {cls.__name__} for {entity.__name__}: {", ".join(unknown)}')
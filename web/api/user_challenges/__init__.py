@@ -1,7 +1,9 @@
 from .user_challenges import (
     CreateUserChallenge,
     DeleteUserChallengeByID,
+    ExportUserChallenges,
     GetUserChallengeByID,
     GetUserChallenges,
     UpdateUserChallengeByID,
+    UpdateUserChallenges,
 )
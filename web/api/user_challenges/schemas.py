@@ -0,0 +1,32 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field, RootModel
+
+from app.models.user_challenges import UserChallenges
+from web.api.schemas import FieldsQuery, FilterQuery, OrderQuery, PaginationQuery
+
+
+class UserChallengesFilters(OrderQuery, FilterQuery):
+    order_entity = UserChallenges
+    filter_entity = UserChallenges
+
+    user_id: UUID | None = None
+    challenge_id: UUID | None = None
+    status: str | None = None
+
+
+class GetUserChallengeQuery(FieldsQuery):
+    fields_entity = UserChallenges
+
+
+class GetUserChallengesQuery(PaginationQuery, GetUserChallengeQuery, UserChallengesFilters):
+    pass
+
+
+class UpdateUserChallengesItem(BaseModel):
+    id: UUID
+    status: str
+
+
+class UpdateUserChallengesBody(RootModel[list[UpdateUserChallengesItem]]):
+    root: list[UpdateUserChallengesItem] = Field(min_length=1, max_length=1000)
@@ -3,12 +3,15 @@ from functools import partial
 from typing import Any
 
 from app.models.user_challenges import UserChallenges
+from core.repositories.pagination import Page
 from core.utils.types import partial_apply
 from core.web.endpoints.base import EndpointMeta, RequestParams
 from core.web.endpoints.json import JSONEndpoint
 from web.api.schemas import GetByID
 from web.mixins.challenges_mixin import ChallengesMixin
 
+from . import schemas
+
 logger = logging.getLogger(__name__)
 
 meta = partial(EndpointMeta, tag='user_challenges')
@@ -17,13 +20,27 @@ meta = partial(EndpointMeta, tag='user_challenges')
 class GetUserChallenges(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Get user challenges')
 
-    schema_query = partial_apply(UserChallenges, only=['user_id', 'challenge_id', 'status'], partial=True)
-    schema_response = list[UserChallenges]
+    schema_query = schemas.GetUserChallengesQuery
+    schema_response = Page[UserChallenges]
 
     async def execute(self, params: RequestParams) -> Any:
         return await self.user_challenges_service.get_user_challenges(**params.query)
 
 
+class ExportUserChallenges(JSONEndpoint, ChallengesMixin):
+    meta = meta(
+        summary='Export user challenges',
+        description='Streams all matching user challenges as a JSON array, or as NDJSON '
+        'when the request accepts application/x-ndjson',
+    )
+
+    schema_query = schemas.UserChallengesFilters
+    schema_response = list[UserChallenges]
+
+    async def execute(self, params: RequestParams) -> Any:
+        return self.user_challenges_service.iterate_user_challenges(**params.query)
+
+
 class CreateUserChallenge(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Create user challenge')
 
@@ -38,10 +55,11 @@ class GetUserChallengeByID(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Get user challenge by ID')
 
     schema_path = GetByID
+    schema_query = schemas.GetUserChallengeQuery
     schema_response = UserChallenges
 
     async def execute(self, params: RequestParams) -> Any:
-        return await self.user_challenges_service.get_user_challenge_by_id(params.path['id'])
+        return await self.user_challenges_service.get_user_challenge_by_id(params.path['id'], **params.query)
 
 
 class UpdateUserChallengeByID(JSONEndpoint, ChallengesMixin):
@@ -55,6 +73,16 @@ class UpdateUserChallengeByID(JSONEndpoint, ChallengesMixin):
         return await self.user_challenges_service.update_user_challenge_by_id(params.path['id'], **params.body)
 
 
+class UpdateUserChallenges(JSONEndpoint, ChallengesMixin):
+    meta = meta(summary='Update user challenges in bulk')
+
+    schema_body = schemas.UpdateUserChallengesBody
+    schema_response = list[UserChallenges]
+
+    async def execute(self, params: RequestParams) -> Any:
+        return await self.user_challenges_service.update_user_challenges(params.body)
+
+
 class DeleteUserChallengeByID(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Delete user challenge by ID')
 
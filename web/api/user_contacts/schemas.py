@@ -2,15 +2,26 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
-from app.models.user_contacts import ContactType
+from app.models.user_contacts import ContactType, UserContacts
+from web.api.schemas import FieldsQuery, FilterQuery, OrderQuery, PaginationQuery
 
 
-class GetUserContactsQuery(BaseModel):
+class GetUserContactQuery(FieldsQuery):
+    fields_entity = UserContacts
+
+
+class GetUserContactsQuery(PaginationQuery, GetUserContactQuery, OrderQuery, FilterQuery):
+    order_entity = UserContacts
+    filter_entity = UserContacts
+
     user_id: UUID | None = None
     contact_type: ContactType | None = None
     contact: str | None = None
-    order_by: str | None = None
 
 
 class GetContactsByUserIDPath(BaseModel):
     user_id: UUID
+
+
+class GetContactsByUserIDQuery(PaginationQuery, GetUserContactQuery):
+    pass
@@ -3,6 +3,7 @@ from functools import partial
 from typing import Any
 
 from app.models.user_contacts import UserContacts
+from core.repositories.pagination import Page
 from core.utils.types import partial_apply
 from core.web.endpoints.base import EndpointMeta, RequestParams
 from core.web.endpoints.json import JSONEndpoint
@@ -20,7 +21,7 @@ class GetUserContacts(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Get user contacts')
 
     schema_query = schemas.GetUserContactsQuery
-    schema_response = list[UserContacts]
+    schema_response = Page[UserContacts]
 
     async def execute(self, params: RequestParams) -> Any:
         return await self.user_contacts_service.get_user_contacts(**params.query)
@@ -51,10 +52,11 @@ class GetUserContactByID(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Get user contact by id')
 
     schema_path = GetByID
+    schema_query = schemas.GetUserContactQuery
     schema_response = UserContacts
 
     async def execute(self, params: RequestParams) -> Any:
-        return await self.user_contacts_service.get_user_contact_by_id(contact_id=params.path['id'])
+        return await self.user_contacts_service.get_user_contact_by_id(contact_id=params.path['id'], **params.query)
 
 
 class DeleteUserContactByID(JSONEndpoint, ChallengesMixin):
@@ -70,7 +72,8 @@ class GetContactsByUserID(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Get contacts by user id')
 
     schema_path = schemas.GetContactsByUserIDPath
-    schema_response = list[UserContacts]
+    schema_query = schemas.GetContactsByUserIDQuery
+    schema_response = Page[UserContacts]
 
     async def execute(self, params: RequestParams) -> Any:
-        return await self.user_contacts_service.get_contacts_by_user_id(user_id=params.path['user_id'])
+        return await self.user_contacts_service.get_contacts_by_user_id(user_id=params.path['user_id'], **params.query)
@@ -1,8 +1,15 @@
-from pydantic import BaseModel
+from app.models.user import Users
+from web.api.schemas import FieldsQuery, FilterQuery, OrderQuery, PaginationQuery
 
 
-class GetUsersQuery(BaseModel):
+class GetUserQuery(FieldsQuery):
+    fields_entity = Users
+
+
+class GetUsersQuery(PaginationQuery, GetUserQuery, OrderQuery, FilterQuery):
+    order_entity = Users
+    filter_entity = Users
+
     first_name: str | None = None
     last_name: str | None = None
     full_name: str | None = None
-    order_by: str | None = None
@@ -3,6 +3,7 @@ from functools import partial
 from typing import Any
 
 from app.models.user import Users
+from core.repositories.pagination import Page
 from core.utils.types import partial_apply
 from core.web.endpoints.base import EndpointMeta, RequestParams
 from core.web.endpoints.json import JSONEndpoint
@@ -20,7 +21,7 @@ class GetUsers(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Get users')
 
     schema_query = schemas.GetUsersQuery
-    schema_response = list[Users]
+    schema_response = Page[Users]
 
     async def execute(self, params: RequestParams) -> Any:
         return await self.user_service.get_users(**params.query)
@@ -51,10 +52,11 @@ class GetUserByID(JSONEndpoint, ChallengesMixin):
     meta = meta(summary='Get user by id')
 
     schema_path = GetByID
+    schema_query = schemas.GetUserQuery
     schema_response = Users
 
     async def execute(self, params: RequestParams) -> Any:
-        return await self.user_service.get_user_by_id(user_id=params.path['id'])
+        return await self.user_service.get_user_by_id(user_id=params.path['id'], **params.query)
 
 
 class DeleteUserByID(JSONEndpoint, ChallengesMixin):
@@ -34,5 +34,6 @@ class AppBuilder:
             lifespan=cls.lifespan,
             middleware=cls.middlewares,
         )
+        app.state.request_timeout = app_config.request_timeout
 
         return app
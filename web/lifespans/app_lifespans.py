@@ -1,5 +1,11 @@
+from settings.archival import archival_config
 from settings.db import db_config
+from settings.leaderboards import leaderboards_config
+from settings.write_behind import write_behind_config
+from web.lifespans.archival import archival_init
 from web.lifespans.db import db_init
+from web.lifespans.leaderboards import leaderboards_init
+from web.lifespans.write_behind import write_behind_init
 
 
 class AppLifespans:
@@ -7,10 +13,25 @@ class AppLifespans:
     def db(self):
         return db_init('db_pool', db_config.model_dump())
 
+    @property
+    def leaderboards(self):
+        return leaderboards_init(leaderboards_config.model_dump())
+
+    @property
+    def write_behind(self):
+        return write_behind_init(write_behind_config.model_dump())
+
+    @property
+    def archival(self):
+        return archival_init(archival_config.model_dump())
+
     @property
     def all(self):
         return [
             self.db,
+            self.leaderboards,
+            self.write_behind,
+            self.archival,
         ]
 
 
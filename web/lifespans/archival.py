@@ -0,0 +1,48 @@
+import asyncio
+import contextlib
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncContextManager, AsyncIterator, Callable
+
+from starlette.applications import Starlette
+
+from app.archival import create_archival_worker
+from app.repositories.repositories import DBRepositories
+
+logger = logging.getLogger(__name__)
+
+
+def archival_init(
+    config: dict[str, Any], db_pool_attribute_name: str = 'db_pool'
+) -> Callable[[Starlette, dict[str, Any]], AsyncContextManager]:
+    """
+    Lifespan of the archival worker moving old archived rows to the archive tables,
+    must be entered after the database lifespan.
+
+    Args:
+        config: ArchivalConfig dump
+        db_pool_attribute_name: State attribute of the primary pool
+    """
+
+    @asynccontextmanager
+    async def _archival(app: Starlette, state: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+        if not config['enabled']:
+            yield {'archival_worker': None}
+            return
+
+        db_repos = DBRepositories.create(
+            db_pool=state[db_pool_attribute_name],
+            statement_registry=state.get('statement_registry'),
+            query_stats=state.get('query_stats'),
+        )
+        worker = create_archival_worker(db_repos, config)
+        runner = asyncio.create_task(worker.run())
+        logger.debug('Archival worker started')
+
+        yield {'archival_worker': worker}
+
+        runner.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await runner
+
+    return _archival
@@ -1,20 +1,116 @@
+import asyncio
+import contextlib
 import logging
 from contextlib import asynccontextmanager
-from typing import Any, AsyncContextManager, AsyncIterator, Callable
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable
 
-from asyncpg import create_pool
+from asyncpg import Connection  # type: ignore
 from starlette.applications import Starlette
 
+from core.repositories.entity_cache import EntityCache
+from core.repositories.invalidation import InvalidationBus
+from core.repositories.pool import ObservablePool, create_pool
+from core.repositories.prepared import StatementStats
+from core.repositories.replicas import ReplicaRouter
+from core.repositories.stats import QueryStats
+
 logger = logging.getLogger(__name__)
 
 
-def db_init(app_attribute_name: str, config: dict[str, Any]) -> Callable[[Starlette], AsyncContextManager]:
+async def _create_pool(
+    dsn: str, config: dict[str, Any], init: Callable[[Connection], Awaitable[None]] | None = None
+) -> ObservablePool:
+    pool = await create_pool(
+        dsn,
+        min_size=config['pool_min_size'],
+        max_size=config['pool_max_size'],
+        max_inactive_connection_lifetime=config['pool_max_inactive_connection_lifetime'],
+        statement_cache_size=config['pool_statement_cache_size'],
+        server_settings=config['pool_server_settings'] or None,
+        init=init,
+    )
+    return pool
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+def db_init(
+    app_attribute_name: str,
+    config: dict[str, Any],
+    init_connection: Callable[[Connection], Awaitable[None]] | None = None,
+) -> Callable[[Starlette, dict[str, Any]], AsyncContextManager]:
+    """
+    Lifespan of the database pools.
+
+    Args:
+        app_attribute_name: State attribute of the primary pool
+        config: DBConfig dump
+        init_connection: Hook called on every new connection of the pools (e.g. to register type codecs)
+    """
+
     @asynccontextmanager
-    async def _db(app: Starlette) -> AsyncIterator[None]:
-        db_pool = await create_pool(config['dsn'])
-        logger.debug('DB pool initialized')
-        yield {app_attribute_name: db_pool}
-        await db_pool.close()
-        logger.debug('DB pool closed')
+    async def _db(app: Starlette, state: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+        # Everything set up so far is torn down in reverse order, also when a later step fails
+        async with contextlib.AsyncExitStack() as stack:
+            db_pool = await _create_pool(config['dsn'], config, init_connection)
+            stack.push_async_callback(db_pool.close)
+            logger.debug('DB pool initialized')
+            statement_registry = (
+                StatementStats(maxsize=config['prepared_statements_size'])
+                if config.get('prepared_statements_size')
+                else None
+            )
+
+            entity_caches = {
+                table_name: EntityCache(ttl=ttl, maxsize=config['entity_cache_size'])
+                for table_name, ttl in config.get('entity_cache_ttls', {}).items()
+            }
+
+            invalidation_bus = None
+            if entity_caches and config['invalidation_channel']:
+                invalidation_bus = InvalidationBus(
+                    config['dsn'],
+                    channel=config['invalidation_channel'],
+                    heartbeat_interval=config['invalidation_heartbeat_interval'],
+                    reconnect_interval=config['invalidation_reconnect_interval'],
+                )
+                for table_name, cache in entity_caches.items():
+                    invalidation_bus.subscribe(table_name, cache)
+                stack.push_async_callback(_cancel, asyncio.create_task(invalidation_bus.run()))
+
+            replica_router = None
+            if config.get('replica_dsns'):
+                replicas = []
+                for dsn in config['replica_dsns']:
+                    replica = await _create_pool(dsn, config, init_connection)
+                    stack.push_async_callback(replica.close)
+                    replicas.append(replica)
+                replica_router = ReplicaRouter(
+                    replicas, max_lag=config['replica_max_lag'], sticky_window=config['replica_sticky_window']
+                )
+                lag_watcher = asyncio.create_task(replica_router.watch_lags(config['replica_lag_check_interval']))
+                stack.push_async_callback(_cancel, lag_watcher)
+                logger.debug(f'{len(replicas)} DB replica pools initialized')
+
+            query_stats = QueryStats(
+                slow_query_threshold=config['slow_query_threshold'],
+                explain_sample_rate=config['slow_query_explain_rate'],
+                seq_scan_tables=config['seq_scan_tables'],
+            )
+            stack.push_async_callback(query_stats.close)
+
+            yield {
+                app_attribute_name: db_pool,
+                'statement_registry': statement_registry,
+                'replica_router': replica_router,
+                'entity_caches': entity_caches,
+                'query_stats': query_stats,
+                'invalidation_bus': invalidation_bus,
+            }
+        logger.debug('DB pools closed')
 
     return _db
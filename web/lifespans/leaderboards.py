@@ -0,0 +1,56 @@
+import asyncio
+import contextlib
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncContextManager, AsyncIterator, Callable
+
+from starlette.applications import Starlette
+
+from app.leaderboards import Leaderboards
+from app.repositories.repositories import DBRepositories
+
+logger = logging.getLogger(__name__)
+
+
+def leaderboards_init(
+    config: dict[str, Any], db_pool_attribute_name: str = 'db_pool'
+) -> Callable[[Starlette, dict[str, Any]], AsyncContextManager]:
+    """
+    Lifespan of the in-memory leaderboards, must be entered after the database lifespan.
+
+    Args:
+        config: LeaderboardsConfig dump
+        db_pool_attribute_name: State attribute of the primary pool
+    """
+
+    @asynccontextmanager
+    async def _leaderboards(app: Starlette, state: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+        if not config['enabled']:
+            yield {'leaderboards': None}
+            return
+
+        leaderboards = Leaderboards(status_scores=config['status_scores'])
+        db_repos = DBRepositories.create(
+            db_pool=state[db_pool_attribute_name],
+            replica_router=state.get('replica_router'),
+            query_stats=state.get('query_stats'),
+        )
+        await leaderboards.rebuild(db_repos)
+        logger.debug('Leaderboards built')
+
+        refresher = None
+        if config['refresh_interval']:
+            refresher = asyncio.create_task(
+                leaderboards.refresh(
+                    db_repos, config['refresh_interval'], config['rebuild_interval'], config['refresh_overlap']
+                )
+            )
+
+        yield {'leaderboards': leaderboards}
+
+        if refresher is not None:
+            refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await refresher
+
+    return _leaderboards
@@ -1,4 +1,5 @@
 import contextlib
+from typing import Any
 
 from starlette.applications import Starlette
 
@@ -6,9 +7,11 @@ from starlette.applications import Starlette
 def app_lifespan(lifespans: list):
     @contextlib.asynccontextmanager
     async def _lifespan_manager(app: Starlette):
-        exit_stack = contextlib.AsyncExitStack()
-        async with exit_stack:
+        # Lifespans are entered in order and get the state yielded by the previous ones
+        state: dict[str, Any] = {}
+        async with contextlib.AsyncExitStack() as exit_stack:
             for lifespan in lifespans:
-                yield await exit_stack.enter_async_context(lifespan(app))
+                state.update(await exit_stack.enter_async_context(lifespan(app, state)) or {})
+            yield state
 
     return _lifespan_manager
@@ -0,0 +1,55 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncContextManager, AsyncIterator, Callable
+
+from starlette.applications import Starlette
+
+from app.repositories.repositories import DBRepositories
+from core.repositories.write_behind import WriteBehindBuffer
+
+logger = logging.getLogger(__name__)
+
+
+def write_behind_init(
+    config: dict[str, Any], db_pool_attribute_name: str = 'db_pool'
+) -> Callable[[Starlette, dict[str, Any]], AsyncContextManager]:
+    """
+    Lifespan of the write-behind buffer of user challenge updates, must be entered after the database
+    and leaderboards lifespans. Buffered updates are written on shutdown.
+
+    Args:
+        config: WriteBehindConfig dump
+        db_pool_attribute_name: State attribute of the primary pool
+    """
+
+    @asynccontextmanager
+    async def _write_behind(app: Starlette, state: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+        if not config['user_challenges_enabled']:
+            yield {'user_challenges_write_behind': None}
+            return
+
+        db_repos = DBRepositories.create(
+            db_pool=state[db_pool_attribute_name],
+            statement_registry=state.get('statement_registry'),
+            # Flushed rows are evicted from the entity caches of every process, as writes of requests are
+            entity_caches=state.get('entity_caches'),
+            query_stats=state.get('query_stats'),
+            invalidation_bus=state.get('invalidation_bus'),
+        )
+        leaderboards = state.get('leaderboards')
+
+        async def write(rows: list[dict]) -> None:
+            user_challenges = await db_repos.user_challenges.update_many(rows)
+            if leaderboards is not None:
+                leaderboards.apply(user_challenges)
+
+        buffer = WriteBehindBuffer(
+            write, window=config['window'], max_pending=config['max_pending'], max_attempts=config['max_attempts']
+        )
+
+        yield {'user_challenges_write_behind': buffer}
+
+        await buffer.close()
+        logger.debug(f'Write-behind buffer flushed, {buffer.flushed} rows written')
+
+    return _write_behind
@@ -1,24 +1,75 @@
+from functools import cached_property
+
+from starlette.requests import Request
+
+from app.leaderboards import Leaderboards
 from app.repositories.repositories import DBRepositories
 from app.services.challenges_service import ChallengesService
+from app.services.leaderboard_service import LeaderboardService
 from app.services.user_challenges_service import UserChallengesService
 from app.services.user_contacts_service import UserContactsService
 from app.services.user_service import UserService
+from core.repositories.unit_of_work import UnitOfWork
 from core.web.endpoints.base import BaseEndpoint
 
 
 class ChallengesMixin(BaseEndpoint):
+    # Run all queries of the request in one transaction, committed right before the response is sent
+    transactional: bool = False
+
+    @cached_property
+    def unit_of_work(self) -> UnitOfWork:
+        # The connection is acquired by the first query and released once the response is sent
+        return UnitOfWork(self.state.db_pool, transactional=self.transactional)
+
+    async def before_send(self) -> None:
+        if 'unit_of_work' in self.__dict__:
+            await self.unit_of_work.commit()
+
+    async def _dispatch(self, request: Request):
+        try:
+            return await super()._dispatch(request)
+        finally:
+            if 'unit_of_work' in self.__dict__:
+                await self.unit_of_work.close()
+
+    @cached_property
+    def db_repos(self) -> DBRepositories:
+        # One set of repositories per request, so services share request-scoped state like entity loaders
+        return DBRepositories.create(
+            db_pool=self.state.db_pool,
+            statement_registry=self.state.statement_registry,
+            replica_router=self.state.replica_router,
+            entity_caches=self.state.entity_caches,
+            query_stats=self.state.query_stats,
+            unit_of_work=self.unit_of_work,
+            invalidation_bus=self.state.invalidation_bus,
+        )
+
+    @property
+    def leaderboards(self) -> Leaderboards | None:
+        return getattr(self.state, 'leaderboards', None)
+
     @property
     def challenges_service(self) -> ChallengesService:
-        return ChallengesService(db_repos=DBRepositories.create(db_pool=self.state.db_pool))
+        return ChallengesService(db_repos=self.db_repos, leaderboards=self.leaderboards)
+
+    @property
+    def leaderboard_service(self) -> LeaderboardService:
+        return LeaderboardService(leaderboards=self.leaderboards)
 
     @property
     def user_challenges_service(self) -> UserChallengesService:
-        return UserChallengesService(db_repos=DBRepositories.create(db_pool=self.state.db_pool))
+        return UserChallengesService(
+            db_repos=self.db_repos,
+            leaderboards=self.leaderboards,
+            write_behind=getattr(self.state, 'user_challenges_write_behind', None),
+        )
 
     @property
     def user_contacts_service(self) -> UserContactsService:
-        return UserContactsService(db_repos=DBRepositories.create(db_pool=self.state.db_pool))
+        return UserContactsService(db_repos=self.db_repos)
 
     @property
     def user_service(self) -> UserService:
-        return UserService(db_repos=DBRepositories.create(db_pool=self.state.db_pool))
+        return UserService(db_repos=self.db_repos)
@@ -1,6 +1,7 @@
 from starlette.routing import Route
 
-from web.api import challenges, user_challenges, user_contacts, users
+from settings.app import app_config
+from web.api import admin, challenges, leaderboards, user_challenges, user_contacts, users
 
 routes = [
     # Challenges routes
@@ -9,6 +10,9 @@ routes = [
     Route('/challenges/{id}', challenges.GetChallengeByID, methods=['GET']),
     Route('/challenges/{id}', challenges.UpdateChallengeByID, methods=['PATCH']),
     Route('/challenges/{id}', challenges.DeleteChallengeByID, methods=['DELETE']),
+    # Leaderboards routes
+    Route('/challenges/{id}/leaderboard', leaderboards.GetLeaderboard, methods=['GET']),
+    Route('/challenges/{id}/leaderboard/users/{user_id}', leaderboards.GetUserRank, methods=['GET']),
     # Users routes
     Route('/users', users.GetUsers, methods=['GET']),
     Route('/users', users.CreateUser, methods=['POST']),
@@ -25,7 +29,24 @@ routes = [
     # User challenges routes
     Route('/user-challenges', user_challenges.GetUserChallenges, methods=['GET']),
     Route('/user-challenges', user_challenges.CreateUserChallenge, methods=['POST']),
+    Route('/user-challenges', user_challenges.UpdateUserChallenges, methods=['PATCH']),
+    Route('/user-challenges/export', user_challenges.ExportUserChallenges, methods=['GET']),
     Route('/user-challenges/{id}', user_challenges.GetUserChallengeByID, methods=['GET']),
     Route('/user-challenges/{id}', user_challenges.UpdateUserChallengeByID, methods=['PATCH']),
     Route('/user-challenges/{id}', user_challenges.DeleteUserChallengeByID, methods=['DELETE']),
 ]
+
+# Admin routes, only mounted when an admin token is configured
+admin_routes = [
+    Route('/admin/entity-caches', admin.GetEntityCacheStats, methods=['GET']),
+    Route('/admin/invalidation-bus', admin.GetInvalidationBusStats, methods=['GET']),
+    Route('/admin/db-pools', admin.GetDBPoolStats, methods=['GET']),
+    Route('/admin/query-stats', admin.GetQueryStats, methods=['GET']),
+    Route('/admin/query-stats', admin.ResetQueryStats, methods=['DELETE']),
+    Route('/admin/leaderboards', admin.GetLeaderboardStats, methods=['GET']),
+    Route('/admin/write-behind', admin.GetWriteBehindStats, methods=['GET']),
+    Route('/admin/archival', admin.GetArchivalStats, methods=['GET']),
+]
+
+if app_config.admin_token:
+    routes += admin_routes